@@ -31,6 +31,46 @@ CREATE TABLE IF NOT EXISTS DEVICE_STATUS (
 CREATE INDEX idx_measure_time ON GROWING_ENVIRONMENT(CREATE_DATE);
 CREATE INDEX idx_record_time ON DEVICE_STATUS(TIMESTAMP);
 
+-- 환경 데이터 시간별 집계 테이블 (장기간 조회용)
+CREATE TABLE IF NOT EXISTS GROWING_ENVIRONMENT_HOURLY (
+    BUCKET_START DATETIME PRIMARY KEY,
+    SAMPLE_COUNT INT NOT NULL,
+    TEMPER_MIN FLOAT,
+    TEMPER_MAX FLOAT,
+    TEMPER_AVG FLOAT,
+    HUMIDITY_MIN FLOAT,
+    HUMIDITY_MAX FLOAT,
+    HUMIDITY_AVG FLOAT,
+    SOIL_HUMIDITY_MIN FLOAT,
+    SOIL_HUMIDITY_MAX FLOAT,
+    SOIL_HUMIDITY_AVG FLOAT,
+    ILLUMINATION_MIN INT,
+    ILLUMINATION_MAX INT,
+    ILLUMINATION_AVG FLOAT
+);
+
+-- 환경 데이터 일별 집계 테이블
+CREATE TABLE IF NOT EXISTS GROWING_ENVIRONMENT_DAILY LIKE GROWING_ENVIRONMENT_HOURLY;
+
+-- 제어 상태 시간별 집계 테이블 (장치별 가동 시간)
+CREATE TABLE IF NOT EXISTS DEVICE_STATUS_HOURLY (
+    BUCKET_START DATETIME PRIMARY KEY,
+    EVENT_COUNT INT NOT NULL,
+    MOTION_COUNT INT NOT NULL,
+    FAN_ON_SECONDS INT NOT NULL,
+    PUMP_ON_SECONDS INT NOT NULL,
+    LED_ON_SECONDS INT NOT NULL
+);
+
+-- 제어 상태 일별 집계 테이블
+CREATE TABLE IF NOT EXISTS DEVICE_STATUS_DAILY LIKE DEVICE_STATUS_HOURLY;
+
+-- 집계 진행 위치 (집계 테이블별 마지막 집계 구간)
+CREATE TABLE IF NOT EXISTS ROLLUP_STATE (
+    TABLE_NAME VARCHAR(64) PRIMARY KEY,
+    WATERMARK DATETIME NOT NULL
+);
+
 -- 테이블 구조 확인
 SHOW TABLES;
 DESC GROWING_ENVIRONMENT;
@@ -0,0 +1,103 @@
+# ADC 일괄 측정 벤치마크 (필터별 토양 수분, 조도 잡음 비교 및 1시간 동작 시 ADC 변환 횟수 비교)
+                                                                # 표준 라이브러리
+import argparse
+import statistics
+                                                                # 로컬 모듈
+from config.constant import SETTINGS, SIMULATOR_CONFIG
+from hardware.sim_backend import SimBackend, SimMCP3008
+from sensor.adc_sampler import AdcSampler
+
+# 측정 채널
+CHANNELS = (SETTINGS['SOIL_CHANNEL'], SETTINGS['LIGHT_CHANNEL'])
+
+# 비교할 측정 방식 (이름, 채널별 측정 횟수, 필터)
+MODES = (
+  ('단일 측정', 1, 'median'),
+  ('중앙값', 5, 'median'),
+  ('지수 이동 평균', 5, 'ema')
+)
+
+# 가상 시계 (1시간 동작을 실제 대기 없이 재현)
+class StepClock :
+  def __init__(self) :
+    self.now = 0.0
+
+  def __call__(self) :
+    return self.now
+
+# 잡음 측정 - 같은 순간을 여러 번 측정하여 실제값 대비 오차 분포 계산
+def measure_noise(backend, oversample, filter, scans) :
+  adc = backend.mcp3008()
+  truth = SimMCP3008(backend)                              # 잡음 없는 실제값
+  sampler = AdcSampler(adc.read, CHANNELS, oversample = oversample, filter = filter, max_age = 0)
+
+  errors = {channel : [] for channel in CHANNELS}
+  for _ in range(scans) :
+    snapshot = sampler.scan()
+    for channel in CHANNELS :
+      errors[channel].append(snapshot.values[channel] - truth.read(channel))
+
+  # 지수 이동 평균은 처음 몇 번은 수렴 중이므로 제외
+  return {channel : values[10:] for channel, values in errors.items()}
+
+# 1시간 동작 재현 - 실시간 체크(1분), 자동 제어(감시 주기, 조도), 데이터 저장(1시간, 토양 + 조도) 요청 시 ADC 변환 횟수
+# 기존 방식은 요청마다 해당 채널을 1회 변환하므로 변환 횟수 = 요청 수
+def measure_traffic(backend, oversample, filter) :
+  clock = StepClock()
+  adc = backend.mcp3008()
+  sampler = AdcSampler(adc.read, CHANNELS, oversample = oversample, filter = filter,
+                       max_age = SETTINGS['READ_INTERVAL'], clock = clock)
+  requests = 0
+
+  for second in range(0, 3600, SETTINGS['READ_INTERVAL']) :
+    clock.now = second
+
+    sampler.snapshot(0)                                    # 실시간 체크 (토양 + 조도)
+    requests += 2
+
+    if second % SETTINGS['CONTROL_INTERVAL'] == 0 :
+      sampler.value(CHANNELS[1])                           # 자동 제어 조도 요청
+      requests += 1
+
+    if second == 0 :
+      sampler.snapshot()                                   # 데이터 저장 (토양 + 조도)
+      requests += 2
+
+  return requests, sampler.conversions
+
+# 오차 요약 출력
+def print_noise(title, errors) :
+  parts = []
+  for channel, name in zip(CHANNELS, ('토양', '조도')) :
+    values = errors[channel]
+    parts.append(f"{name} 표준편차 {statistics.pstdev(values):5.2f}, 최대 오차 {max(abs(value) for value in values):6.1f}")
+
+  print(f"{title:<10} : {' / '.join(parts)}")
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "ADC 일괄 측정 벤치마크")
+  parser.add_argument('--scans', type = int, default = 2000, help = "잡음 측정 횟수")
+  parser.add_argument('--noise', type = float, default = SIMULATOR_CONFIG['adc_noise'], help = "ADC 잡음 표준편차")
+  parser.add_argument('--spike-rate', type = float, default = SIMULATOR_CONFIG['adc_spike_rate'], help = "순간 튀는 값 발생 확률")
+  args = parser.parse_args()
+
+  # 정오 환경을 고정하고 측정
+  backend = SimBackend(adc_noise = args.noise, adc_spike_rate = args.spike_rate, speed = 0, start = 12 * 3600)
+
+  print("═" * 50)
+  print(f"ADC 측정 잡음 (원시값, 잡음 {args.noise:g}, 튀는 값 {args.spike_rate:.1%})")
+  print("═" * 50)
+
+  for title, oversample, filter in MODES :
+    print_noise(title, measure_noise(backend, oversample, filter, args.scans))
+
+  print("═" * 50)
+  print("1시간 동작 시 ADC 변환 횟수")
+  print("═" * 50)
+
+  for title, oversample, filter in MODES :
+    requests, conversions = measure_traffic(backend, oversample, filter)
+    if oversample == 1 :
+      print(f"기존 (요청마다 1회 측정) : 요청 {requests}회, 변환 {requests}회")
+    print(f"{title} {oversample}회 (스냅샷 공유) : 요청 {requests}회, 변환 {conversions}회")
@@ -0,0 +1,95 @@
+# 브로드캐스트 부하 테스트 (클라이언트 수 증가 및 느린 클라이언트 존재 시 알림 지연 비교)
+                                                                # 표준 라이브러리
+import argparse
+import asyncio
+import json
+import statistics
+import time
+                                                                # 로컬 모듈
+from network.client_channel import Broadcaster
+
+# 가상 웹소켓 클라이언트 (전송 지연 시간 설정 가능)
+class FakeClient :
+  def __init__(self, delay, latencies = None) :
+    self.delay = delay                                         # 메시지 1개 전송 시간 (초)
+    self.latencies = latencies                                 # 알림 지연 기록 목록 (빠른 클라이언트만)
+
+  async def send(self, payload) :
+    await asyncio.sleep(self.delay)
+
+    if self.latencies is not None :
+      sent_at = json.loads(payload)['sent_at']
+      self.latencies.append((time.perf_counter() - sent_at) * 1000)
+
+  async def close(self) :
+    pass
+
+# 기존 방식 - 클라이언트마다 직렬화 후 순서대로 전송 완료 대기
+async def sequential_broadcast(clients, message) :
+  for client in clients :
+    await client.send(json.dumps(message, ensure_ascii = False))
+
+# 클라이언트 목록 생성 (slow_ratio 비율만큼 느린 클라이언트)
+def make_clients(count, slow_ratio, slow_delay, latencies) :
+  slow_count = int(count * slow_ratio)
+  return [
+    FakeClient(slow_delay) if index < slow_count else FakeClient(0.0005, latencies)
+    for index in range(count)
+  ]
+
+# 알림을 일정 간격으로 보내고 빠른 클라이언트의 수신 지연 측정
+async def run(mode, count, alerts, interval, slow_ratio, slow_delay) :
+  latencies = []
+  clients = make_clients(count, slow_ratio, slow_delay, latencies)
+
+  broadcaster = Broadcaster()
+  for client in clients :
+    broadcaster.register(client)
+
+  for index in range(alerts) :
+    message = {'command' : 'alert', 'type' : 'motion', 'seq' : index, 'sent_at' : time.perf_counter()}
+
+    if mode == 'sequential' :
+      await sequential_broadcast(clients, message)
+    else :
+      broadcaster.broadcast(message)
+
+    await asyncio.sleep(interval)
+
+  # 남은 전송 완료 대기 (빠른 클라이언트 기준)
+  await asyncio.sleep(0.5)
+  metrics = broadcaster.metrics()
+
+  for client in clients :
+    await broadcaster.unregister(client)
+
+  return latencies, metrics
+
+# 측정 결과 출력
+def print_result(mode, count, latencies, metrics) :
+  latencies.sort()
+  p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+  extra = f", 최대 대기열 {metrics['queue_depth_max']}, 버림 {metrics['dropped']}" if mode == 'fanout' else ""
+
+  print(f"{mode:<10} 클라이언트 {count:>4}개 : 중앙값 {statistics.median(latencies):8.2f}ms, p99 {p99:8.2f}ms, 최대 {latencies[-1]:8.2f}ms{extra}")
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "브로드캐스트 부하 테스트")
+  parser.add_argument('--clients', type = int, nargs = '+', default = [10, 100, 500], help = "클라이언트 수 목록")
+  parser.add_argument('--alerts', type = int, default = 20, help = "알림 전송 횟수")
+  parser.add_argument('--interval', type = float, default = 0.05, help = "알림 전송 간격 (초)")
+  parser.add_argument('--slow-ratio', type = float, default = 0.05, help = "느린 클라이언트 비율")
+  parser.add_argument('--slow-delay', type = float, default = 0.2, help = "느린 클라이언트 전송 시간 (초)")
+  args = parser.parse_args()
+
+  print("═" * 50)
+  print(f"브로드캐스트 부하 테스트 (느린 클라이언트 {args.slow_ratio:.0%}, {args.slow_delay * 1000:.0f}ms)")
+  print("═" * 50)
+
+  for count in args.clients :
+    for mode in ('sequential', 'fanout') :
+      # 순차 방식은 클라이언트가 많으면 오래 걸리므로 알림 수를 줄여 측정
+      alerts = args.alerts if mode == 'fanout' else max(2, args.alerts // max(1, count // 50))
+      latencies, metrics = asyncio.run(run(mode, count, alerts, args.interval, args.slow_ratio, args.slow_delay))
+      print_result(mode, count, latencies, metrics)
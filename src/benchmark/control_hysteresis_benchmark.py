@@ -0,0 +1,138 @@
+# 장치 제어 동작 벤치마크 (히스테리시스, 최소 유지 시간, 최대 가동률 적용 전후 장치 켜고 끄기, 제어 상태 저장 횟수 비교)
+# 시뮬레이터 환경(합성 하루 주기 또는 기록 CSV)에 측정 잡음을 더해 같은 자동 제어 경로를 실제 대기 없이 재생
+                                                                # 표준 라이브러리
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+                                                                # 로컬 모듈
+import control.multi_control as multi_control
+import config.config_manager as config_manager
+from config.constant import SETTINGS, DEVICE_CONTROL
+from control.rule_engine import RuleEngine
+from hardware.backend import use_backend
+
+# 측정 잡음 표준편차 (측정 항목 단위, --noise 배율 적용)
+SENSOR_NOISE = {
+  'temperature' : 0.2,                                     # DHT22 온도 (℃)
+  'humidity' : 1.0,                                        # DHT22 습도 (%)
+  'soil_moisture' : 1.0,                                   # 토양 수분 (%)
+  'light_value' : 8.0                                      # 조도 (원시값)
+}
+
+# 비교할 제어 동작 (이름, 모든 장치에 덮어쓸 설정 - None 이면 사용자 설정 기본값)
+MODES = (
+  ('기준값 하나 (기존 방식)', {'hysteresis' : 0, 'min_on' : 0, 'min_off' : 0, 'max_duty' : 1.0}),
+  ('장치별 제어 동작', None)
+)
+
+# 제어 상태 저장 횟수만 세는 저장 함수
+class CountingSave :
+  def __init__(self) :
+    self.calls = 0
+
+  def __call__(self, **states) :
+    self.calls += 1
+    return True
+
+# 제어 동작 하나로 시뮬레이션 실행 (tick 마다 interval 초 진행 후 자동 제어)
+def run(overrides, trace, seed, days, interval, noise) :
+  # 실행마다 같은 환경, 같은 잡음에서 시작
+  backend = use_backend('sim', seed = seed, trace = trace, speed = 0, motion_per_hour = 0)
+  rng = random.Random(seed)
+  multi_control.outputs.close()                            # 제어 출력을 새 백엔드에서 다시 초기화
+
+  # 사용자 설정 파일은 임시 디렉터리에 생성 (실제 설정 파일을 건드리지 않음)
+  with tempfile.TemporaryDirectory() as directory :
+    config_manager.CONFIG_FILE = os.path.join(directory, 'user_settings.json')
+    config = config_manager.ConfigManager()
+
+    if overrides :
+      for device in DEVICE_CONTROL :
+        for key, value in overrides.items() :
+          config.update_device_control(device, key, value)
+
+  multi_control.init_config(config)
+
+  # 최소 유지 시간, 가동률, 낮/밤 구분은 가상 시계 기준
+  multi_control.engine = RuleEngine(clock = backend.clock.time)
+  multi_control.prev_state = dict.fromkeys(multi_control.engine.devices)
+  multi_control.is_daytime = lambda : 6 <= backend.clock.now % 86400 / 3600 < 18
+
+  # 제어 상태 저장은 횟수만 기록
+  save = CountingSave()
+  multi_control.save_control = save
+
+  devices = multi_control.engine.devices
+  toggles = dict.fromkeys(devices, 0)
+  on_seconds = dict.fromkeys(devices, 0)
+  previous = multi_control.get_device_status()
+
+  for _ in range(int(days * 86400 / interval)) :
+    backend.step(interval)
+
+    # 환경 값에 측정 잡음을 더해 자동 제어
+    reading = backend.environment()
+    for metric, sigma in SENSOR_NOISE.items() :
+      reading[metric] += rng.gauss(0, sigma * noise)
+    multi_control.control_all_devices(reading)
+
+    status = multi_control.get_device_status()
+    for device in devices :
+      if status[device] != previous[device] :
+        toggles[device] += 1
+      if status[device] == 'ON' :
+        on_seconds[device] += interval
+
+    previous = status
+
+  multi_control.outputs.close()
+
+  return {
+    'toggles' : toggles,
+    'saves' : save.calls,
+    'on_hours' : {device : seconds / 3600 / days for device, seconds in on_seconds.items()}
+  }
+
+# 실행 결과 출력
+def print_result(title, result) :
+  toggles = result['toggles']
+  counts = ', '.join(f"{device.upper()} {count}" for device, count in toggles.items())
+  hours = ', '.join(f"{device.upper()} {value:.1f}" for device, value in result['on_hours'].items())
+
+  print(f"[{title}]")
+  print(f"장치 출력 변경 : {sum(toggles.values())}회 ({counts})")
+  print(f"제어 상태 저장 : {result['saves']}회")
+  print(f"하루 평균 가동 시간 : {hours} (시간)")
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "장치 제어 동작 벤치마크")
+  parser.add_argument('--days', type = float, default = 7, help = "시뮬레이션 기간 (일)")
+  parser.add_argument('--interval', type = float, default = SETTINGS['READ_INTERVAL'], help = "자동 제어 주기 (시뮬레이션 초)")
+  parser.add_argument('--noise', type = float, default = 1.0, help = "측정 잡음 배율")
+  parser.add_argument('--seed', type = int, default = 0, help = "난수 시드")
+  parser.add_argument('--trace', default = None, help = "재생할 환경 기록 CSV 경로")
+  args = parser.parse_args()
+
+  print("═" * 50)
+  print(f"장치 제어 동작 비교 ({args.days:g}일, 제어 주기 {args.interval:g}초, 잡음 ×{args.noise:g})")
+  print("═" * 50)
+
+  results = []
+  for title, overrides in MODES :
+    # 모듈 상태 출력은 측정에서 제외
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull) :
+      result = run(overrides, args.trace, args.seed, args.days, args.interval, args.noise)
+
+    print_result(title, result)
+    results.append(result)
+
+  # 기존 방식 대비 줄어든 횟수
+  before, after = results
+  before_toggles, after_toggles = sum(before['toggles'].values()), sum(after['toggles'].values())
+  print("═" * 50)
+  print(f"줄어든 장치 출력 변경 : {before_toggles - after_toggles}회 ({1 - after_toggles / max(before_toggles, 1):.1%})")
+  print(f"줄어든 제어 상태 저장 : {before['saves'] - after['saves']}회 ({1 - after['saves'] / max(before['saves'], 1):.1%})")
+  print("═" * 50)
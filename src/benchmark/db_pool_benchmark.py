@@ -0,0 +1,95 @@
+# 데이터베이스 연결 방식 성능 비교 (매 호출 연결 vs 연결 풀)
+                                                                # 표준 라이브러리
+import argparse
+import statistics
+import threading
+import time
+                                                                # 외부 라이브러리
+import pymysql
+                                                                # 로컬 모듈
+from config.constant import DATABASE_CONFIG
+from database.db_pool import ConnectionPool
+
+# 벤치마크용 쿼리 (테이블에 데이터를 남기지 않음)
+QUERY = "SELECT 1"
+
+# 기존 방식 - 호출마다 연결 생성 후 종료
+def per_call_connect() :
+  db = pymysql.connect(**DATABASE_CONFIG)
+  cursor = db.cursor()
+  cursor.execute(QUERY)
+  cursor.fetchall()
+  db.commit()
+  db.close()
+
+# 연결 풀 방식 - 풀에서 연결을 빌려 쓰고 반납
+def pooled(pool) :
+  with pool.connection() as db :
+    with db.cursor() as cursor :
+      cursor.execute(QUERY)
+      cursor.fetchall()
+    db.commit()
+
+# 여러 스레드에서 동시에 호출하여 호출별 지연 시간 측정 (PIR 연속 감지 상황 재현)
+def run(func, calls, threads) :
+  latencies = []
+  lock = threading.Lock()
+
+  def worker() :
+    local = []
+    for _ in range(calls) :
+      start = time.perf_counter()
+      func()
+      local.append((time.perf_counter() - start) * 1000)
+
+    with lock :
+      latencies.extend(local)
+
+  workers = [threading.Thread(target = worker) for _ in range(threads)]
+  start = time.perf_counter()
+
+  for thread in workers :
+    thread.start()
+
+  for thread in workers :
+    thread.join()
+
+  elapsed = time.perf_counter() - start
+  return latencies, elapsed
+
+# 측정 결과 출력
+def print_result(title, latencies, elapsed) :
+  latencies.sort()
+  p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+  print(f"[{title}]")
+  print(f"호출 수 : {len(latencies)}회 ({len(latencies) / elapsed:.1f}회/초)")
+  print(f"평균 : {statistics.mean(latencies):.2f}ms")
+  print(f"중앙값 : {statistics.median(latencies):.2f}ms")
+  print(f"p95 : {p95:.2f}ms")
+  print(f"최대 : {latencies[-1]:.2f}ms")
+  print("═" * 50)
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "데이터베이스 연결 풀 벤치마크")
+  parser.add_argument('--calls', type = int, default = 200, help = "스레드별 호출 횟수")
+  parser.add_argument('--threads', type = int, default = 3, help = "동시 호출 스레드 수")
+  parser.add_argument('--pool-size', type = int, default = 4, help = "연결 풀 최대 크기")
+  args = parser.parse_args()
+
+  print("═" * 50)
+  print(f"데이터베이스 연결 벤치마크 (스레드 {args.threads}개 × {args.calls}회)")
+  print("═" * 50)
+
+  latencies, elapsed = run(per_call_connect, args.calls, args.threads)
+  print_result("매 호출 연결", latencies, elapsed)
+
+  pool = ConnectionPool(max_size = args.pool_size)
+  try :
+    pooled(pool)                                           # 연결 생성 비용 제외 (워밍업)
+    latencies, elapsed = run(lambda : pooled(pool), args.calls, args.threads)
+    print_result("연결 풀", latencies, elapsed)
+
+  finally :
+    pool.close()
@@ -0,0 +1,152 @@
+# 팬, LED 비례 제어 벤치마크 (켜기/끄기 제어와 PWM 비례 제어의 가동 횟수, 평균 출력, 팬 소비 전력, 온도 오차 비교)
+# 시뮬레이터 환경(합성 하루 주기 또는 기록 CSV)에 측정 잡음을 더해 같은 자동 제어 경로를 실제 대기 없이 재생
+                                                                # 표준 라이브러리
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+                                                                # 로컬 모듈
+import control.multi_control as multi_control
+import config.config_manager as config_manager
+from config.constant import SETTINGS, PWM_CONFIG
+from control.pwm_control import PwmController
+from control.rule_engine import RuleEngine
+from hardware.backend import use_backend
+from hardware.sim_backend import FAN_COOLING
+from benchmark.control_hysteresis_benchmark import SENSOR_NOISE, CountingSave
+
+# 비교할 장치 (PWM_CONFIG 에 있는 장치)
+DEVICES = ('fan', 'led')
+
+# 비교할 출력 방식
+MODES = (
+  ('켜기/끄기 제어', 'switch'),
+  ('PWM 비례 제어', 'pwm')
+)
+
+# 출력 방식 하나로 시뮬레이션 실행 (비례 제어 주기마다 진행, 측정 주기마다 켜기/끄기 자동 제어)
+def run(output, trace, seed, days, interval, noise) :
+  # 실행마다 같은 환경, 같은 잡음에서 시작
+  backend = use_backend('sim', seed = seed, trace = trace, speed = 0, motion_per_hour = 0)
+  rng = random.Random(seed)
+  multi_control.outputs.close()                            # 제어 출력을 새 백엔드에서 다시 초기화
+  multi_control.pwm_duty.clear()
+
+  # 사용자 설정 파일은 임시 디렉터리에 생성 (실제 설정 파일을 건드리지 않음)
+  with tempfile.TemporaryDirectory() as directory :
+    config_manager.CONFIG_FILE = os.path.join(directory, 'user_settings.json')
+    config = config_manager.ConfigManager()
+
+    for device in DEVICES :
+      config.update_device_control(device, 'output', output)
+
+  multi_control.init_config(config)
+
+  # 최소 유지 시간, 가동률, 제어 주기, 낮/밤 구분은 가상 시계 기준
+  multi_control.engine = RuleEngine(clock = backend.clock.time)
+  multi_control.prev_state = dict.fromkeys(multi_control.engine.devices)
+  multi_control.is_daytime = lambda : 6 <= backend.clock.now % 86400 / 3600 < 18
+  multi_control.save_control = CountingSave()
+
+  controller = PwmController(clock = backend.clock.time)
+  tick = controller.tick
+  rules = multi_control.engine.refresh(config)
+
+  starts = dict.fromkeys(DEVICES, 0)
+  duty_total = dict.fromkeys(DEVICES, 0.0)
+  fan_energy = 0.0                                         # 팬 소비 전력량 (최대 출력 1시간 = 1, 전력 ∝ 듀티³)
+  error_total = 0.0                                        # 제어 가능 구간 온도 오차 합 (℃)
+  error_count = 0
+  previous = dict.fromkeys(DEVICES, 0.0)
+  reading = None
+  elapsed = 0.0
+
+  for _ in range(int(days * 86400 / tick)) :
+    backend.step(tick)
+    elapsed += tick
+
+    # 측정 주기마다 잡음을 더한 측정값으로 켜기/끄기 자동 제어 (비례 제어 장치는 제외됨)
+    if reading is None or elapsed >= interval :
+      elapsed = 0.0
+      reading = backend.environment()
+      for metric, sigma in SENSOR_NOISE.items() :
+        reading[metric] += rng.gauss(0, sigma * noise)
+      multi_control.control_all_devices(reading)
+
+    # 비례 제어는 주기마다 같은 측정 기록 방식으로 측정 (잡음 포함)
+    values = backend.environment()
+    for metric, sigma in SENSOR_NOISE.items() :
+      values[metric] += rng.gauss(0, sigma * noise)
+    controller.step(values)
+
+    # 장치 출력 세기, 가동 횟수, 팬 전력량 집계
+    for device in DEVICES :
+      level = backend.device_level(device)
+      if level > 0 and previous[device] == 0 :
+        starts[device] += 1
+      duty_total[device] += level
+      previous[device] = level
+
+    fan_energy += backend.device_level('fan') ** 3 * tick / 3600
+
+    # 팬 없는 온도가 기준 ~ 기준 + 최대 냉각량일 때(팬으로 기준 온도를 맞출 수 있는 구간) 실제 온도 오차
+    rule = rules['fan']
+    setpoint = rule.on_day if multi_control.is_daytime() else rule.on_night
+    temperature = backend.environment()['temperature']
+    if setpoint <= temperature - backend.offsets['temperature'] <= setpoint - FAN_COOLING :
+      error_total += abs(temperature - setpoint)
+      error_count += 1
+
+  controller.close()
+  multi_control.outputs.close()
+
+  steps = int(days * 86400 / tick)
+  return {
+    'starts' : starts,
+    'duty' : {device : total / steps for device, total in duty_total.items()},
+    'fan_energy' : fan_energy / days,
+    'error' : error_total / max(error_count, 1)
+  }
+
+# 실행 결과 출력
+def print_result(title, result) :
+  starts = ', '.join(f"{device.upper()} {count}" for device, count in result['starts'].items())
+  duty = ', '.join(f"{device.upper()} {value:.1%}" for device, value in result['duty'].items())
+
+  print(f"[{title}]")
+  print(f"정지 → 가동 횟수 : {starts}")
+  print(f"평균 출력 : {duty}")
+  print(f"팬 소비 전력량 : 하루 {result['fan_energy']:.2f} (최대 출력 1시간 = 1)")
+  print(f"제어 가능 구간 평균 온도 오차 : {result['error']:.2f} ℃")
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "팬, LED 비례 제어 벤치마크")
+  parser.add_argument('--days', type = float, default = 7, help = "시뮬레이션 기간 (일)")
+  parser.add_argument('--interval', type = float, default = SETTINGS['READ_INTERVAL'], help = "켜기/끄기 자동 제어 주기 (시뮬레이션 초)")
+  parser.add_argument('--noise', type = float, default = 1.0, help = "측정 잡음 배율")
+  parser.add_argument('--seed', type = int, default = 0, help = "난수 시드")
+  parser.add_argument('--trace', default = None, help = "재생할 환경 기록 CSV 경로")
+  args = parser.parse_args()
+
+  print("═" * 50)
+  print(f"팬, LED 출력 방식 비교 ({args.days:g}일, 비례 제어 주기 {PWM_CONFIG['tick']}초, 잡음 ×{args.noise:g})")
+  print("═" * 50)
+
+  results = []
+  for title, output in MODES :
+    # 모듈 상태 출력은 측정에서 제외
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull) :
+      result = run(output, args.trace, args.seed, args.days, args.interval, args.noise)
+
+    print_result(title, result)
+    results.append(result)
+
+  # 켜기/끄기 제어 대비 변화
+  before, after = results
+  print("═" * 50)
+  print(f"팬 소비 전력량 : {1 - after['fan_energy'] / max(before['fan_energy'], 1e-9):.1%} 감소")
+  print(f"평균 온도 오차 : {before['error']:.2f} → {after['error']:.2f} ℃")
+  print("정지 → 가동 횟수 : " + ', '.join(f"{device.upper()} {before['starts'][device]} → {after['starts'][device]}" for device in DEVICES))
+  print("═" * 50)
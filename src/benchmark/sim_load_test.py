@@ -0,0 +1,197 @@
+# 시뮬레이터 백엔드 부하 테스트 (라즈베리파이 없이 센서 → 제어 → 데이터베이스 저장 → 클라이언트 전송 경로를 실제 시간보다 빠르게 재생)
+                                                                # 표준 라이브러리
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+                                                                # 로컬 모듈
+import sensor.multi_sensor as multi_sensor
+import control.multi_control as multi_control
+import control.motion_detector as motion_detector
+import database.db_utils as db_utils
+import config.config_manager as config_manager
+from database.db_writer import DBWriter
+from sensor.ring_buffer import SensorRingBuffer
+from sensor.sensor_bus import SensorBus
+from control.control_trigger import ControlTrigger
+from hardware.backend import use_backend
+from network.client_channel import Broadcaster
+from network.state_model import VersionedState
+
+# 가상 웹소켓 클라이언트 (전송 시간 없음, 받은 메시지 수만 기록)
+class FakeClient :
+  def __init__(self) :
+    self.received = 0
+
+  async def send(self, payload) :
+    self.received += 1
+
+  async def close(self) :
+    pass
+
+# 데이터베이스 대신 저장 행 수만 세는 저장 함수
+class CountingWrite :
+  def __init__(self) :
+    self.rows = 0
+    self.batches = 0
+
+  def __call__(self, table, rows) :
+    self.rows += len(rows)
+    self.batches += 1
+
+# 시뮬레이션 실행 (tick 마다 step 초씩 진행)
+async def run(backend, ticks, step, clients, save_interval, control_interval) :
+  # 일괄 저장 스레드는 실제와 같이 동작하고 데이터베이스 쓰기만 행 수 세기로 대체
+  write = CountingWrite()
+  writer = DBWriter(write = write, spool = None, rollup = None, flush_interval = 0.2)
+  db_utils.writer = writer
+  writer.start()
+
+  # 사용자 설정 파일은 임시 디렉터리에 생성 (실제 설정 파일을 건드리지 않음)
+  with tempfile.TemporaryDirectory() as directory :
+    config_manager.CONFIG_FILE = os.path.join(directory, 'user_settings.json')
+    multi_control.init_config(config_manager.ConfigManager())
+
+  # DHT22 측정 간격은 가상 시계 기준 (tick 마다 실제 대기 없이 새로 측정)
+  multi_sensor.dht_reader.clock = backend.clock.time
+
+  # 장치 최소 유지 시간, 가동률, 제어 감시 주기도 가상 시계 기준
+  multi_control.engine.clock = backend.clock.time
+  multi_control.trigger = ControlTrigger(watchdog = control_interval, clock = backend.clock.time)
+
+  history = SensorRingBuffer(clock = backend.clock.time)
+  state = VersionedState()
+
+  broadcaster = Broadcaster()
+  fake_clients = [FakeClient() for _ in range(clients)]
+  for client in fake_clients :
+    broadcaster.register(client)
+
+  # 실제 시스템과 같이 측정 기록 하나를 구독자들이 나눠 씀 (처리 간격은 가상 시계 기준)
+  bus = SensorBus(clock = backend.clock.time)
+
+  bus.subscribe('최근 데이터', lambda reading : history.append(
+    timestamp = reading.timestamp,
+    temperature = reading.temperature,
+    humidity = reading.humidity,
+    soil_moisture = reading.soil_moisture,
+    light_value = reading.light_value
+  ))
+  bus.subscribe('데이터 저장', lambda reading : db_utils.save_sensor(
+    reading.temperature, reading.humidity, reading.soil_moisture, reading.light_value
+  ), interval = save_interval, align = True)
+  # 자동 제어는 측정마다 확인하고 기준 통과, 설정 변경, 낮/밤 전환 시 또는 감시 주기마다 실행
+  def control(reading) :
+    sensor_data = reading._asdict()
+    if multi_control.control_due(sensor_data) is not None :
+      multi_control.control_all_devices(sensor_data)
+
+  bus.subscribe('자동 제어', control)
+
+  # 바뀐 항목만 클라이언트에게 전송
+  def send_state(reading) :
+    version = state.version
+    state.update({
+      'temperature' : reading.temperature,
+      'humidity' : reading.humidity,
+      'soil_moisture' : reading.soil_moisture,
+      'light_value' : reading.light_value,
+      **multi_control.get_device_status()
+    })
+    if state.version != version :
+      broadcaster.broadcast({'command' : 'state', **state.since(version)})
+
+  bus.subscribe('클라이언트 전송', send_state)
+
+  # 모션 감지는 가상 시계 기준으로 떨림, 재감지 무시 시간 적용 (부저 없이 - 알람 연장 안 함)
+  detector = motion_detector.MotionEdgeDetector(gpio = backend.gpio, clock = backend.clock.time, player = None)
+  detector.start()
+
+  motions = 0
+  start = time.perf_counter()
+
+  for tick in range(ticks) :
+    backend.step(step)
+
+    # 센서 측정 (센서별 1회) 후 모든 구독자에게 전달
+    bus.publish(multi_sensor.sample_sensors(timestamp = backend.clock.now))
+
+    # 모션 감지 이벤트 처리 (부저 없이 저장, 알림만)
+    while detector.wait_event(timeout = 0) is not None :
+      motions += 1
+      db_utils.save_control(motion = 1)
+      broadcaster.broadcast({'command' : 'alert', 'type' : 'motion', 'tick' : tick})
+
+    # 클라이언트 전송 작업이 실행될 기회 제공
+    await asyncio.sleep(0)
+
+  elapsed = time.perf_counter() - start
+
+  # 남은 전송, 저장 완료 대기
+  await asyncio.sleep(0.1)
+  writer.stop()
+  detector.stop()
+  metrics = broadcaster.metrics()
+  bus_stats = bus.get_stats()
+
+  for client in fake_clients :
+    await broadcaster.unregister(client)
+
+  return {
+    'elapsed' : elapsed,
+    'controls' : multi_control.trigger.get_stats(),
+    'bus' : bus_stats,
+    'motions' : motions,
+    'writer' : writer.get_stats(),
+    'rows' : write.rows,
+    'batches' : write.batches,
+    'broadcast' : metrics,
+    'received' : sum(client.received for client in fake_clients),
+    'toggles' : backend.gpio.writes
+  }
+
+# 측정 결과 출력
+def print_result(result, ticks, step) :
+  simulated = ticks * step
+  elapsed = result['elapsed']
+
+  print(f"처리 속도 : {ticks / elapsed:,.0f} tick/초 ({elapsed:.2f}초)")
+  print(f"시뮬레이션 시간 : {simulated / 3600:.1f}시간 (실제 시간의 {simulated / elapsed:,.0f}배)")
+  controls = result['controls']
+  print(f"자동 제어 : 확인 {controls['checks']}회, 실행 {controls['runs']}회 {controls['reasons']}, 장치 출력 변경 {result['toggles']}회")
+  print(f"모션 감지 : {result['motions']}회")
+  print(f"데이터베이스 저장 : {result['rows']}행 / {result['batches']}회 (버림 {result['writer']['dropped']})")
+  print(f"클라이언트 전송 : {result['received']}건 (버림 {result['broadcast']['dropped']})")
+
+  # 구독자별 측정 기록 1건 처리 시간
+  for name, stats in result['bus']['subscribers'].items() :
+    average = stats['seconds'] / stats['calls'] * 1e6 if stats['calls'] else 0
+    print(f"구독 처리 - {name} : {stats['calls']}회, 평균 {average:.1f}us (오류 {stats['errors']})")
+  print("═" * 50)
+
+# 독립 실행 모드
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "시뮬레이터 백엔드 부하 테스트")
+  parser.add_argument('--ticks', type = int, default = 10000, help = "시뮬레이션 tick 수")
+  parser.add_argument('--step', type = float, default = 60, help = "tick 당 시뮬레이션 시간 (초)")
+  parser.add_argument('--clients', type = int, default = 50, help = "가상 클라이언트 수")
+  parser.add_argument('--seed', type = int, default = 0, help = "난수 시드")
+  parser.add_argument('--trace', default = None, help = "재생할 환경 기록 CSV 경로")
+  parser.add_argument('--save-interval', type = float, default = 3600, help = "환경 데이터 저장 주기 (시뮬레이션 초)")
+  parser.add_argument('--control-interval', type = float, default = 1800, help = "자동 제어 감시 주기 (시뮬레이션 초)")
+  args = parser.parse_args()
+
+  # 실제 시간과 관계없이 tick 마다 직접 진행 (하드웨어는 처음 사용할 때 초기화되므로 모듈을 불러온 뒤 지정해도 됨)
+  backend = use_backend('sim', seed = args.seed, trace = args.trace, speed = 0)
+
+  print("═" * 50)
+  print(f"시뮬레이터 부하 테스트 ({args.ticks} tick × {args.step:g}초, 클라이언트 {args.clients}개)")
+  print("═" * 50)
+
+  # 모듈 상태 출력은 측정에서 제외
+  with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull) :
+    result = asyncio.run(run(backend, args.ticks, args.step, args.clients, args.save_interval, args.control_interval))
+
+  print_result(result, args.ticks, args.step)
@@ -4,7 +4,7 @@ import json
 import os
 from datetime import datetime
                                                                 # 로컬 모듈
-from config.constant import SETTINGS
+from config.constant import SETTINGS, DEVICE_CONTROL, PWM_CONFIG
 
 # 설정 파일 경로
 CONFIG_FILE = 'user_settings.json'
@@ -13,10 +13,47 @@ CONFIG_FILE = 'user_settings.json'
 def datetime_stamp():
   return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
+# 장치 제어 동작 출력 방식
+OUTPUT_MODES = ('switch', 'pwm')
+
+# 장치 제어 동작 설정값 검증 (장치, 항목, 값 형식과 범위) - 검증한 값 반환, 잘못된 값이면 ValueError
+# 저장된 값은 규칙 엔진이 숫자로 비교하므로 문자열 숫자("60") 등이 저장되면 자동 제어가 멈춤
+def validate_device_control(device, key, value) :
+  if device not in DEVICE_CONTROL :
+    raise ValueError(f"알 수 없는 장치 : {device}")
+
+  if key not in DEVICE_CONTROL[device] :
+    raise ValueError(f"알 수 없는 제어 동작 항목 : {key} (사용 가능 : {', '.join(DEVICE_CONTROL[device])})")
+
+  if key == 'output' :
+    if value not in OUTPUT_MODES :
+      raise ValueError(f"알 수 없는 출력 방식 : {value} (사용 가능 : {', '.join(OUTPUT_MODES)})")
+
+    if value == 'pwm' and device not in PWM_CONFIG['devices'] :
+      raise ValueError(f"{device} 는 비례 제어를 지원하지 않습니다")
+
+    return value
+
+  # 숫자 항목 (bool 은 int 의 하위 형식이므로 제외)
+  if isinstance(value, bool) or not isinstance(value, (int, float)) :
+    raise ValueError(f"{key} 값은 숫자여야 합니다 : {value!r}")
+
+  if key == 'max_duty' and not 0 < value <= 1 :
+    raise ValueError(f"max_duty 값은 0 초과 1 이하여야 합니다 : {value}")
+
+  if key == 'duty_window' and value <= 0 :
+    raise ValueError(f"duty_window 값은 0 보다 커야 합니다 : {value}")
+
+  if value < 0 :
+    raise ValueError(f"{key} 값은 0 이상이어야 합니다 : {value}")
+
+  return value
+
 # 설정 관리 클래스 - JSON 파일로 사용자 설정을 영구 보관하고 관리
 class ConfigManager :
   def __init__(self) :
     self.settings = None                                       # 설정 데이터를 저장하는 변수
+    self.version = 0                                           # 설정 변경 횟수 (바뀔 때마다 증가, 제어 규칙 재컴파일 판단용)
     self.load_settings()                                       # 설정 파일 로드
   
   # 사용자 설정 데이터 불러오기
@@ -26,6 +63,8 @@ class ConfigManager :
       if os.path.exists(CONFIG_FILE) :
         with open(CONFIG_FILE, 'r', encoding = 'utf-8') as f :
           self.settings = json.load(f)
+        self._drop_invalid_device_control()
+        self.version += 1
       
       else :
         self._create_defaults()
@@ -34,6 +73,16 @@ class ConfigManager :
       print(f"사용자 설정 관리 시스템 로드 오류 : {e}")
       self._create_defaults()
   
+  # 저장된 장치 제어 동작 중 잘못된 값 제거 (기본값 사용, 이전 버전에서 검증 없이 저장된 값 대비)
+  def _drop_invalid_device_control(self) :
+    for device, values in self.settings.get('device_control', {}).items() :
+      for key, value in list(values.items()) :
+        try :
+          validate_device_control(device, key, value)
+        except ValueError as e :
+          print(f"저장된 장치 제어 동작 설정 무시 : {e}")
+          del values[key]
+
   # constant.py의 기본 설정 데이터 생성
   def _create_defaults(self) :
     self.settings = {
@@ -66,6 +115,9 @@ class ConfigManager :
         'pump' : False
       },
 
+      # 장치별 제어 동작 (히스테리시스, 최소 켜짐/꺼짐 시간, 최대 가동률)
+      'device_control' : {device : dict(values) for device, values in DEVICE_CONTROL.items()},
+
       # 메타 정보
       'created_at' : datetime_stamp(),
       'last_modified': datetime_stamp()
@@ -76,6 +128,8 @@ class ConfigManager :
   
   # 설정 데이터 저장
   def save_settings(self) :
+    self.version += 1                                          # 저장 실패해도 메모리 설정은 바뀌었으므로 먼저 증가
+
     try :
       # 마지막 수정 시간 업데이트
       self.settings['last_modified'] = datetime_stamp()
@@ -116,6 +170,16 @@ class ConfigManager :
   def get_device_state(self, device) :
     return self.settings['manual_states'].get(device, False)
     
+  # 장치 제어 동작 설정 가져오기 (저장된 설정에 없는 장치, 항목은 기본값)
+  def get_device_control(self, device) :
+    return {**DEVICE_CONTROL.get(device, {}), **self.settings.get('device_control', {}).get(device, {})}
+
+  # 장치 제어 동작 설정 변경 및 저장 (잘못된 장치, 항목, 값이면 ValueError)
+  def update_device_control(self, device, key, value) :
+    value = validate_device_control(device, key, value)
+    self.settings.setdefault('device_control', {}).setdefault(device, {})[key] = value
+    return self.save_settings()
+
   # 모든 설정 가져오기
   def get_all_settings(self) :
     return self.settings
@@ -146,4 +210,9 @@ if __name__ == "__main__" :
   dm = settings['device_modes']
   print(f"LED : {dm['led']}")
   print(f"팬 : {dm['fan']}")
-  print(f"펌프 : {dm['pump']}")
\ No newline at end of file
+  print(f"펌프 : {dm['pump']}")
+
+  print("\n[장치 제어 동작]")
+  for device in dm :
+    dc = config.get_device_control(device)
+    print(f"{device.upper()} : 히스테리시스 {dc['hysteresis']}, 최소 켜짐 {dc['min_on']}초, 최소 꺼짐 {dc['min_off']}초, 최대 가동률 {dc['max_duty']:.0%}")
\ No newline at end of file
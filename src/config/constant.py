@@ -18,7 +18,8 @@ SETTINGS = {
   # 데이터 수집 관련 시간 설정
   'SAVE_INTERVAL': 3600,                   # 환경 데이터 저장 주기 (초) - 1시간
   'READ_INTERVAL': 60,                     # 환경 데이터 체크 주기 (초) - 1분
-  'CONTROL_INTERVAL' : 300,                # 제어 시스템 체크 주기 (초) - 5분
+  'CONTROL_INTERVAL' : 1800,               # 제어 시스템 감시 주기 (초) - 30분 (측정값 변화가 없어도 이 간격마다 제어 실행)
+  'HISTORY_SIZE' : 7 * 24 * 60,            # 최근 측정 데이터 메모리 보관 개수 - 1분 간격 7일
 
   # MCP3008 ADC 채널 설정
   'SOIL_CHANNEL': 0,                       # FC-28 토양 수분 센서 MCP3008 채널
@@ -47,6 +48,17 @@ SETTINGS = {
 
   'ALARM_FREQ' : [262, 330],               # 알람 주파수 (Hz)
   'ALARM_REPEAT' : 5,                      # 알람 반복 횟수
+
+  # 모션 감지 방식 설정
+  'MOTION_MODE' : 'edge',                  # 모션 감지 방식 (edge : GPIO 인터럽트, poll : 1초 주기 확인)
+  'MOTION_DEBOUNCE_MS' : 200,              # PIR 신호 떨림 무시 시간 (ms)
+  'MOTION_COOLDOWN' : 5,                   # 모션 감지 후 재감지 무시 시간 (초)
+
+  # 하드웨어 백엔드 설정 (환경 변수 FARM_HARDWARE 가 있으면 우선 적용)
+  'HARDWARE_BACKEND' : 'rpi',              # 하드웨어 백엔드 (rpi : 라즈베리파이, sim : 시뮬레이터)
+
+  # 실행 방식 설정 (환경 변수 FARM_RUNTIME 이 있으면 우선 적용)
+  'RUNTIME_MODE' : 'threads',              # 실행 방식 (threads : 작업별 스레드, async : 단일 이벤트 루프)
 }
 
 # 데이터베이스 연결 설정
@@ -55,5 +67,171 @@ DATABASE_CONFIG = {
   'user': '...',                           # 데이터베이스 사용자명
   'password': '...',                       # 데이터베이스 비밀번호
   'database': '...',                       # 데이터베이스명
-  'charset': 'utf8'                        # 데이터베이스 문자 인코딩 (UTF-8, 한글 지원)
+  'charset': 'utf8',                       # 데이터베이스 문자 인코딩 (UTF-8, 한글 지원)
+  'connect_timeout': 5                     # 데이터베이스 연결 제한 시간 (초)
+}
+
+# 데이터베이스 연결 풀 설정
+DB_POOL_CONFIG = {
+  'max_size': 4,                           # 최대 연결 수 (센서, 제어, 모션 스레드 + 여유 1개)
+  'acquire_timeout': 5,                    # 연결 대기 제한 시간 (초)
+  'health_check_interval': 30              # 유휴 연결 상태 확인 주기 (초)
+}
+
+# 데이터베이스 일괄 저장 설정
+DB_WRITER_CONFIG = {
+  'queue_size': 1000,                      # 저장 대기열 최대 크기
+  'batch_size': 50,                        # 한 번에 저장할 최대 행 수
+  'flush_interval': 5,                     # 대기열 저장 주기 (초)
+  'overflow_policy': 'drop_oldest',        # 대기열 가득 찰 때 정책 (block, drop_oldest, drop_newest)
+  'block_timeout': 0.5                     # block 정책 대기 제한 시간 (초)
+}
+
+# 데이터베이스 연결 장애 시 로컬 임시 저장 설정
+DB_SPOOL_CONFIG = {
+  'path': 'db_spool.sqlite3',              # 로컬 임시 저장 파일 경로 (SQLite)
+  'replay_batch': 500,                     # 복구 시 한 번에 재전송할 최대 행 수
+  'retry_interval': 60,                    # 데이터베이스 복구 확인 주기 (초)
+  'max_rows': 1000000                      # 최대 보관 행 수 (초과 시 가장 오래된 행부터 삭제)
+}
+
+# 시간별, 일별 집계 테이블 관리 설정
+ROLLUP_CONFIG = {
+  'interval': 600,                         # 집계 갱신 주기 (초) - 10분
+  'max_days_per_run': 7,                   # 한 번에 집계할 최대 기간 (일) - 일괄 저장 지연 방지
+  'settle': 60                             # 진행 위치를 늦출 시간 (초) - 저장 대기열에 남은 행(저장 주기 5초)이 저장된 뒤 시간 구간 확정
+}
+
+# MCP3008 토양 수분, 조도 일괄 측정 설정
+ADC_SAMPLER_CONFIG = {
+  'oversample': 5,                         # 채널별 측정 횟수 (홀수 권장 - 중앙값)
+  'filter': 'median',                      # 필터 (median : 중앙값, ema : 평균의 지수 이동 평균)
+  'ema_alpha': 0.3,                        # 지수 이동 평균 가중치 (새 측정값 비율)
+  'max_age': 60                            # 측정 결과 재사용 최대 시간 (초) - 실시간 체크 주기
+}
+
+# DHT22 온습도 센서 측정 설정 (측정 스레드 하나만 센서를 읽고 다른 곳은 마지막 정상값 사용)
+DHT_READER_CONFIG = {
+  'period': 5,                             # 측정 주기 (초) - 센서 최소 측정 간격 2초 이상
+  'max_age': 30,                           # 마지막 정상값 최대 허용 경과 시간 (초) - 넘으면 수신 실패 처리
+  'max_attempts': 3                        # 측정 스레드 없이 직접 읽을 때 최대 시도 횟수
+}
+
+# 하드웨어 시뮬레이터 설정 (HARDWARE_BACKEND 가 sim 일 때 사용)
+SIMULATOR_CONFIG = {
+  'seed': 0,                               # 잡음, 모션 발생 난수 시드 (같은 시드면 같은 결과)
+  'trace': None,                           # 재생할 환경 기록 CSV 경로 (None 이면 합성 하루 주기 데이터)
+  'dht_failure_rate': 0.0,                 # DHT22 읽기 실패 확률 (0 ~ 1)
+  'adc_noise': 4.0,                        # ADC 측정 잡음 표준편차 (원시값 단위)
+  'adc_spike_rate': 0.01,                  # ADC 순간 튀는 값 발생 확률 (0 ~ 1)
+  'motion_per_hour': 2,                    # 시간당 평균 모션 발생 횟수
+  'speed': 1.0                             # 실제 1초당 시뮬레이션 시간 (0 이면 부하 테스트처럼 직접 진행)
+}
+
+# 단일 이벤트 루프 실행 설정 (RUNTIME_MODE 가 async 일 때 사용)
+ASYNC_RUNTIME_CONFIG = {
+  'hardware_workers': 2,                   # 하드웨어 작업 스레드 수 (센서 측정, 장치 제어)
+  'database_workers': 2,                   # 데이터베이스 작업 스레드 수 (일괄 저장, 기간별 조회)
+  'executor_limit': 8,                     # 실행기별 동시 요청 최대 수 (초과 요청은 빈자리가 날 때까지 대기)
+  'lag_interval': 1.0,                     # 이벤트 루프 지연 측정 주기 (초)
+  'lag_warning': 0.1                       # 이벤트 루프 지연 경고 기준 (초)
+}
+
+# 주기 작업 일정 설정 (측정, 저장, 제어 주기)
+SCHEDULER_CONFIG = {
+  'align': True,                           # 실제 시각 정각 경계 정렬 (1분 측정은 매분 0초, 1시간 저장은 매시 정각)
+  'resync': 1.0                            # 실제 시각과 이 시간(초) 넘게 어긋나면 다시 맞춤 (시계 동기화 대응)
+}
+
+# 장치별 자동 제어 규칙 (장치 추가 시 SETTINGS 의 '<장치>_PIN', 이 규칙, DEVICE_CONTROL 기본값만 추가, 작물이 바뀌면 설정값만 변경)
+# direction : above 면 측정값이 켜짐 기준 이상일 때, below 면 기준 미만일 때 켬
+# on, off : 켜짐, 꺼짐 기준 사용자 설정 키 (낮, 밤 기준이 다르면 {'day' : 키, 'night' : 키}, off 가 없으면 on 기준 ± 히스테리시스)
+CONTROL_RULES = {
+  'led' : {
+    'metric' : 'light_value',              # 판단 측정 항목 - 조도
+    'direction' : 'below',                 # 어두우면 켬
+    'on' : 'light_threshold',              # 켜짐 기준 설정 키
+    'active_low' : False                   # 신호 반전 여부 (LOW = ON)
+  },
+  'fan' : {
+    'metric' : 'temperature',              # 판단 측정 항목 - 온도
+    'direction' : 'above',                 # 더우면 켬
+    'on' : {'day' : 'fan_day', 'night' : 'fan_night'},
+    'active_low' : True
+  },
+  'pump' : {
+    'metric' : 'soil_moisture',            # 판단 측정 항목 - 토양 수분
+    'direction' : 'below',                 # 건조하면 켬
+    'on' : 'soil_min',                     # 최저 설정값 미만이면 가동
+    'off' : 'soil_max',                    # 최고 설정값에 도달하면 정지 (사이에서는 현재 상태 유지)
+    'active_low' : True
+  }
+}
+
+# 장치별 제어 동작 기본값 (사용자 설정 device_control 항목 초기값, 기준 근처 측정 잡음에 의한 잦은 켜고 끄기 방지)
+# hysteresis : 꺼짐 기준과 켜짐 기준의 간격 (측정 단위, 꺼짐 기준 설정 키가 있는 장치는 사용 안 함)
+# min_on, min_off : 최소 켜짐, 꺼짐 유지 시간 (초) / max_duty : duty_window 초 동안 최대 가동 비율 (1.0 이면 제한 없음)
+# output : switch 면 켜기/끄기, pwm 이면 PWM_CONFIG 의 PI 제어로 출력 세기 조절 (PWM_CONFIG 에 있는 장치만)
+DEVICE_CONTROL = {
+  'led' : {
+    'output' : 'switch',                   # 출력 방식 (switch : 켜기/끄기, pwm : 비례 제어)
+    'hysteresis' : 200,                    # 켜짐 400 미만 → 꺼짐 600 이상 (LED 불빛이 조도 센서에 더해지는 양보다 크게)
+    'min_on' : 1800,                       # 최소 켜짐 30분
+    'min_off' : 600,                       # 최소 꺼짐 10분
+    'max_duty' : 1.0,
+    'duty_window' : 3600
+  },
+  'fan' : {
+    'output' : 'switch',
+    'hysteresis' : 1.0,                    # 기준 온도보다 1℃ 내려가면 정지
+    'min_on' : 300,                        # 최소 가동 5분
+    'min_off' : 300,                       # 최소 정지 5분
+    'max_duty' : 1.0,
+    'duty_window' : 3600
+  },
+  'pump' : {
+    'output' : 'switch',
+    'hysteresis' : 0,                      # 토양 수분 최저, 최고 설정값 사용
+    'min_on' : 60,                         # 최소 가동 1분
+    'min_off' : 900,                       # 최소 정지 15분 (준 물이 센서까지 스며드는 시간)
+    'max_duty' : 0.25,                     # 1시간 중 최대 15분 가동 (센서 고장 시 과습 방지)
+    'duty_window' : 3600                   # 가동률 계산 구간 (초)
+  }
+}
+
+# 낮/밤 구분 설정 (시간대별 팬 가동 기준 온도 등 제어 기준 전환 시각)
+DAYLIGHT_CONFIG = {
+  'mode' : 'fixed',                        # 구분 방식 (fixed : 고정 시각, crop : 작물별 광주기, solar : 위치별 일출/일몰)
+  'day_start' : '06:00',                   # 고정 시각 - 낮 시작
+  'day_end' : '18:00',                     # 고정 시각 - 낮 끝 (밤 시작)
+  'crop' : 'strawberry',                   # 작물별 광주기 - crop_config.py 의 작물 이름
+  'latitude' : 37.57,                      # 일출/일몰 계산 위도 (북위 +)
+  'longitude' : 126.98,                    # 일출/일몰 계산 경도 (동경 +)
+  'sunrise_offset' : 0,                    # 일출 시각 보정 (분, + 면 늦게)
+  'sunset_offset' : 0,                     # 일몰 시각 보정 (분, + 면 늦게)
+  'timezone' : 'Asia/Seoul'                # 시간대 (IANA 이름)
+}
+
+# 팬, LED 비례 제어 설정 (DEVICE_CONTROL 의 output 이 pwm 인 장치, 켜짐 기준을 설정값으로 PI 제어)
+PWM_CONFIG = {
+  'tick' : 5,                              # 비례 제어 주기 (초) - 환경 센서 측정 주기보다 빠르게
+  'history' : 24 * 3600,                   # 장치별 듀티 기록 보관 시간 (초) - 제어 주기마다 1바이트
+  'devices' : {
+    'fan' : {
+      'frequency' : 25,                    # PWM 주파수 (Hz)
+      'kp' : 25.0,                         # 비례 이득 (%/℃) - 기준보다 1℃ 높으면 25%
+      'ki' : 0.05,                         # 적분 이득 (%/℃·초) - 1℃ 높은 상태가 10분 지속되면 30% 추가
+      'rate' : 5.0,                        # 초당 최대 출력 변화 (%/초) - 급가속 방지
+      'min_duty' : 25,                     # 최소 가동 출력 (%) - 이보다 낮으면 모터가 돌지 않으므로 정지
+      'min_off' : 300                      # 정지 후 재가동까지 최소 대기 시간 (초) - 측정 잡음에 의한 잦은 재가동 방지
+    },
+    'led' : {
+      'frequency' : 1000,
+      'kp' : 0.5,                          # 비례 이득 (%/조도) - 기준보다 100 어두우면 50%
+      'ki' : 0.001,                        # 적분 이득 (%/조도·초)
+      'rate' : 2.0,                        # 초당 최대 출력 변화 (%/초) - 깜박임 방지
+      'min_duty' : 10,                     # 최소 켜짐 출력 (%) - 측정 잡음으로 0% 근처에서 켜졌다 꺼지는 것 방지
+      'min_off' : 600
+    }
+  }
 }
\ No newline at end of file
@@ -43,6 +43,12 @@ CROP_SETTINGS = {
     "fan" : {
       "day_threshold" : SETTINGS["FAN_ON_DAY"],              # 낮 시간대 팬 가동 기준 온도
       "night_threshold" : SETTINGS["FAN_ON_NIGHT"]           # 밤 시간대 팬 가동 기준 온도
+    },
+
+    # 광주기 설정 (낮/밤 구분 방식이 crop 일 때 사용)
+    "photoperiod" : {
+      "day_start" : "06:00",                                 # 낮 시작 시각
+      "day_end" : "18:00"                                    # 낮 끝 시각
     }
   }
 }
\ No newline at end of file
@@ -0,0 +1,60 @@
+# 농작물 환경 모니터링을 위한 자동 제어 실행 판단 (의미 있는 변화가 있을 때만 제어, 감시 주기로 최소 실행 보장)
+                                                                # 표준 라이브러리
+import math
+import time
+                                                                # 로컬 모듈
+from config.constant import SETTINGS
+
+# 자동 제어 실행 판단 클래스 - 측정 기록마다 확인하고 아래 경우에만 제어 실행
+# - 자동 모드 장치의 측정값이 켜짐/꺼짐 기준을 넘어 상태가 바뀔 수 있을 때 (threshold)
+# - 사용자 설정이 바뀌었을 때 (config), 낮/밤이 바뀌었을 때 (daytime)
+# - 마지막 제어 후 감시 주기가 지났을 때 (watchdog, 센서나 판단 오류에 대비한 안전 장치)
+class ControlTrigger :
+  def __init__(self, watchdog = SETTINGS['CONTROL_INTERVAL'], clock = time.monotonic) :
+    self.watchdog = watchdog                                   # 변화가 없어도 제어를 실행할 최대 간격 (초)
+    self.clock = clock
+    self.last_run = -math.inf                                  # 마지막 제어 실행 시각 (monotonic)
+    self.daytime = None                                        # 마지막 제어 시 낮/밤 구분
+
+    self.checks = 0                                            # 실행 판단 횟수
+    self.runs = 0                                              # 제어 실행 횟수
+    self.reasons = {}                                          # 실행 사유별 횟수
+
+  # 제어 실행이 필요한지 판단 - 실행 사유 반환 (필요 없으면 None, skip 장치는 기준 통과 확인 제외)
+  def check(self, engine, config, sensor_data, daytime, skip = ()) :
+    self.checks += 1
+    now = self.clock()
+
+    if now - self.last_run >= self.watchdog :
+      reason = 'watchdog'
+
+    elif config.version != engine.version :
+      reason = 'config'
+
+    elif daytime != self.daytime :
+      reason = 'daytime'
+
+    else :
+      # 자동 모드 장치만 기준 통과 확인
+      devices = [device for device in engine.devices if device not in skip and config.get_device_mode(device) == 'auto']
+      if not engine.crossed(sensor_data, daytime, devices, now) :
+        return None
+
+      reason = 'threshold'
+
+    self.reasons[reason] = self.reasons.get(reason, 0) + 1
+    return reason
+
+  # 제어 실행 기록
+  def ran(self, daytime) :
+    self.last_run = self.clock()
+    self.daytime = daytime
+    self.runs += 1
+
+  # 실행 판단 통계
+  def get_stats(self) :
+    return {
+      'checks' : self.checks,
+      'runs' : self.runs,
+      'reasons' : dict(self.reasons)
+    }
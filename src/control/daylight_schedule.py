@@ -0,0 +1,167 @@
+# 농작물 환경 모니터링을 위한 낮/밤 일정 (다음 전환 시각을 미리 계산해 두고 평소에는 저장된 구분만 읽음)
+                                                                # 표준 라이브러리
+import asyncio
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+                                                                # 로컬 모듈
+from config.constant import DAYLIGHT_CONFIG
+from config.crop_config import CROP_SETTINGS
+
+# 낮/밤 구분 방식
+DAYLIGHT_MODES = ('fixed', 'crop', 'solar')
+
+# 전환 대기 중 다시 확인할 최대 간격 (초) - 시계 동기화 등으로 실제 시각이 바뀌어도 늦지 않게
+MAX_WAIT = 60
+
+# 'HH:MM' 문자열을 (시, 분) 으로 변환
+def parse_clock(text) :
+  hour, minute = text.split(':')
+  return int(hour), int(minute)
+
+# 날짜의 일출, 일몰 시각 (epoch 초) - NOAA 근사식으로 위도, 경도만으로 계산 (네트워크 불필요, 오차 수 분 이내)
+# 해가 뜨지 않는 날은 None, 지지 않는 날은 하루 전체
+def solar_window(day, latitude, longitude) :
+  gamma = 2 * math.pi / 365 * (day.timetuple().tm_yday - 1)
+
+  # 균시차 (분), 태양 적위 (라디안)
+  eqtime = 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                     - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+  decl = (0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma) - 0.006758 * math.cos(2 * gamma)
+          + 0.000907 * math.sin(2 * gamma) - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma))
+
+  # 일출, 일몰 시간각 (대기 굴절, 태양 반지름 보정 90.833도)
+  lat = math.radians(latitude)
+  cos_ha = math.cos(math.radians(90.833)) / (math.cos(lat) * math.cos(decl)) - math.tan(lat) * math.tan(decl)
+  if cos_ha >= 1 :
+    return None
+
+  ha = math.degrees(math.acos(max(-1.0, cos_ha)))
+
+  # UTC 자정 기준 분 → epoch 초 (경도가 크면 음수가 되어 전날 UTC 로 넘어감)
+  midnight = datetime(day.year, day.month, day.day, tzinfo = timezone.utc).timestamp()
+  sunrise = midnight + (720 - 4 * (longitude + ha) - eqtime) * 60
+  sunset = midnight + (720 - 4 * (longitude - ha) - eqtime) * 60
+  return sunrise, sunset
+
+# 낮/밤 일정 클래스 - 설정된 광주기(고정 시각, 작물별 시각, 위치별 일출/일몰)로 다음 전환 시각을 계산해 두고
+# 현재 시각이 전환 시각에 도달했을 때만 다시 계산 (평소 판단은 시각 비교 한 번)
+class DaylightSchedule :
+  def __init__(self, mode = None, config = DAYLIGHT_CONFIG, wall = time.time) :
+    self.mode = mode or config['mode']                         # 낮/밤 구분 방식
+    self.config = config
+    self.wall = wall
+
+    if self.mode not in DAYLIGHT_MODES :
+      raise ValueError(f"알 수 없는 낮/밤 구분 방식 : {self.mode} (사용 가능 : {', '.join(DAYLIGHT_MODES)})")
+
+    # 시간대 (시간대 정보가 없으면 시스템 시간대)
+    try :
+      self.tz = ZoneInfo(config['timezone'])
+    except Exception as e :
+      print(f"시간대 설정 오류 : {e} - 시스템 시간대 사용")
+      self.tz = datetime.now().astimezone().tzinfo
+
+    self.daytime = False                                       # 현재 낮 여부
+    self.next_change = -math.inf                               # 다음 전환 확인 시각 (epoch 초)
+    self._computed_at = math.inf                               # 마지막 계산 시각 (시계가 뒤로 가면 다시 계산)
+    self.transitions = 0                                       # 낮/밤 전환 횟수
+    self._lock = threading.Lock()                              # 제어, 낮/밤 전환 스레드의 동시 재계산 방지
+
+  # 날짜의 낮 구간 (시작, 끝 epoch 초) - 낮이 없으면 None
+  def day_window(self, day) :
+    if self.mode == 'solar' :
+      window = solar_window(day, self.config['latitude'], self.config['longitude'])
+      if window is None :
+        return None
+
+      sunrise, sunset = window
+      return sunrise + self.config['sunrise_offset'] * 60, sunset + self.config['sunset_offset'] * 60
+
+    if self.mode == 'crop' :
+      period = CROP_SETTINGS[self.config['crop']]['photoperiod']
+    else :
+      period = self.config
+
+    start, end = (parse_clock(period[key]) for key in ('day_start', 'day_end'))
+    return tuple(
+      datetime(day.year, day.month, day.day, hour, minute, tzinfo = self.tz).timestamp()
+      for hour, minute in (start, end)
+    )
+
+  # 현재 낮/밤 구분과 다음 전환 시각 계산 (어제 ~ 내일 낮 구간 기준)
+  def refresh(self, now = None) :
+    now = self.wall() if now is None else now
+    day = datetime.fromtimestamp(now, self.tz).date()
+
+    daytime = False
+    boundaries = []
+    for offset in (-1, 0, 1) :
+      window = self.day_window(day + timedelta(days = offset))
+      if window is None :
+        continue
+
+      start, end = window
+      daytime = daytime or start <= now < end
+      boundaries += [boundary for boundary in window if boundary > now]
+
+    # 전환이 없는 날(극야, 백야)은 다음 자정에 다시 계산
+    midnight = datetime.combine(day + timedelta(days = 1), datetime.min.time(), tzinfo = self.tz).timestamp()
+
+    if daytime != self.daytime and self.next_change != -math.inf :
+      self.transitions += 1
+
+    self.daytime = daytime
+    self.next_change = min(boundaries, default = midnight)
+    self._computed_at = now
+    return daytime
+
+  # 현재 낮 여부 (전환 시각 전에는 저장된 값만 반환)
+  def is_daytime(self, now = None) :
+    now = self.wall() if now is None else now
+
+    with self._lock :
+      if now >= self.next_change or now < self._computed_at :
+        self.refresh(now)
+
+      return self.daytime
+
+  # 다음 전환까지 남은 시간 (초)
+  def delay(self, now = None) :
+    now = self.wall() if now is None else now
+    self.is_daytime(now)
+    return max(0.0, self.next_change - now)
+
+  # 다음 낮/밤 전환까지 대기 후 새 구분 반환 (작업 스레드용, stop 이벤트가 설정되면 None)
+  def wait(self, stop = None) :
+    daytime = self.is_daytime()
+
+    while self.is_daytime() == daytime :
+      delay = min(self.delay(), MAX_WAIT)
+
+      if stop is None :
+        time.sleep(delay)
+      elif stop.wait(delay) :
+        return None
+
+    return self.daytime
+
+  # 다음 낮/밤 전환까지 대기 후 새 구분 반환 (이벤트 루프용)
+  async def wait_async(self) :
+    daytime = self.is_daytime()
+
+    while self.is_daytime() == daytime :
+      await asyncio.sleep(min(self.delay(), MAX_WAIT))
+
+    return self.daytime
+
+  # 낮/밤 일정 정보 (다음 전환 시각은 현지 시각 문자열)
+  def get_stats(self) :
+    return {
+      'mode' : self.mode,
+      'daytime' : self.is_daytime(),
+      'next_change' : datetime.fromtimestamp(self.next_change, self.tz).strftime('%Y-%m-%d %H:%M:%S'),
+      'transitions' : self.transitions
+    }
@@ -1,12 +1,15 @@
 # 농작물 환경 모니터링을 위한 모션 센서 및 부저 알람 시스템
                                                                 # 표준 라이브러리
+import math
+import threading
 import time
 from datetime import datetime
-                                                                # 외부 라이브러리
-import RPi.GPIO as GPIO
+from queue import Queue, Empty, Full
                                                                 # 로컬 모듈
 from config.constant import SETTINGS
 from database.db_utils import save_control
+from hardware.backend import get_backend
+from hardware.lifecycle import Resource
 
 # GPIO 핀 설정 (constant.py에서 불러오기)
 PIR_PIN = SETTINGS['PIR_PIN']                              # PIR 모션 센서용 GPIO 핀
@@ -16,43 +19,159 @@ BUZZER_PIN = SETTINGS['BUZZER_PIN']                        # 부저용 GPIO 핀
 ALARM_FREQ = SETTINGS['ALARM_FREQ']                        # 알람 주파수 (Hz) [낮은음, 높은음]
 ALARM_REPEAT = SETTINGS['ALARM_REPEAT']                    # 알람 반복 횟수
 
-# GPIO 초기화 설정
-GPIO.setwarnings(False)                                    # GPIO 경고 메시지 비활성화
-GPIO.setmode(GPIO.BCM)                                     # BCM 모드 사용 (다른 모듈과 통일)
+# 인터럽트 감지 설정 (constant.py에서 불러오기)
+MOTION_DEBOUNCE_MS = SETTINGS['MOTION_DEBOUNCE_MS']        # PIR 신호 떨림 무시 시간 (ms)
+MOTION_COOLDOWN = SETTINGS['MOTION_COOLDOWN']              # 모션 감지 후 재감지 무시 시간 (초)
 
-# PIR 센서 및 부저 핀 설정
-GPIO.setup(PIR_PIN, GPIO.IN)                               # PIR 센서 핀을 입력 모드
-GPIO.setup(BUZZER_PIN, GPIO.OUT)                           # 부저 핀을 출력 모드
+# PIR 센서 및 부저 핀 초기화 (처음 사용할 때 실행, 라즈베리파이는 RPi.GPIO, 시뮬레이터는 가상 GPIO)
+def open_gpio() :
+  gpio = get_backend().gpio
+  gpio.setwarnings(False)                                  # GPIO 경고 메시지 비활성화
+  gpio.setmode(gpio.BCM)                                   # BCM 모드 사용 (다른 모듈과 통일)
+  gpio.setup(PIR_PIN, gpio.IN)                             # PIR 센서 핀을 입력 모드
+  gpio.setup(BUZZER_PIN, gpio.OUT)                         # 부저 핀을 출력 모드
+  return gpio
 
-# 부저 PWM 객체 설정
-buzzer = GPIO.PWM(BUZZER_PIN, 1000)                        # 1000Hz로 PWM 객체 생성
+# PIR 센서 및 부저 핀 리소스 해제 (제어 모듈이 쓰는 핀은 그대로 둠)
+def close_gpio(gpio) :
+  gpio.cleanup([PIR_PIN, BUZZER_PIN])
+
+# 모션 감지 GPIO, 부저 PWM 자원 (import 시에는 하드웨어를 건드리지 않음)
+motion_gpio = Resource("모션 감지 GPIO", open_gpio, close_gpio)
+buzzer = Resource("부저 PWM", lambda : motion_gpio.get().PWM(BUZZER_PIN, 1000), lambda pwm : pwm.stop())
 
 # 부저 기본 동작 테스트
 def test_buzzer() :
+  gpio = motion_gpio.get()
+
   print("부저 테스트 중...")
-  GPIO.output(BUZZER_PIN, GPIO.HIGH)
+  gpio.output(BUZZER_PIN, gpio.HIGH)
   time.sleep(1)
 
-  GPIO.output(BUZZER_PIN, GPIO.LOW)
+  gpio.output(BUZZER_PIN, gpio.LOW)
   print("부저 테스트 완료")
 
-# 알람 소리 재생 (삐용삐용 패턴의 사이렌 소리)
+# 알람 패턴 재생 클래스 - 전용 스레드에서 사이렌 패턴을 재생하여 감지, 저장, 알림 처리를 막지 않음
+# 재생 중 다시 울리면 새 알람을 쌓지 않고 종료 시각만 연장
+class AlarmPlayer :
+  def __init__(self, pwm, frequencies = ALARM_FREQ, tone_seconds = 0.3, gap_seconds = 0.1, repeat = ALARM_REPEAT) :
+    self.pwm = pwm                                             # 부저 PWM 자원 (처음 재생할 때 생성)
+    self.steps = [(freq, tone_seconds) for freq in frequencies] + [(None, gap_seconds)]
+    self.duration = sum(seconds for _, seconds in self.steps) * repeat   # 알람 1회 재생 시간 (초)
+
+    self.triggered = 0                                         # 알람 요청 수
+    self.extended = 0                                          # 재생 중 요청으로 연장된 횟수
+    self._deadline = -math.inf                                 # 재생 종료 시각 (monotonic)
+    self._sounding = False                                     # 부저 출력 중 여부
+    self._closed = False
+    self._cond = threading.Condition()                         # 요청, 취소, 종료 시 재생 스레드 깨우기
+    self._thread = None
+
+  # 알람 재생 요청 (기다리지 않음, 새로 시작하면 True, 재생 중 연장이면 False)
+  def trigger(self, duration = None) :
+    with self._cond :
+      now = time.monotonic()
+      started = now >= self._deadline
+      self._deadline = max(self._deadline, now + (duration or self.duration))
+      self.triggered += 1
+      if not started :
+        self.extended += 1
+
+      # 재생 스레드는 처음 요청 시 한 번만 생성
+      if self._thread is None and not self._closed :
+        self._thread = threading.Thread(target = self._run, name = 'alarm-player', daemon = True)
+        self._thread.start()
+
+      self._cond.notify()
+      return started
+
+  # 재생 중인 알람 즉시 중지
+  def cancel(self) :
+    with self._cond :
+      self._deadline = -math.inf
+      self._cond.notify()
+
+  # 알람 재생 중 여부
+  def is_playing(self) :
+    with self._cond :
+      return time.monotonic() < self._deadline
+
+  # 부저 출력 (freq 가 None 이면 무음)
+  def _output(self, freq) :
+    if freq is None :
+      if self._sounding :
+        self.pwm.get().stop()
+        self._sounding = False
+      return
+
+    pwm = self.pwm.get()
+    pwm.ChangeFrequency(freq)                                  # PWM 주파수 변경
+    if not self._sounding :
+      pwm.start(50)                                            # 50% 듀티 사이클로 시작
+      self._sounding = True
+
+  # 재생 스레드 (종료 시각까지 패턴 반복, 요청이 없으면 대기)
+  def _run(self) :
+    step = 0
+
+    with self._cond :
+      while not self._closed :
+        # 재생할 알람이 없으면 무음으로 두고 다음 요청까지 대기
+        if time.monotonic() >= self._deadline :
+          self._safe_output(None)
+          step = 0
+          self._cond.wait()
+          continue
+
+        freq, seconds = self.steps[step]
+        if not self._safe_output(freq) :
+          continue
+
+        step = (step + 1) % len(self.steps)
+
+        # 음 길이만큼 대기 (연장 요청에는 계속, 취소, 종료 시 바로 중단)
+        end = time.monotonic() + seconds
+        while not self._closed :
+          remaining = min(end, self._deadline) - time.monotonic()
+          if remaining <= 0 :
+            break
+          self._cond.wait(remaining)
+
+      self._safe_output(None)
+
+  # 부저 출력 오류 시 알람 중지 (성공 여부 반환)
+  def _safe_output(self, freq) :
+    try :
+      self._output(freq)
+      return True
+
+    except Exception as e :
+      print(f"부저 제어 오류 : {e}")
+      self._deadline = -math.inf
+      self._sounding = False
+      return False
+
+  # 재생 스레드 종료
+  def close(self) :
+    with self._cond :
+      self._closed = True
+      self._cond.notify()
+      thread = self._thread
+
+    if thread is not None :
+      thread.join(timeout = 1)
+
+# 알람 재생기 (부저 PWM 객체 공유)
+alarm = AlarmPlayer(buzzer)
+
+# 알람 소리 재생 요청 (삐용삐용 패턴의 사이렌 소리, 재생 완료를 기다리지 않음)
 def control_buzzer() :
   try :
-    # 설정된 횟수만큼 알람 패턴 반복
-    for repeat in range(ALARM_REPEAT) :
-      # 각 주파수별로 소리 재생 (낮은음 → 높은음)
-      for freq in ALARM_FREQ :
-        buzzer.ChangeFrequency(freq)                       # PWM 주파수 변경
-        buzzer.start(50)                                   # 50% 듀티 사이클로 시작
-        time.sleep(0.3)                                    # 0.3초 동안 해당 주파수 재생
-
-      buzzer.stop()                                        # 각 패턴 완료 후 잠시 정지
-      time.sleep(0.1)                                      # 0.1초 무음 구간
+    started = alarm.trigger()
 
     return {
       'device' : 'buzzer',
-      'status' : 'completed',
+      'status' : 'started' if started else 'extended',     # 새로 시작 또는 재생 중 연장
       'value' : True
     }
   
@@ -66,30 +185,51 @@ def control_buzzer() :
       'reason' : str(e)
     }
 
+# 움직임 감지 시 알람 및 데이터베이스 저장 (주기 확인, 인터럽트 방식 공통)
+def handle_motion() :
+  print("\n" + "═" * 50)
+  print("[모션 감지]")
+  print("═" * 50)
+  current_time = datetime.now().strftime('%H:%M:%S')
+  print(f"[{current_time}] 움직임 감지!")
+  buzzer_result = control_buzzer()
+
+  # 모션 감지 시 위험 레벨 알림으로 데이터베이스에 저장
+  save_control(motion = 1)
+
+  return {
+    'device' : 'motion_sensor',
+    'status' : 'detected',                                 # 감지됨
+    'value' : True,
+    'buzzer_result' : buzzer_result
+  }
+
+# 주기 확인 방식의 마지막 감지 처리 시각 (PIR 신호가 유지되는 동안 중복 저장 방지)
+last_motion = -math.inf
+
 # 모션 감지 및 알람 실행
 def detect_motion() :
+  global last_motion
+
   try :
     # PIR 센서에서 디지털 신호 읽기 (0 또는 1)
-    motion_detected = GPIO.input(PIR_PIN)
+    motion_detected = motion_gpio.get().input(PIR_PIN)
     
     # 움직임이 감지된 경우
     if motion_detected == 1 :
-      print("\n" + "═" * 50)
-      print("[모션 감지]")
-      print("═" * 50)
-      current_time = datetime.now().strftime('%H:%M:%S')
-      print(f"[{current_time}] 움직임 감지!")
-      buzzer_result = control_buzzer()
+      now = time.monotonic()
 
-      # 모션 감지 시 위험 레벨 알림으로 데이터베이스에 저장
-      save_control(motion = 1)
+      # 재감지 무시 시간 안이면 같은 움직임으로 보고 알람만 연장
+      if now - last_motion < MOTION_COOLDOWN :
+        alarm.trigger()
+        return {
+          'device' : 'motion_sensor',
+          'status' : 'continued',                          # 이전 감지에 이어진 움직임
+          'value' : True
+        }
 
-      return {
-        'device' : 'motion_sensor',
-        'status' : 'detected',                             # 감지됨
-        'value' : True,
-        'buzzer_result' : buzzer_result
-      }
+      last_motion = now
+      return handle_motion()
     
     # 움직임이 감지되지 않은 경우 (평상시)
     else :
@@ -109,11 +249,86 @@ def detect_motion() :
       'reason' : str(e)                                    # 디버깅용 오류 메시지
     }
 
+# 인터럽트 방식 모션 감지 클래스 - PIR 상승 에지 콜백으로 감지하여 주기 확인 사이의 짧은 움직임도 놓치지 않음
+# gpio 에 RPi.GPIO 와 같은 함수를 가진 객체를 넣으면 라즈베리파이 없이도 동작 확인 가능
+class MotionEdgeDetector :
+  def __init__(self, gpio = None, pin = PIR_PIN, debounce_ms = MOTION_DEBOUNCE_MS,
+               cooldown = MOTION_COOLDOWN, clock = time.monotonic, on_event = None, player = alarm) :
+    self.gpio = gpio or motion_gpio.get()
+    self.pin = pin
+    self.debounce = debounce_ms / 1000                         # 신호 떨림 무시 시간 (초)
+    self.cooldown = cooldown                                   # 재감지 무시 시간 (초)
+    self.clock = clock
+    self.on_event = on_event                                   # 감지 이벤트 전달 함수 (없으면 대기열에 추가, GPIO 콜백 스레드에서 호출)
+    self.player = player                                       # 재감지 무시 시간 안의 움직임으로 연장할 알람 (None 이면 연장 안 함)
+
+    self._events = Queue(maxsize = 100)                        # 감지 이벤트 (GPIO 콜백 스레드 → 모션 스레드)
+    self._last_edge = -math.inf                                # 마지막 상승 에지 시각
+    self._last_event = -math.inf                               # 마지막 감지 이벤트 시각
+    self.suppressed = 0                                        # 떨림, 재감지 무시로 걸러진 에지 수
+
+  # GPIO 상승 에지 감지 시작
+  def start(self) :
+    self.gpio.add_event_detect(
+      self.pin,
+      self.gpio.RISING,
+      callback = self._on_edge,
+      bouncetime = max(1, int(self.debounce * 1000))
+    )
+
+  # GPIO 상승 에지 콜백 (GPIO 스레드에서 실행되므로 이벤트만 전달하고 바로 반환)
+  def _on_edge(self, channel = None) :
+    now = self.clock()
+
+    # 신호 떨림 무시 (짧은 간격의 연속 에지, 이미 LOW 로 떨어진 잡음)
+    if now - self._last_edge < self.debounce or self.gpio.input(self.pin) != 1 :
+      self._last_edge = now
+      self.suppressed += 1
+      return
+
+    self._last_edge = now
+
+    # 재감지 무시 시간 안의 감지는 같은 움직임으로 보고 알람만 연장 (저장, 알림은 생략)
+    if now - self._last_event < self.cooldown :
+      self.suppressed += 1
+      if self.player is not None :
+        self.player.trigger()
+      return
+
+    self._last_event = now
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    if self.on_event is not None :
+      self.on_event(timestamp)
+      return
+
+    try :
+      self._events.put_nowait(timestamp)
+    except Full :
+      self.suppressed += 1
+
+  # 감지 이벤트 대기 (감지 시각 문자열, 시간 초과 시 None)
+  def wait_event(self, timeout = None) :
+    try :
+      return self._events.get(timeout = timeout)
+
+    except Empty :
+      return None
+
+  # GPIO 에지 감지 중지
+  def stop(self) :
+    try :
+      self.gpio.remove_event_detect(self.pin)
+
+    except Exception as e :
+      print(f"모션 인터럽트 해제 오류 : {e}")
+
 # 프로그램 종료 시 리소스 정리
 def cleanup() :
   try :
-    buzzer.stop()                                          # PWM 객체 중지
-    GPIO.cleanup()                                         # 모든 GPIO 핀 리소스 해제
+    alarm.close()                                          # 알람 재생 스레드 종료
+    buzzer.close()                                         # PWM 객체 중지 (생성된 경우만)
+    motion_gpio.close()                                    # PIR, 부저 핀 리소스 해제 (초기화된 경우만)
     print("모션 감지 시스템 리소스 정리 완료")
 
   except Exception as e :
@@ -137,12 +352,8 @@ if __name__ == "__main__" :
     while True :
       motion_result = detect_motion()
 
-      # 움직임이 감지된 경우
-      if motion_result['status'] == 'detected' :
-        time.sleep(5)                                      # 알람 완료 후 5초 대기 (연속 감지 방지)
-      
       # 센서 오류 발생 시
-      elif motion_result['status'] == 'error' :
+      if motion_result['status'] == 'error' :
         time.sleep(1)                                      # 1초 대기 후 재시도
       
       # 평상시 (움직임 없음)
@@ -1,14 +1,18 @@
 # 농작물 환경 모니터링을 위한 LED, 팬 모터, 물 펌프 자동 제어 시스템
                                                                 # 표준 라이브러리
+import threading
 import time
 from datetime import datetime
-                                                                # 외부 라이브러리
-import RPi.GPIO as GPIO
                                                                 # 로컬 모듈
-from constant import SETTINGS
-from multi_sensor import get_light_value, get_temperature, get_soil_moisture
-from db_utils import save_control
-from config_manager import ConfigManager
+from config.constant import SETTINGS, CONTROL_RULES
+from sensor.multi_sensor import get_light_value, sample_sensors
+from database.db_utils import save_control
+from config.config_manager import ConfigManager
+from hardware.backend import get_backend
+from hardware.lifecycle import Resource
+from control.rule_engine import RuleEngine
+from control.control_trigger import ControlTrigger
+from control.daylight_schedule import DaylightSchedule
 
 # 설정 관리자 전역 변수
 config_manager = None
@@ -18,152 +22,119 @@ def init_config(manager) :
   global config_manager
   config_manager = manager
 
-# GPIO 핀 설정 (constant.py에서 불러오기)
-LED_PIN = SETTINGS['LED_PIN']                              # LED 제어용 GPIO 핀
-FAN_PIN = SETTINGS['FAN_PIN']                              # 팬 모터 제어용 GPIO 핀
-PUMP_PIN = SETTINGS['PUMP_PIN']                            # 물 펌프 모터 제어용 GPIO 핀
+# 제어 장치별 GPIO 핀 (constant.py의 '<장치>_PIN' 설정)
+DEVICE_PINS = {device : SETTINGS[f'{device.upper()}_PIN'] for device in CONTROL_RULES}
 
-# GPIO 초기화 설정
-GPIO.setmode(GPIO.BCM)                                     # BCM 모드 사용
-GPIO.setup(LED_PIN, GPIO.OUT)                              # LED 핀을 출력 모드
-GPIO.setup(FAN_PIN, GPIO.OUT)                              # 팬 모터 핀을 출력 모드
-GPIO.setup(PUMP_PIN, GPIO.OUT)                             # 물 펌프 핀을 출력 모드
+# 신호 반전 장치 (LOW = ON, HIGH = OFF)
+ACTIVE_LOW_DEVICES = tuple(device for device, rule in CONTROL_RULES.items() if rule.get('active_low'))
 
-# 제어 장비 초기화 설정 (정지) - 신호 반전이므로 HIGH가 OFF
-GPIO.output(FAN_PIN, GPIO.HIGH) 
-GPIO.output(PUMP_PIN, GPIO.HIGH)
+# 장치 켜기/끄기 출력 신호 (신호 반전 장치는 LOW가 ON)
+def output_level(gpio, device, on) :
+  if device in ACTIVE_LOW_DEVICES :
+    return gpio.LOW if on else gpio.HIGH
+
+  return gpio.HIGH if on else gpio.LOW
+
+# GPIO 초기화 설정 (처음 사용할 때 실행, 라즈베리파이는 RPi.GPIO, 시뮬레이터는 가상 GPIO)
+def open_outputs() :
+  gpio = get_backend().gpio
+  gpio.setmode(gpio.BCM)                                   # BCM 모드 사용
+
+  # 제어 장치 핀을 출력 모드로 설정 후 정지 상태로 초기화
+  for device, pin in DEVICE_PINS.items() :
+    gpio.setup(pin, gpio.OUT)
+    gpio.output(pin, output_level(gpio, device, False))
+
+  return gpio
+
+# 모든 제어 장비 OFF 후 제어 핀 리소스 해제 (모션 감지 모듈이 쓰는 핀은 그대로 둠)
+def close_outputs(gpio) :
+  for device, pin in DEVICE_PINS.items() :
+    gpio.output(pin, output_level(gpio, device, False))
+
+  gpio.cleanup(list(DEVICE_PINS.values()))                 # 제어 핀 리소스 해제
+
+# 제어 출력 GPIO 자원 (import 시에는 하드웨어를 건드리지 않음)
+outputs = Resource("제어 출력 GPIO", open_outputs, close_outputs)
+
+# 자동 제어 규칙 엔진 (설정이 바뀔 때만 규칙표 재생성)
+engine = RuleEngine()
+
+# 자동 제어 실행 판단 (기준 통과, 설정 변경, 낮/밤 전환 시 또는 감시 주기마다 실행)
+trigger = ControlTrigger()
 
 # 이전 상태 추적 변수 (상태 변화 감지용)
-prev_state = {
-  'led': None,
-  'fan': None,
-  'pump': None
-}
+prev_state = dict.fromkeys(CONTROL_RULES)
+
+# 비례 제어 중인 장치의 현재 듀티 (%) - 비례 제어 모듈이 갱신, 여기 있는 장치는 켜기/끄기 제어에서 제외
+pwm_duty = {}
+
+# 자동 제어 잠금 - 측정, 낮/밤 전환, 비례 제어, 원격 제어 스레드가 규칙 엔진 상태(켜짐 기록, 가동 구간)를 동시에 바꾸지 않도록
+# (control_all_devices 안에서 control_device 를 부르므로 재진입 가능 잠금, 센서 측정과 DB 저장은 잠금 밖에서 실행)
+control_lock = threading.RLock()
 
-# 현재 시간을 기준으로 낮/밤 구분하는 함수
+# 낮/밤 일정 (다음 전환 시각을 미리 계산, 전환 시각에 정확히 바뀜)
+daylight = DaylightSchedule()
+
+# 현재 낮/밤 구분 (전환 시각 전에는 저장된 값만 읽음)
 def is_daytime() :
-  current_hour = datetime.now().hour
-  return 6 <= current_hour < 18
-
-# 시간대별 팬 가동 기준 온도 가져오기
-def get_fan_threshold() :
-  # 현재 시간대에 맞는 팬 가동 기준 온도 반환
-  if is_daytime() :
-    return config_manager.get_setting('fan_day')           # 낮 시간대 기준 (06:00 ~ 18:00)
-  
-  else :
-    return config_manager.get_setting('fan_night')         # 밤 시간대 기준 (18:01 ~ 05:59)
+  return daylight.is_daytime()
+
+# 측정 기록으로 자동 제어 실행이 필요한지 판단 (실행 사유 반환, 필요 없으면 None)
+# (규칙 엔진 상태를 읽기만 하므로 제어 잠금 없이 실행 - 비동기 실행기의 이벤트 루프에서 바로 호출)
+def control_due(sensor_data) :
+  return trigger.check(engine, config_manager, sensor_data, is_daytime(), skip = pwm_duty)
+
+# 측정값에 따라 장치 하나를 규칙대로 자동 제어 (sensor_data 가 없으면 실시간 읽기)
+def control_device(device, sensor_data = None, current = None, daytime = None) :
+  # 측정 기록이 제공되지 않았을 때만 실시간 읽기 (제어 잠금 밖에서, 측정 기록에 값이 없으면 측정 실패로 보고 SKIPPED)
+  if sensor_data is None :
+    sensor_data = sample_sensors()._asdict()
+
+  with control_lock :
+    # 비례 제어 중인 장치는 비례 제어 주기가 출력을 관리하므로 상태만 반환
+    if device in pwm_duty :
+      duty = pwm_duty[device]
+      return {
+        'device' : device,
+        'status' : 'ON' if duty > 0 else 'OFF',
+        'duty' : round(duty, 1),
+        'reason' : 'pwm'
+      }
 
-# 조도값에 따라 LED 자동 제어
-def control_led(light_value = None) :
-  # 최신 조도 설정값 가져오기
-  light_threshold = config_manager.get_setting('light_threshold')
+    rule = engine.refresh(config_manager)[device]
+    value = sensor_data.get(rule.metric)
 
-  # 조도값이 제공되지 않으면 환경 센서 시스템에서 실시간 읽기
-  if light_value is None :
-    light_value = get_light_value()
+    # 현재 장치 상태 (제공되지 않으면 GPIO 핀 상태 읽기)
+    if current is None :
+      current = (get_device_status() or {}).get(device)
 
-  # 조도 설정값 기준으로 LED 제어
-  if light_value < light_threshold :
-    GPIO.output(LED_PIN, GPIO.HIGH)                         # 어두우면 LED 켜기
-    status = "ON"
-  
-  else :
-    GPIO.output(LED_PIN, GPIO.LOW)                          # 밝으면 LED 끄기
-    status = "OFF"
-  
-  return {
-    'device' : 'led',
-    'status' : status,
-    'value' : light_value
-  }
-
-# 온도에 따라 팬 모터를 자동으로 제어
-def control_fan(temperature = None) :
-  # 온도 데이터가 없으면 환경 센서 시스템에서 실시간 읽기
-  if temperature is None :
-    temperature = get_temperature()
-
-  # 환경 데이터 읽기 실패 시 제어 건너뜀
-  if temperature is None :
-    return {
-        'device' : 'fan',
-        'status' : 'SKIPPED',
-        'value' : None,
-        'reason' : 'sensor_read_failed'
-    }
-  
-  # 최신 온도 설정값 가져오기
-  if is_daytime() :
-    fan_threshold = config_manager.get_setting('fan_day')
+    if daytime is None :
+      daytime = is_daytime()
 
-  else :
-    fan_threshold = config_manager.get_setting('fan_night')
-    
-  time_period = "낮" if is_daytime() else "밤"
+    decision = engine.evaluate(device, value, None if current is None else current == 'ON', daytime)
 
-  # 온도 설정값 기준으로 팬 모터 제어 판단 (반전)
-  if temperature >= fan_threshold :
-    GPIO.output(FAN_PIN, GPIO.LOW)                          # 팬 모터 가동
-    status = "ON"
+    # 상태가 바뀔 때만 출력 변경
+    if decision.changed :
+      set_device(device, decision.on)
+
+    # 환경 데이터 읽기 실패 시 제어 건너뜀, 기준 사이에서 상태를 모르면 유지
+    if value is None :
+      status = 'SKIPPED'
+    elif decision.on is None :
+      status = 'maintain'
+    else :
+      status = 'ON' if decision.on else 'OFF'
 
-  else :
-    GPIO.output(FAN_PIN, GPIO.HIGH)                         # 팬 모터 정지
-    status = "OFF"
-
-  return {
-    'device' : 'fan',
-    'status' : status,
-    'value' : temperature,
-    'threshold' : fan_threshold,
-    'time_period' : time_period
-  }
-
-# 토양 수분에 따라 물 펌프 모터를 자동으로 제어 
-def control_pump(soil_moisture = None) :
-  # 최신 토양 수분 설정값 가져오기
-  soil_min = config_manager.get_setting('soil_min')
-  soil_max = config_manager.get_setting('soil_max')
-
-  # 토양 수분 데이터가 없으면 환경 센서 시스템에서 실시간 읽기
-  if soil_moisture is None :
-    soil_moisture = get_soil_moisture()
-
-  # 환경 데이터 읽기 실패 시 제어 건너뜀
-  if soil_moisture is None :
-    return {
-      'device' : 'pump',
-      'status' : 'SKIPPED',
-      'value' : None,
-      'reason' : 'sensor_read_failed'
-    }
-  
-  # 토양 수분 설정값 기준으로 물 펌프 제어 판단 (반전)
-  if soil_moisture < soil_min :
-    # 토양 수분이 최소값보다 낮으면 물 펌프 가동
-    GPIO.output(PUMP_PIN, GPIO.LOW)                          # 펌프 가동
-    status = "ON"
-
-  elif soil_moisture >= soil_max :
-    # 토양 수분이 최대값에 도달하면 물 펌프 정지
-    GPIO.output(PUMP_PIN, GPIO.HIGH)                         # 펌프 정지
-    status = "OFF"
-  
-  else :
-    # 설정 범위 안에 있으면 현재 상태 유지
     return {
-      'device' : 'pump',
-      'status' : 'maintain',
-      'value' : soil_moisture,
-      'reason' : 'in range'
+      'device' : device,
+      'status' : status,
+      'value' : value,
+      'threshold' : decision.threshold,
+      'time_period' : "낮" if daytime else "밤",
+      'reason' : decision.reason
     }
 
-  return {
-    'device' : 'pump',
-    'status' : status,
-    'value' : soil_moisture
-  }
-
 # 제어 상태 출력 함수
 def print_control_status(device, state, mode = 'auto') :
   current_time = datetime.now().strftime('%H:%M:%S')
@@ -187,108 +158,73 @@ def print_control_status(device, state, mode = 'auto') :
 
 # 환경 센서 데이터를 기반으로 모든 제어 장비를 자동으로 제어
 def control_all_devices(sensor_data = None) :
-  results = {}
-  state_changed = False                                   # 상태 변화 감지 플래그
-
-  # LED 제어 (조도 기반)
-  if config_manager.get_device_mode('led') == 'manual' :
-    # 수동 모드
-    manual_state = config_manager.get_device_state('led')
-    results['led'] = {
-      'device' : 'led',
-      'status' : 'ON' if manual_state else 'OFF',
-      'mode' : 'manual'
-    }
-
-  else :  
-    # 자동 모드
-    light_value = sensor_data.get('light_value') if sensor_data else None
-    results['led'] = control_led(light_value)
-    results['led']['mode'] = 'auto'
-
-  # 상태 변화 확인
-  if results['led']['status'] != prev_state['led'] :
-    state_changed = True
-    prev_state['led'] = results['led']['status']
-
-  # 팬 모터 제어 (온도 기반)
-  if config_manager.get_device_mode('fan') == 'manual':
-    # 수동 모드
-    manual_state = config_manager.get_device_state('fan')
-    results['fan'] = {
-      'device' : 'fan',
-      'status' : 'ON' if manual_state else 'OFF',
-      'mode' : 'manual'
-    }
-
-  else :
-    # 자동 모드
-    temperature =  sensor_data.get('temperature') if sensor_data else None
-    results['fan'] = control_fan(temperature)
-    results['fan']['mode'] = 'auto'
-
-  # 상태 변화 확인
-  if results['fan']['status'] != prev_state['fan'] :
-    state_changed = True
-    prev_state['fan'] = results['fan']['status']
-  
-  # 물 펌프 제어 (토양 수분 기반)
-    if config_manager.get_device_mode('pump') == 'manual':
-      # 수동 모드
-      manual_state = config_manager.get_device_state('pump')
-      results['pump'] = {
-        'device' : 'pump',
-        'status' : 'ON' if manual_state else 'OFF',
-        'mode' : 'manual'
-      }
-
-  else :
-    # 자동 모드
-    soil_moisture = sensor_data.get('soil_moisture') if sensor_data else None
-    results['pump'] = control_pump(soil_moisture)
-    results['pump']['mode'] = 'auto'
-
-  # 상태 변화 확인 (maintain 상태는 변화가 아님)
-  if results['pump']['status'] != 'maintain' and results['pump']['status'] != prev_state['pump'] :
-    state_changed = True
-    prev_state['pump'] = results['pump']['status']
-
-  # 제어 결과 출력
+  # 센서 데이터가 없으면 한 번만 측정해서 모든 장치에 사용 (측정은 제어 잠금 밖에서)
+  if sensor_data is None :
+    sensor_data = sample_sensors()._asdict()
+
+  with control_lock :
+    results = {}
+    state_changed = False                                   # 상태 변화 감지 플래그
+
+    engine.refresh(config_manager)
+    current = get_device_status() or {}
+    daytime = is_daytime()
+
+    for device in engine.devices :
+      if config_manager.get_device_mode(device) == 'manual' :
+        # 수동 모드 (실제 상태만 규칙 엔진에 반영)
+        if device in current :
+          engine.observe(device, current[device] == 'ON')
+
+        manual_state = config_manager.get_device_state(device)
+        results[device] = {
+          'device' : device,
+          'status' : 'ON' if manual_state else 'OFF',
+          'mode' : 'manual'
+        }
+
+      else :
+        # 자동 모드
+        results[device] = control_device(device, sensor_data, current.get(device), daytime)
+        results[device]['mode'] = 'auto'
+
+      # 상태 변화 확인 (SKIPPED, maintain 상태는 변화가 아님)
+      status = results[device]['status']
+      if status not in ('SKIPPED', 'maintain') and status != prev_state[device] :
+        state_changed = True
+        prev_state[device] = status
+
+    trigger.ran(daytime)
+
+  # 제어 결과 출력 (출력, 데이터베이스 저장은 제어 잠금 밖에서)
   auto_devices = []
-  for device in ['led', 'fan', 'pump'] :
-    if results[device].get('mode') == 'auto' and results[device]['status'] not in ['SKIPPED', 'maintain'] :
-      auto_devices.append((device, results[device]['status']))
+  for device, result in results.items() :
+    if result.get('mode') == 'auto' and result['status'] not in ['SKIPPED', 'maintain'] :
+      auto_devices.append((device, result['status']))
 
   if auto_devices:
     print_control_status(auto_devices, None, 'auto')
 
   # 자동 제어 시스템 데이터를 데이터베이스에 저장 (상태 변화가 있을 때만)
   if state_changed :
-    save_control(
-      led = 1 if results['led']['status'] == 'ON' else 0,
-      fan = 1 if results['fan']['status'] == 'ON' else 0,
-      pump = 1 if results['pump']['status'] == 'ON' else 0
-    )
+    save_control(**{device : 1 if result['status'] == 'ON' else 0 for device, result in results.items()})
 
   return results
 
+# 장치 직접 켜기/끄기 (수동 제어용, 팬과 펌프는 신호 반전)
+def set_device(device, on) :
+  gpio = outputs.get()
+  gpio.output(DEVICE_PINS[device], output_level(gpio, device, on))
+
 # 현재 장치 상태 조회 함수
 def get_device_status() :
   try :
-    # 현재 GPIO 핀 상태 읽기
-    led_state = GPIO.input(LED_PIN)
-    fan_state = GPIO.input(FAN_PIN)
-    pump_state = GPIO.input(PUMP_PIN)
-    
-    # GPIO 상태를 ON/OFF로 변환
-    led_status = 'ON' if led_state == GPIO.HIGH else 'OFF'
-    fan_status = 'ON' if fan_state == GPIO.LOW else 'OFF'
-    pump_status = 'ON' if pump_state == GPIO.LOW else 'OFF'
-    
+    # 현재 GPIO 핀 상태를 ON/OFF로 변환
+    gpio = outputs.get()
     return {
-      'led' : led_status,
-      'fan' : fan_status,
-      'pump' : pump_status
+      device : ('ON' if pwm_duty[device] > 0 else 'OFF') if device in pwm_duty else
+               'ON' if gpio.input(pin) == output_level(gpio, device, True) else 'OFF'
+      for device, pin in DEVICE_PINS.items()
     }
   
   except Exception as e :
@@ -298,13 +234,8 @@ def get_device_status() :
 # 프로그램 종료 시 리소스 정리
 def cleanup() :
   try :
-    # 모든 제어 장비 OFF
-    GPIO.output(LED_PIN, GPIO.LOW)                        # LED 끄기
-    GPIO.output(FAN_PIN, GPIO.HIGH)                       # 팬 모터 정지 (반전)
-    GPIO.output(PUMP_PIN, GPIO.HIGH)                      # 물 펌프 정지 (반전)
-
-    # GPIO 리소스 정리
-    GPIO.cleanup()                                        # 모든 GPIO 핀 리소스 해제
+    # 모든 제어 장비 OFF 후 GPIO 리소스 정리 (초기화된 경우만)
+    outputs.close()
 
     print("제어 시스템 리소스 정리 완료")
       
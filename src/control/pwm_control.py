@@ -0,0 +1,252 @@
+# 농작물 환경 모니터링을 위한 팬, LED 비례 제어 (켜짐 기준을 설정값으로 PI 제어하여 PWM 출력 세기 조절)
+                                                                # 표준 라이브러리
+import array
+import math
+import time
+                                                                # 로컬 모듈
+import control.multi_control as multi_control
+import sensor.multi_sensor as multi_sensor
+from config.constant import PWM_CONFIG
+from hardware.lifecycle import Resource
+
+# 비례 제어 측정값 - 온습도는 DHT22 측정 스레드의 마지막 정상값, 토양 수분과 조도는 max_age 초 이내 측정 결과 재사용
+# (제어 주기마다 새로 측정하지 않으므로 측정 주기의 측정 횟수, 필터 시정수가 바뀌지 않음 - 조도 비례 제어 중에만 제어 주기로 측정)
+def read_metric(metric, max_age) :
+  if metric in ('temperature', 'humidity') :
+    temperature, humidity, _ = multi_sensor.read_dht22()
+    return temperature if metric == 'temperature' else humidity
+
+  soil_moisture, light_value = multi_sensor.read_adc(max_age = max_age)
+  return soil_moisture if metric == 'soil_moisture' else light_value
+
+# PI 제어기 클래스 - 오차(출력을 높여야 하는 방향이 +)로 출력(%)을 계산하고 출력 변화 속도를 제한
+# 출력이 한계나 변화 속도 제한에 걸린 동안 같은 방향의 오차는 적분하지 않음 (적분 누적 방지, anti-windup)
+class PIController :
+  def __init__(self, kp, ki, rate = None, out_min = 0.0, out_max = 100.0) :
+    self.kp = kp                                               # 비례 이득
+    self.ki = ki                                               # 적분 이득 (초당)
+    self.rate = rate                                           # 초당 최대 출력 변화 (None 이면 제한 없음)
+    self.out_min = out_min
+    self.out_max = out_max
+    self.integral = 0.0                                        # 적분 항 (출력 단위)
+    self.output = out_min                                      # 마지막 출력
+
+  # 적분 항, 출력 초기화
+  def reset(self) :
+    self.integral = 0.0
+    self.output = self.out_min
+
+  # 오차와 경과 시간(초)으로 다음 출력 계산
+  def update(self, error, dt) :
+    integral = self.integral + self.ki * error * dt
+    raw = self.kp * error + integral
+    output = min(self.out_max, max(self.out_min, raw))
+
+    # 출력 변화 속도 제한
+    if self.rate is not None :
+      step = self.rate * dt
+      output = min(self.output + step, max(self.output - step, output))
+
+    # 제한에 걸리지 않았거나 오차가 제한을 푸는 방향일 때만 적분 반영
+    if raw == output or (raw - output) * error < 0 :
+      self.integral = integral
+
+    self.output = output
+    return output
+
+  # 실제 출력이 계산값과 다를 때(최소 가동 출력 유지, 재가동 대기) 실제 출력에 맞춤
+  # 다음 변화 속도 제한은 실제 출력부터, 적분 항은 실제 출력을 넘지 않게 (대기가 끝날 때 최대 출력으로 튀지 않게)
+  def track(self, output) :
+    self.output = output
+    self.integral = min(self.integral, output)
+
+# 듀티 기록 클래스 - 제어 주기마다 듀티(0 ~ 100%)를 1바이트로 고정 크기 원형 버퍼에 기록
+class DutyHistory :
+  def __init__(self, capacity) :
+    self.capacity = capacity
+    self._values = array.array('B', bytes(capacity))
+    self._next = 0                                             # 다음 기록 위치
+    self.count = 0                                             # 보관 중인 기록 수
+
+  # 듀티 기록 추가 (가득 차면 가장 오래된 기록 덮어씀)
+  def append(self, duty) :
+    self._values[self._next] = int(round(min(100.0, max(0.0, duty))))
+    self._next = (self._next + 1) % self.capacity
+    self.count = min(self.count + 1, self.capacity)
+
+  # 최근 기록 (오래된 순, count 개 - None 이면 전체)
+  def recent(self, count = None) :
+    count = self.count if count is None else min(count, self.count)
+    start = (self._next - count) % self.capacity
+
+    if start + count <= self.capacity :
+      return self._values[start : start + count].tolist()
+
+    return (self._values[start :] + self._values[: (start + count) % self.capacity]).tolist()
+
+  # 최근 기록 평균 듀티 (%)
+  def average(self, count = None) :
+    values = self.recent(count)
+    return sum(values) / len(values) if values else 0.0
+
+# PWM 출력 채널 클래스 - 장치 제어 핀의 PWM 출력과 PI 제어기, 듀티 기록
+class PwmChannel :
+  def __init__(self, device, settings, history_size) :
+    self.device = device
+    self.pin = multi_control.DEVICE_PINS[device]
+    self.active_low = device in multi_control.ACTIVE_LOW_DEVICES  # 신호 반전 (팬은 LOW 가 ON - 듀티 반전)
+    self.min_duty = settings['min_duty']                       # 최소 가동 출력 (%)
+    self.min_off = settings['min_off']                         # 정지 후 재가동까지 최소 대기 시간 (초)
+    self.off_seconds = math.inf                                # 정지 후 경과 시간 (초)
+    self.controller = PIController(settings['kp'], settings['ki'], settings['rate'])
+    self.history = DutyHistory(history_size)
+    self.duty = 0.0                                            # 현재 출력 듀티 (%)
+    self.starts = 0                                            # 정지 → 가동 횟수
+
+    # PWM 출력 자원 (제어 출력 GPIO 를 사용하며 처음 비례 제어할 때 정지 상태로 시작)
+    self.pwm = Resource(
+      f"{device.upper()} PWM",
+      lambda : self._open(settings['frequency']),
+      lambda pwm : pwm.stop()
+    )
+
+  # PWM 출력 생성 (정지 상태)
+  def _open(self, frequency) :
+    pwm = multi_control.outputs.get().PWM(self.pin, frequency)
+    pwm.start(self._hardware_duty(0.0))
+    return pwm
+
+  # 실제 출력 듀티 (신호 반전 장치는 100% - 듀티)
+  def _hardware_duty(self, duty) :
+    return 100.0 - duty if self.active_low else duty
+
+  # 오차로 출력 계산 후 적용 - 가동 중에는 출력이 0 이 될 때까지 최소 가동 출력 유지,
+  # 정지 중에는 최소 가동 출력 이상이고 정지 후 최소 대기 시간이 지났을 때만 가동 (측정 잡음에 의한 잦은 재가동 방지)
+  def update(self, error, dt) :
+    computed = self.controller.update(error, dt)
+    duty = computed
+
+    if self.duty > 0 :
+      if 0 < duty < self.min_duty :
+        duty = self.min_duty
+    elif duty < self.min_duty or self.off_seconds < self.min_off :
+      duty = 0.0
+
+    if duty != computed :
+      self.controller.track(duty)
+
+    # 정지 후 경과 시간 (이번 주기에 정지하면 0 부터)
+    self.off_seconds = self.off_seconds + dt if duty == 0 and self.duty == 0 else 0.0
+
+    if duty != self.duty :
+      self.pwm.get().ChangeDutyCycle(self._hardware_duty(duty))
+      if self.duty == 0.0 :
+        self.starts += 1
+
+    self.duty = duty
+    self.history.append(duty)
+    multi_control.pwm_duty[self.device] = duty
+    return duty
+
+  # 비례 제어 해제 (PWM 중지, 수동 모드면 수동 상태로 아니면 정지 상태로 복귀)
+  def release(self, config) :
+    self.pwm.close()
+    self.controller.reset()
+    self.duty = 0.0
+    self.off_seconds = math.inf
+    multi_control.pwm_duty.pop(self.device, None)
+
+    manual = config.get_device_mode(self.device) == 'manual'
+    multi_control.set_device(self.device, manual and config.get_device_state(self.device))
+
+  # 채널 통계
+  def get_stats(self, hour) :
+    return {
+      'duty' : round(self.duty, 1),
+      'average_1h' : round(self.history.average(hour), 1),
+      'starts' : self.starts,
+      'integral' : round(self.controller.integral, 2)
+    }
+
+# 비례 제어 클래스 - 제어 주기마다 출력 방식이 pwm 인 자동 모드 장치의 오차(켜짐 기준 대비)로 PWM 출력 조절
+# 설정값은 규칙 엔진의 켜짐 기준(낮/밤), 오차 방향은 규칙 방향(above : 측정값 - 기준, below : 기준 - 측정값)
+class PwmController :
+  def __init__(self, config = PWM_CONFIG, clock = time.monotonic) :
+    self.tick = config['tick']                                 # 제어 주기 (초)
+    self.clock = clock
+    history_size = max(1, int(config['history'] // self.tick))
+    self.channels = {
+      device : PwmChannel(device, settings, history_size)
+      for device, settings in config['devices'].items()
+      if device in multi_control.DEVICE_PINS
+    }
+    self._last = None                                          # 마지막 제어 시각
+    self.steps = 0                                             # 제어 실행 횟수
+
+  # 장치 비례 제어 사용 여부 (자동 모드 + 출력 방식 pwm)
+  def enabled(self, device) :
+    config = multi_control.config_manager
+    return config.get_device_mode(device) == 'auto' and config.get_device_control(device).get('output') == 'pwm'
+
+  # 비례 제어 장치의 측정값 읽기 (측정 항목은 규칙 정의에서 - 제어 잠금 밖에서 호출)
+  def sample(self) :
+    metrics = {
+      multi_control.engine.definitions[device]['metric']
+      for device in self.channels
+      if self.enabled(device)
+    }
+    return {metric : read_metric(metric, self.tick) for metric in metrics}
+
+  # 비례 제어 1회 실행 (측정값이 없으면 마지막 측정값 사용) - 장치별 듀티 반환
+  def step(self, sensor_data = None) :
+    # 센서 읽기(DHT22 대기, ADC 측정)는 잠금 밖에서 먼저 실행 (다른 제어 경로를 막지 않도록)
+    if sensor_data is None :
+      sensor_data = self.sample()
+
+    # 켜기/끄기 자동 제어와 같은 규칙 엔진, 낮/밤 일정을 쓰므로 같은 제어 잠금 사용
+    with multi_control.control_lock :
+      now = self.clock()
+      dt = self.tick if self._last is None else now - self._last
+      self._last = now
+      self.steps += 1
+
+      config = multi_control.config_manager
+      rules = multi_control.engine.refresh(config)
+      daytime = multi_control.is_daytime()
+      duties = {}
+
+      for device, channel in self.channels.items() :
+        if not self.enabled(device) :
+          # 출력 방식이나 모드가 바뀌었으면 비례 제어 해제
+          if device in multi_control.pwm_duty :
+            channel.release(config)
+          continue
+
+        # 측정 실패 시 현재 출력 유지
+        rule = rules[device]
+        value = sensor_data.get(rule.metric)
+        if value is None :
+          duties[device] = channel.duty
+          continue
+
+        setpoint = rule.on_day if daytime else rule.on_night
+        error = value - setpoint if rule.above else setpoint - value
+        duties[device] = channel.update(error, dt)
+
+      return duties
+
+  # 모든 PWM 출력 해제 (종료 시 제어 출력 정리 전에 호출)
+  def close(self) :
+    with multi_control.control_lock :
+      for device, channel in self.channels.items() :
+        channel.pwm.close()
+        multi_control.pwm_duty.pop(device, None)
+
+  # 장치별 비례 제어 통계 (평균은 최근 1시간)
+  def get_stats(self) :
+    hour = int(3600 // self.tick)
+    return {
+      device : channel.get_stats(hour)
+      for device, channel in self.channels.items()
+      if device in multi_control.pwm_duty
+    }
@@ -0,0 +1,209 @@
+# 농작물 환경 모니터링을 위한 자동 제어 규칙 엔진 (설정이 바뀔 때만 규칙표를 다시 만들고 측정마다 비교만 수행)
+                                                                # 표준 라이브러리
+import math
+import time
+from collections import deque, namedtuple
+                                                                # 로컬 모듈
+from config.constant import CONTROL_RULES
+
+# 컴파일된 규칙 (장치, 측정 항목, 기준 이상일 때 켜는지 여부, 낮 켜짐/꺼짐 기준, 밤 켜짐/꺼짐 기준, 최소 켜짐/꺼짐 시간,
+# 최대 가동 시간 - 가동률 구간 안에서 켜져 있을 수 있는 초, 가동률 구간)
+Rule = namedtuple('Rule', ['device', 'metric', 'above', 'on_day', 'off_day', 'on_night', 'off_night', 'min_on', 'min_off',
+                           'max_on_time', 'duty_window'])
+
+# 판단 결과 (장치, 판단 후 상태 - None 이면 알 수 없음, 장치 출력 변경 필요 여부, 측정값, 적용한 켜짐 기준, 사유)
+Decision = namedtuple('Decision', ['device', 'on', 'changed', 'value', 'threshold', 'reason'])
+
+# 설정 키에서 (낮 기준, 밤 기준) 읽기 - 낮/밤 키 쌍이 아니면 같은 값
+def resolve_levels(key, config) :
+  if isinstance(key, dict) :
+    return config.get_setting(key['day']), config.get_setting(key['night'])
+
+  value = config.get_setting(key)
+  return value, value
+
+# 장치 규칙 정의 하나를 현재 설정값, 장치 제어 동작 설정으로 컴파일
+def compile_rule(device, definition, config) :
+  above = definition['direction'] == 'above'
+  control = config.get_device_control(device)
+  on_day, on_night = resolve_levels(definition['on'], config)
+
+  # 꺼짐 기준 (별도 설정 키가 없으면 켜짐 기준에서 켜는 반대 방향으로 hysteresis 만큼)
+  if 'off' in definition :
+    off_day, off_night = resolve_levels(definition['off'], config)
+
+  else :
+    band = -control.get('hysteresis', 0) if above else control.get('hysteresis', 0)
+    off_day, off_night = on_day + band, on_night + band
+
+  # 최대 가동률 (1.0 이상이면 제한 없음)
+  window = control.get('duty_window', 3600)
+  max_duty = control.get('max_duty', 1.0)
+  max_on_time = max_duty * window if max_duty < 1.0 else math.inf
+
+  return Rule(device, definition['metric'], above, on_day, off_day, on_night, off_night,
+              control.get('min_on', 0), control.get('min_off', 0), max_on_time, window)
+
+# 규칙 엔진 클래스 - 규칙 정의와 사용자 설정으로 장치별 규칙표를 만들어 두고 측정값마다 켜기/끄기/유지 판단
+# 켜짐 기준과 꺼짐 기준 사이에서는 현재 상태를 유지하고, 최소 유지 시간 전에는 상태를 바꾸지 않음
+# 최대 가동률을 넘으면 최소 켜짐 시간과 관계없이 끄고, 구간 안 가동 시간이 줄어들 때까지 켜지 않음
+class RuleEngine :
+  def __init__(self, definitions = CONTROL_RULES, clock = time.monotonic) :
+    self.definitions = definitions                             # 장치별 규칙 정의
+    self.clock = clock
+    self.rules = {}                                            # 장치별 컴파일된 규칙
+    self.version = None                                        # 규칙표를 만든 설정 버전
+    self.compiles = 0                                          # 규칙표 생성 횟수
+
+    self._state = {}                                           # 장치별 마지막 확인 상태
+    self._changed_at = {}                                      # 장치별 마지막 상태 변경 시각 (monotonic)
+    self._on_since = {}                                        # 장치별 현재 켜짐 시작 시각 (꺼져 있으면 None)
+    self._on_periods = {}                                      # 장치별 지난 켜짐 구간 (시작, 끝) - 가동률 구간 밖은 삭제
+
+  # 제어 장치 목록 (규칙 정의 순서)
+  @property
+  def devices(self) :
+    return tuple(self.definitions)
+
+  # 설정이 바뀌었으면 규칙표 다시 생성 (설정 관리자의 version 비교) - 규칙표 반환
+  def refresh(self, config) :
+    if config.version != self.version :
+      self.rules = {device : compile_rule(device, definition, config) for device, definition in self.definitions.items()}
+      self.version = config.version
+      self.compiles += 1
+
+    return self.rules
+
+  # 실제 장치 상태 반영 (수동 조작 등 엔진 밖에서 바뀐 상태도 최소 유지 시간에 포함)
+  def observe(self, device, on, now = None) :
+    if on is None :
+      return
+
+    now = self.clock() if now is None else now
+
+    if device not in self._state :
+      # 처음 확인한 상태는 언제부터인지 모르므로 바로 바꿀 수 있게 둠 (가동 시간은 지금부터 계산)
+      self._state[device] = on
+      self._changed_at[device] = -math.inf
+      self._on_since[device] = now if on else None
+
+    elif self._state[device] != on :
+      self._state[device] = on
+      self._changed_at[device] = now
+
+      # 켜짐 구간 기록
+      if on :
+        self._on_since[device] = now
+      else :
+        self._on_periods.setdefault(device, deque()).append((self._on_since[device], now))
+        self._on_since[device] = None
+
+  # 최근 window 초 동안 켜져 있던 시간 (초)
+  def on_time(self, device, window, now = None) :
+    now = self.clock() if now is None else now
+    start = now - window
+
+    periods = self._on_periods.get(device)
+    total = 0.0
+    if periods :
+      while periods and periods[0][1] <= start :
+        periods.popleft()
+      total = sum(end - max(begin, start) for begin, end in periods)
+
+    on_since = self._on_since.get(device)
+    if on_since is not None :
+      total += now - max(on_since, start)
+
+    return total
+
+  # 측정값이 켜짐, 꺼짐 기준 중 어디에 해당하는지 (True : 켜기, False : 끄기, None : 기준 사이 또는 측정 실패)
+  @staticmethod
+  def target(rule, value, daytime) :
+    if value is None :
+      return None
+
+    if daytime :
+      on_level, off_level = rule.on_day, rule.off_day
+    else :
+      on_level, off_level = rule.on_night, rule.off_night
+
+    if rule.above :
+      return True if value >= on_level else False if value < off_level else None
+
+    return True if value < on_level else False if value >= off_level else None
+
+  # 최대 가동률 도달 여부
+  def duty_limited(self, rule, now) :
+    return rule.max_on_time != math.inf and self.on_time(rule.device, rule.duty_window, now) >= rule.max_on_time
+
+  # 측정값으로 장치 상태가 바뀔 수 있는지 확인 (상태는 바꾸지 않음, 자동 제어 실행 여부 판단용)
+  # 기준을 넘었어도 최소 유지 시간, 최대 가동률 때문에 바꿀 수 없으면 False
+  def crossed(self, values, daytime, devices = None, now = None) :
+    now = self.clock() if now is None else now
+
+    for device in self.rules if devices is None else devices :
+      rule = self.rules[device]
+      state = self._state.get(device)
+      limited = self.duty_limited(rule, now)
+
+      if state and limited :
+        return True
+
+      target = self.target(rule, values.get(rule.metric), daytime)
+      if target is None or target == state or (target and limited) :
+        continue
+
+      if state is None or now - self._changed_at[device] >= (rule.min_on if state else rule.min_off) :
+        return True
+
+    return False
+
+  # 측정값으로 장치 상태 판단 (current : 현재 장치 상태, daytime : 낮 기준 적용 여부)
+  def evaluate(self, device, value, current, daytime, now = None) :
+    rule = self.rules[device]
+    now = self.clock() if now is None else now
+    self.observe(device, current, now)
+
+    on_level = rule.on_day if daytime else rule.on_night
+
+    # 최대 가동률 확인 (측정 실패와 관계없이 적용)
+    limited = self.duty_limited(rule, now)
+    if limited and current :
+      self.observe(device, False, now)
+      return Decision(device, False, True, value, on_level, 'max_duty')
+
+    # 측정 실패 시 현재 상태 유지
+    if value is None :
+      return Decision(device, current, False, None, on_level, 'sensor_read_failed')
+
+    # 켜짐, 꺼짐 기준 비교 (둘 다 아니면 기준 사이 - 현재 상태 유지)
+    target = self.target(rule, value, daytime)
+    if target is None :
+      return Decision(device, current, False, value, on_level, 'in range')
+
+    if target == current :
+      return Decision(device, current, False, value, on_level, 'steady')
+
+    if target and limited :
+      return Decision(device, current, False, value, on_level, 'max_duty')
+
+    # 최소 유지 시간 확인 (현재 상태를 알 때만)
+    if current is not None :
+      minimum = rule.min_on if current else rule.min_off
+      if now - self._changed_at[device] < minimum :
+        return Decision(device, current, False, value, on_level, 'min_on' if current else 'min_off')
+
+    self.observe(device, target, now)
+    return Decision(device, target, True, value, on_level, 'threshold')
+
+  # 규칙 엔진 통계
+  def get_stats(self) :
+    return {
+      'version' : self.version,
+      'compiles' : self.compiles,
+      'duty' : {
+        device : round(self.on_time(device, rule.duty_window) / rule.duty_window, 3)
+        for device, rule in self.rules.items()
+      },
+      'rules' : {device : rule._asdict() for device, rule in self.rules.items()}
+    }
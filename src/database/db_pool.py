@@ -0,0 +1,178 @@
+# 농작물 환경 모니터링을 위한 데이터베이스 연결 풀
+                                                                # 표준 라이브러리
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty, Full
+                                                                # 외부 라이브러리
+import pymysql
+                                                                # 로컬 모듈
+from config.constant import DATABASE_CONFIG, DB_POOL_CONFIG
+
+# 연결 자체가 끊어졌음을 의미하는 오류 (재연결 대상)
+CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+# 새 데이터베이스 연결 생성
+def create_connection() :
+  return pymysql.connect(**DATABASE_CONFIG)
+
+# 데이터베이스 연결 풀 클래스 - 센서, 제어, 모션 스레드가 함께 사용하는 스레드 안전 연결 풀
+class ConnectionPool :
+  def __init__(self, max_size = DB_POOL_CONFIG['max_size'],
+               acquire_timeout = DB_POOL_CONFIG['acquire_timeout'],
+               health_check_interval = DB_POOL_CONFIG['health_check_interval'],
+               connect = create_connection) :
+    self.max_size = max_size                                   # 최대 연결 수
+    self.acquire_timeout = acquire_timeout                     # 연결 대기 제한 시간 (초)
+    self.health_check_interval = health_check_interval         # 유휴 연결 상태 확인 주기 (초)
+    self._connect = connect                                    # 연결 생성 함수
+
+    self._idle = Queue(maxsize = max_size)                     # 유휴 연결 목록 (연결, 마지막 사용 시각)
+    self._lock = threading.Lock()
+    self._created = 0                                          # 현재 생성된 연결 수
+    self._invalidated_at = 0.0                                 # 연결 오류 발생 시각 (이전 유휴 연결 재확인용)
+    self._closed = False
+
+  # 연결 생성 슬롯 확보 (최대 연결 수 제한)
+  def _reserve_slot(self) :
+    with self._lock :
+      if self._created < self.max_size :
+        self._created += 1
+        return True
+
+    return False
+
+  # 연결 생성 슬롯 반납
+  def _release_slot(self) :
+    with self._lock :
+      self._created -= 1
+
+  # 확보한 슬롯으로 새 연결 생성 (실패 시 슬롯 반납)
+  def _open(self) :
+    try :
+      return self._connect()
+
+    except Exception :
+      self._release_slot()
+      raise
+
+  # 연결 종료 (오류 무시)
+  @staticmethod
+  def _close_quietly(conn) :
+    try :
+      conn.close()
+
+    except Exception :
+      pass
+
+  # 유휴 연결 상태 확인 - 오래 쉬었거나 연결 오류 이후 반납된 연결만 ping 으로 확인
+  def _ensure_alive(self, conn, last_used) :
+    if time.monotonic() - last_used < self.health_check_interval and last_used > self._invalidated_at :
+      return conn
+
+    try :
+      conn.ping(reconnect = True)                              # 끊어진 연결은 재연결
+      return conn
+
+    except Exception :
+      # 재연결 실패 시 새 연결로 교체 (슬롯은 그대로 유지)
+      self._close_quietly(conn)
+      try :
+        return self._connect()
+
+      except Exception :
+        self._release_slot()
+        raise
+
+  # 풀에서 연결 가져오기
+  def acquire(self) :
+    if self._closed :
+      raise RuntimeError("연결 풀이 종료되었습니다")
+
+    # 유휴 연결 재사용
+    try :
+      conn, last_used = self._idle.get_nowait()
+      return self._ensure_alive(conn, last_used)
+
+    except Empty :
+      pass
+
+    # 최대 연결 수 미만이면 새 연결 생성
+    if self._reserve_slot() :
+      return self._open()
+
+    # 다른 스레드가 반납할 때까지 대기
+    try :
+      conn, last_used = self._idle.get(timeout = self.acquire_timeout)
+
+    except Empty :
+      raise TimeoutError(f"데이터베이스 연결 대기 시간 초과 ({self.acquire_timeout}초)")
+
+    return self._ensure_alive(conn, last_used)
+
+  # 풀에 연결 반납 (broken=True 이면 연결을 폐기)
+  def release(self, conn, broken = False) :
+    if broken :
+      # 서버 재시작 등으로 끊긴 경우 다른 유휴 연결도 다음 사용 시 재확인
+      self._invalidated_at = time.monotonic()
+
+    if broken or self._closed :
+      self._close_quietly(conn)
+      self._release_slot()
+      return
+
+    try :
+      self._idle.put_nowait((conn, time.monotonic()))
+
+    except Full :
+      self._close_quietly(conn)
+      self._release_slot()
+
+  # with 문으로 연결 사용 (오류 시 롤백, 연결 오류 시 폐기)
+  @contextmanager
+  def connection(self) :
+    conn = self.acquire()
+    broken = False
+
+    try :
+      yield conn
+
+    except CONNECTION_ERRORS :
+      broken = True
+      raise
+
+    except Exception :
+      try :
+        conn.rollback()
+
+      except Exception :
+        broken = True
+      raise
+
+    finally :
+      self.release(conn, broken)
+
+  # 풀 상태 조회
+  def stats(self) :
+    return {
+      'max_size' : self.max_size,
+      'created' : self._created,
+      'idle' : self._idle.qsize()
+    }
+
+  # 모든 유휴 연결 종료
+  def close(self) :
+    self._closed = True
+
+    while True :
+      try :
+        conn, _ = self._idle.get_nowait()
+
+      except Empty :
+        break
+
+      self._close_quietly(conn)
+      self._release_slot()
+
+# 모든 스레드가 공유하는 연결 풀 (연결은 처음 사용할 때 생성)
+pool = ConnectionPool()
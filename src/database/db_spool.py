@@ -0,0 +1,118 @@
+# 농작물 환경 모니터링을 위한 데이터베이스 장애 대비 로컬 임시 저장소
+                                                                # 표준 라이브러리
+import json
+import sqlite3
+import threading
+from datetime import datetime
+                                                                # 로컬 모듈
+from config.constant import DB_SPOOL_CONFIG
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 행 직렬화 (datetime 은 초 단위 문자열로 저장)
+def encode_row(row) :
+  return json.dumps([
+    value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value
+    for value in row
+  ])
+
+# 로컬 임시 저장소 클래스 - MariaDB 저장에 실패한 행을 SQLite 파일에 순서대로 보관하고 복구 시 재전송
+class WriteSpool :
+  def __init__(self, path = DB_SPOOL_CONFIG['path'],
+               replay_batch = DB_SPOOL_CONFIG['replay_batch'],
+               max_rows = DB_SPOOL_CONFIG['max_rows']) :
+    self.path = path                                           # SQLite 파일 경로
+    self.replay_batch = replay_batch                           # 한 번에 재전송할 최대 행 수
+    self.max_rows = max_rows                                   # 최대 보관 행 수
+    self._db = None                                            # SQLite 연결 (처음 사용할 때 생성)
+    self._lock = threading.Lock()
+
+  # SQLite 연결 및 테이블 준비
+  def _connect(self) :
+    if self._db is None :
+      self._db = sqlite3.connect(self.path, check_same_thread = False)
+      self._db.execute("PRAGMA journal_mode = WAL")
+      self._db.execute("PRAGMA synchronous = FULL")           # 정전 시에도 보관 데이터 유지
+      self._db.execute("""
+        CREATE TABLE IF NOT EXISTS SPOOL (
+          ID INTEGER PRIMARY KEY AUTOINCREMENT,
+          TABLE_NAME TEXT NOT NULL,
+          ROW_DATA TEXT NOT NULL
+        )
+      """)
+      self._db.commit()
+
+    return self._db
+
+  # 저장 실패한 행 보관 (추가만 수행)
+  def append(self, table, rows) :
+    with self._lock :
+      db = self._connect()
+      db.executemany(
+        "INSERT INTO SPOOL (TABLE_NAME, ROW_DATA) VALUES (?, ?)",
+        [(table, encode_row(row)) for row in rows]
+      )
+
+      # 최대 보관 행 수 초과 시 가장 오래된 행 삭제
+      overflow = self._count(db) - self.max_rows
+      if overflow > 0 :
+        db.execute("DELETE FROM SPOOL WHERE ID IN (SELECT ID FROM SPOOL ORDER BY ID LIMIT ?)", (overflow,))
+        print(f"[{current_time()}] 로컬 임시 저장소 용량 초과 - 오래된 데이터 {overflow}건 삭제")
+
+      db.commit()
+
+  # 보관 중인 행 수
+  @staticmethod
+  def _count(db) :
+    return db.execute("SELECT COUNT(*) FROM SPOOL").fetchone()[0]
+
+  # 보관 중인 행 수 조회
+  def pending(self) :
+    with self._lock :
+      return self._count(self._connect())
+
+  # 보관된 행을 오래된 순서대로 재전송 (write 성공 후에만 삭제, 재전송 행 수 반환)
+  def replay(self, write) :
+    replayed = 0
+
+    while True :
+      with self._lock :
+        db = self._connect()
+        batch = db.execute(
+          "SELECT ID, TABLE_NAME, ROW_DATA FROM SPOOL ORDER BY ID LIMIT ?",
+          (self.replay_batch,)
+        ).fetchall()
+
+      if not batch :
+        break
+
+      # 테이블별로 묶어서 재전송
+      tables = {}
+      for _, table, row_data in batch :
+        tables.setdefault(table, []).append(tuple(json.loads(row_data)))
+
+      for table, rows in tables.items() :
+        write(table, rows)                                     # 실패 시 예외 발생 → 보관 데이터 유지
+
+      with self._lock :
+        db.execute("DELETE FROM SPOOL WHERE ID <= ?", (batch[-1][0],))
+        db.commit()
+
+      replayed += len(batch)
+
+    if replayed :
+      print(f"[{current_time()}] 로컬 임시 저장 데이터 {replayed}건 재전송 완료")
+
+    return replayed
+
+  # SQLite 연결 종료
+  def close(self) :
+    with self._lock :
+      if self._db is not None :
+        self._db.close()
+        self._db = None
+
+# 일괄 저장 스레드가 사용하는 로컬 임시 저장소
+spool = WriteSpool()
@@ -1,74 +1,79 @@
 # 농작물 환경 모니터링을 위한 데이터베이스 유틸리티
-                                                                # 외부 라이브러리
-import pymysql
+                                                                # 표준 라이브러리
 from datetime import datetime
                                                                 # 로컬 모듈
-from config.constant import DATABASE_CONFIG
+from database.db_pool import pool
+from database.db_spool import spool
+from database.db_writer import writer, write_rows
+
+# 행 저장 - 일괄 저장 스레드가 실행 중이면 대기열에 추가, 아니면 즉시 저장 후 임시 저장 데이터 재전송 (단독 실행 모드)
+def save_row(table, row) :
+  if writer.is_running() :
+    return writer.submit(table, row), False
+
+  try :
+    write_rows(table, [row])
+
+  except Exception as e :
+    # 저장 실패 시 로컬 임시 저장소에 보관 (데이터베이스 복구 후 재전송)
+    print(f"{table} 저장 오류 : {e}")
+    return writer.spool_rows(table, [row]), False
+
+  # 저장 스레드가 없으므로 직접 저장이 성공했을 때 남은 임시 저장 데이터 재전송
+  writer.replay_pending()
+  return True, True
 
 # 환경 센서 데이터를 GROWING_ENVIRONMENT 테이블에 저장
 def save_sensor(temperature, humidity, soil_percent, light_value) :
-    try :
-      db = pymysql.connect(**DATABASE_CONFIG)
-      cursor = db.cursor()
-  
-      # GROWING_ENVIRONMENT 테이블에 데이터 삽입
-      sql = f"""
-      INSERT INTO GROWING_ENVIRONMENT (
-          TEMPER
-          , HUMIDITY
-          , SOIL_HUMIDITY
-          , ILLUMINATION
-      ) VALUES (
-          {temperature:.1f},
-          {humidity:.1f},
-          {soil_percent:.1f},
-          {light_value}
-      )
-      """
-
-      # 쿼리 실행 및 데이터베이스에 반영
-      cursor.execute(sql)
-      db.commit()
-      db.close()
+  try :
+    # GROWING_ENVIRONMENT 테이블에 데이터 삽입 (측정 시각 포함)
+    success, written = save_row('GROWING_ENVIRONMENT', (
+      round(temperature, 1),
+      round(humidity, 1),
+      round(soil_percent, 1),
+      light_value,
+      datetime.now().replace(microsecond = 0)
+    ))
 
+    if written :
       current_time = datetime.now().strftime('%H:%M:%S')
       print(f"[{current_time}] 환경 센서 데이터 저장 완료")
-      return True
-        
-    except Exception as e :
-      print(f"환경 센서 데이터 저장 오류 : {e}")
-      return False
+
+    elif not success :
+      print("환경 센서 데이터 저장 실패 - 데이터를 버렸습니다")
+
+    return success
+
+  except Exception as e :
+    print(f"환경 센서 데이터 저장 오류 : {e}")
+    return False
 
 # 자동 제어 시스템 데이터를 DEVICE_STATUS 테이블에 저장
 def save_control(motion = 0, fan = 0, pump = 0, led = 0) :
   try :
-    db = pymysql.connect(**DATABASE_CONFIG)
-    cursor = db.cursor()
-
-    # DEVICE_STATUS 테이블에 데이터 삽입
-    sql = f"""
-    INSERT INTO DEVICE_STATUS(
-      MOTION_DETECTED
-      , FAN_MOTOR
-      , WATER_PUMP
-      , LED_LIGHT
-    ) VALUES(
-      {motion}
-      , {fan}
-      , {pump}
-      , {led}
-    )
-    """
-
-    # 쿼리 실행 및 데이터베이스에 반영
-    cursor.execute(sql)
-    db.commit()
-    db.close()
-
-    current_time = datetime.now().strftime('%H:%M:%S')
-    print(f"[{current_time}] 제어 시스템 데이터 저장 완료")
-    return True
-  
+    # DEVICE_STATUS 테이블에 데이터 삽입 (변경 시각 포함)
+    success, written = save_row('DEVICE_STATUS', (motion, fan, pump, led, datetime.now().replace(microsecond = 0)))
+
+    if written :
+      current_time = datetime.now().strftime('%H:%M:%S')
+      print(f"[{current_time}] 제어 시스템 데이터 저장 완료")
+
+    elif not success :
+      print("제어 시스템 데이터 저장 실패 - 데이터를 버렸습니다")
+
+    return success
+
   except Exception as e :
     print(f"제어 시스템 데이터 저장 오류 : {e}")
-    return False
\ No newline at end of file
+    return False
+
+# 프로그램 종료 시 데이터베이스 연결 정리 (대기열에 남은 데이터 저장 후 연결 종료)
+def cleanup() :
+  try :
+    writer.stop()
+    pool.close()
+    spool.close()
+    print("데이터베이스 연결 정리 완료")
+
+  except Exception as e :
+    print(f"데이터베이스 연결 정리 중 오류 : {e}")
@@ -0,0 +1,387 @@
+# 농작물 환경 모니터링을 위한 데이터베이스 일괄 저장 시스템
+                                                                # 표준 라이브러리
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from queue import Queue, Empty, Full
+                                                                # 로컬 모듈
+from config.constant import DB_WRITER_CONFIG, DB_SPOOL_CONFIG
+from database.db_pool import pool, CONNECTION_ERRORS
+from database.db_spool import spool as default_spool
+from database.rollup import compactor as default_compactor
+
+# 테이블별 저장 컬럼 (마지막 컬럼은 측정 시각 - 일괄 저장 및 재전송 시에도 원래 시각 유지)
+COLUMNS = {
+  'GROWING_ENVIRONMENT' : ('TEMPER', 'HUMIDITY', 'SOIL_HUMIDITY', 'ILLUMINATION', 'CREATE_DATE'),
+  'DEVICE_STATUS' : ('MOTION_DETECTED', 'FAN_MOTOR', 'WATER_PUMP', 'LED_LIGHT', 'TIMESTAMP')
+}
+
+# 테이블별 다중 행 삽입 쿼리
+INSERT_SQL = {
+  table : f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+  for table, columns in COLUMNS.items()
+}
+
+# 대기열 가득 참 처리 정책
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+# 저장 스레드 종료 신호
+_STOP = object()
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 여러 행을 executemany 로 한 번에 저장 (연결이 끊긴 경우 한 번 재시도)
+def write_rows(table, rows) :
+  for attempt in range(2) :
+    try :
+      with pool.connection() as db :
+        with db.cursor() as cursor :
+          cursor.executemany(INSERT_SQL[table], rows)
+        db.commit()
+        return
+
+    except CONNECTION_ERRORS :
+      if attempt == 1 :
+        raise
+
+# 중복 비교용 행 정규화 (실수는 소수 첫째 자리, 시각은 초 단위 문자열)
+def row_key(row) :
+  return tuple(
+    value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime)
+    else round(value, 1) if isinstance(value, float)
+    else value
+    for value in row
+  )
+
+# 재전송용 저장 - 같은 시각 범위에 이미 저장된 행은 제외하여 여러 번 재전송해도 한 번만 저장
+def write_rows_once(table, rows) :
+  columns = COLUMNS[table]
+  timestamps = [row_key(row)[-1] for row in rows]
+
+  with pool.connection() as db :
+    with db.cursor() as cursor :
+      cursor.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {columns[-1]} BETWEEN %s AND %s",
+        (min(timestamps), max(timestamps))
+      )
+      existing = Counter(row_key(row) for row in cursor.fetchall())
+
+      # 이미 저장된 행 제외 (같은 값의 행이 여러 개일 수 있으므로 개수 단위로 비교)
+      new_rows = []
+      for row in rows :
+        key = row_key(row)
+        if existing[key] > 0 :
+          existing[key] -= 1
+        else :
+          new_rows.append(row)
+
+      if new_rows :
+        cursor.executemany(INSERT_SQL[table], new_rows)
+
+    db.commit()
+
+# 데이터베이스 일괄 저장 클래스 - 작업 스레드는 대기열에 넣기만 하고 저장은 전용 스레드가 처리
+class DBWriter :
+  def __init__(self, queue_size = DB_WRITER_CONFIG['queue_size'],
+               batch_size = DB_WRITER_CONFIG['batch_size'],
+               flush_interval = DB_WRITER_CONFIG['flush_interval'],
+               overflow_policy = DB_WRITER_CONFIG['overflow_policy'],
+               block_timeout = DB_WRITER_CONFIG['block_timeout'],
+               retry_interval = DB_SPOOL_CONFIG['retry_interval'],
+               write = write_rows,
+               replay_write = write_rows_once,
+               spool = default_spool,
+               rollup = default_compactor) :
+    if overflow_policy not in OVERFLOW_POLICIES :
+      raise ValueError(f"알 수 없는 대기열 정책 : {overflow_policy}")
+
+    self.batch_size = batch_size                               # 한 번에 저장할 최대 행 수
+    self.flush_interval = flush_interval                       # 대기열 저장 주기 (초)
+    self.overflow_policy = overflow_policy                     # 대기열 가득 참 처리 정책
+    self.block_timeout = block_timeout                         # block 정책 대기 제한 시간 (초)
+    self.retry_interval = retry_interval                       # 임시 저장 데이터 재전송 시도 주기 (초)
+    self._write = write                                        # 테이블별 일괄 저장 함수
+    self._replay_write = replay_write                          # 재전송용 중복 방지 저장 함수
+    self.spool = spool                                         # 저장 실패 행 로컬 임시 저장소
+    self.rollup = rollup                                       # 시간별, 일별 집계 관리 객체
+    self._spool_pending = False                                # 재전송 대기 중인 임시 저장 데이터 여부
+    self._last_attempt = 0.0                                   # 마지막 데이터베이스 저장 실패 또는 복구 시도 시각
+    self._spool_checked = False                                # 이전 실행의 임시 저장 데이터 확인 여부
+
+    self._queue = Queue(maxsize = queue_size)                  # 저장 대기열 (테이블, 행)
+    self._thread = None
+    self._stopping = False
+    self.external = False                                      # 외부 이벤트 루프가 flush_pending 으로 저장 주기를 맡는지 여부
+    self._stats_lock = threading.Lock()                        # 여러 작업 스레드의 통계 갱신 보호
+    self._replay_lock = threading.Lock()                       # 재전송 동시 실행 방지 (단독 실행 모드는 작업 스레드마다 재전송 시도)
+
+    # 저장 통계
+    self.stats = {
+      'enqueued' : 0,                                          # 대기열에 추가된 행 수
+      'written' : 0,                                           # 저장 완료된 행 수
+      'dropped' : 0,                                           # 대기열 정책으로 버려진 행 수
+      'failed' : 0,                                            # 저장 실패 후 버려진 행 수
+      'spooled' : 0,                                           # 로컬 임시 저장소에 보관된 행 수
+      'replayed' : 0,                                          # 복구 후 재전송된 행 수
+      'flushes' : 0                                            # 일괄 저장 횟수
+    }
+
+  # 저장 스레드 실행 여부 (외부 이벤트 루프가 저장 주기를 맡은 경우 포함 - 대기열에 추가만 하면 됨)
+  def is_running(self) :
+    return (self.external or (self._thread is not None and self._thread.is_alive())) and not self._stopping
+
+  # 이전 실행에서 남은 임시 저장 데이터 확인 (있으면 다음 저장 때 재전송)
+  def check_spool(self) :
+    self._spool_checked = True
+
+    try :
+      self._spool_pending = self._spool_pending or (self.spool is not None and self.spool.pending() > 0)
+    except Exception as e :
+      print(f"로컬 임시 저장소 확인 오류 : {e}")
+
+  # 저장 스레드 시작
+  def start(self) :
+    if self._thread is not None and self._thread.is_alive() :
+      return
+
+    self._stopping = False
+
+    # 이전 실행에서 남은 임시 저장 데이터 확인 (시작 직후 재전송)
+    self.check_spool()
+
+    self._thread = threading.Thread(target = self._run, name = "데이터베이스 일괄 저장", daemon = True)
+    self._thread.start()
+
+  # 작업 스레드 통계 갱신
+  def _count(self, key, amount = 1) :
+    with self._stats_lock :
+      self.stats[key] += amount
+
+  # 저장할 행을 대기열에 추가 (대기열 정책에 따라 처리, 추가 여부 반환)
+  def submit(self, table, row) :
+    if self._stopping :
+      return False
+
+    item = (table, row)
+
+    try :
+      if self.overflow_policy == 'block' :
+        self._queue.put(item, timeout = self.block_timeout)    # 제한 시간까지만 대기
+      else :
+        self._queue.put_nowait(item)
+
+    except Full :
+      if self.overflow_policy != 'drop_oldest' :
+        self._count('dropped')
+        return False
+
+      # 가장 오래된 행을 버리고 새 행 추가
+      try :
+        self._queue.get_nowait()
+        self._count('dropped')
+      except Empty :
+        pass
+
+      try :
+        self._queue.put_nowait(item)
+      except Full :
+        self._count('dropped')
+        return False
+
+    self._count('enqueued')
+    return True
+
+  # 저장 실패한 행을 로컬 임시 저장소에 보관
+  def spool_rows(self, table, rows) :
+    if self.spool is None :
+      self._count('failed', len(rows))
+      return False
+
+    try :
+      self.spool.append(table, rows)
+      self._count('spooled', len(rows))
+      self._spool_pending = True
+      self._last_attempt = time.monotonic()
+      print(f"[{current_time()}] {table} {len(rows)}건 로컬 임시 저장")
+      return True
+
+    except Exception as e :
+      self._count('failed', len(rows))
+      print(f"[{current_time()}] 로컬 임시 저장 오류 : {e}")
+      return False
+
+  # 재전송 행 저장 - 과거 시각 데이터이므로 해당 시각부터 집계를 다시 계산하도록 표시
+  def _replay_rows(self, table, rows) :
+    self._replay_write(table, rows)
+
+    if self.rollup is not None :
+      self.rollup.invalidate(table, min(str(row[-1]) for row in rows))
+
+  # 로컬 임시 저장소의 행 재전송 (데이터베이스 복구 확인 겸용)
+  # 다른 스레드가 재전송 중이면 기다리지 않고 건너뜀 (같은 묶음을 동시에 재전송하면 중복 확인 후 저장이 겹쳐 중복 저장됨)
+  def _replay(self) :
+    if not self._replay_lock.acquire(blocking = False) :
+      return False
+
+    try :
+      self._last_attempt = time.monotonic()
+      self._count('replayed', self.spool.replay(self._replay_rows))
+      self._spool_pending = False
+      return True
+
+    except Exception as e :
+      print(f"[{current_time()}] 로컬 임시 저장 데이터 재전송 실패 : {e}")
+      return False
+
+    finally :
+      self._replay_lock.release()
+
+  # 직접 저장 성공 후 임시 저장 데이터 재전송 (저장 스레드 없는 단독 실행 모드용, 재전송 여부 반환)
+  def replay_pending(self) :
+    if self.spool is None :
+      return False
+
+    # 이전 실행에서 남은 임시 저장 데이터는 처음 한 번만 확인
+    if not self._spool_checked :
+      self.check_spool()
+
+    return self._spool_pending and self._replay()
+
+  # 모인 행을 테이블별로 일괄 저장
+  def _flush(self, pending) :
+    # 데이터베이스 장애가 이어지는 동안에는 복구 확인 주기 전까지 새 행도 바로 임시 저장 (연결 시도 반복 방지)
+    if not self._spool_pending :
+      database_up = True
+    elif time.monotonic() < self._last_attempt + self.retry_interval :
+      database_up = False
+    else :
+      database_up = self._replay()
+
+    for table, rows in pending.items() :
+      if not rows :
+        continue
+
+      if not database_up :
+        self.spool_rows(table, rows)
+
+      else :
+        try :
+          self._write(table, rows)
+          self._count('written', len(rows))
+          print(f"[{current_time()}] {table} {len(rows)}건 일괄 저장 완료")
+
+        except Exception as e :
+          print(f"[{current_time()}] {table} 일괄 저장 오류 : {e}")
+          database_up = False
+          self.spool_rows(table, rows)
+
+      pending[table] = []
+
+    self._count('flushes')
+
+    # 데이터베이스가 정상이면 집계 테이블 점진 갱신 (갱신 주기마다)
+    if database_up and self.rollup is not None :
+      self.rollup.run_if_due()
+
+  # 저장 스레드 - 행 수 또는 저장 주기 중 먼저 도달한 조건으로 저장
+  def _run(self) :
+    pending = {table : [] for table in INSERT_SQL}
+    count = 0
+    deadline = None
+
+    while True :
+      timeout = None if deadline is None else max(0, deadline - time.monotonic())
+
+      # 임시 저장 데이터가 있으면 새 행이 없어도 주기적으로 복구 확인
+      if self._spool_pending :
+        retry_in = max(0, self._last_attempt + self.retry_interval - time.monotonic())
+        timeout = retry_in if timeout is None else min(timeout, retry_in)
+
+      try :
+        item = self._queue.get(timeout = timeout)
+      except Empty :
+        item = None                                            # 저장 주기 또는 복구 확인 주기 도달
+
+      if item is _STOP :
+        break
+
+      if self._spool_pending and count == 0 and time.monotonic() >= self._last_attempt + self.retry_interval :
+        self._replay()
+
+      if item is not None :
+        table, row = item
+        pending[table].append(row)
+        count += 1
+
+        # 첫 행이 들어온 시점부터 저장 주기 계산
+        if deadline is None :
+          deadline = time.monotonic() + self.flush_interval
+
+      if count >= self.batch_size or (deadline is not None and time.monotonic() >= deadline) :
+        self._flush(pending)
+        count = 0
+        deadline = None
+
+    # 종료 전 대기열에 남은 행 모두 저장
+    while True :
+      try :
+        item = self._queue.get_nowait()
+      except Empty :
+        break
+
+      if item is not _STOP :
+        table, row = item
+        pending[table].append(row)
+
+    self._flush(pending)
+
+  # 대기열에 쌓인 행을 호출한 스레드에서 바로 저장 (저장 스레드 없이 이벤트 루프가 저장 주기를 맡을 때 사용, 꺼낸 행 수 반환)
+  def flush_pending(self) :
+    pending = {table : [] for table in INSERT_SQL}
+    count = 0
+
+    while True :
+      try :
+        item = self._queue.get_nowait()
+      except Empty :
+        break
+
+      if item is not _STOP :
+        table, row = item
+        pending[table].append(row)
+        count += 1
+
+    # 새 행이 없어도 임시 저장 데이터 복구 확인 주기가 되면 재전송 시도
+    if count or (self._spool_pending and time.monotonic() >= self._last_attempt + self.retry_interval) :
+      self._flush(pending)
+
+    return count
+
+  # 저장 스레드 종료 (남은 행을 모두 저장한 뒤 종료)
+  def stop(self, timeout = 10) :
+    if self._thread is None or not self._thread.is_alive() :
+      return
+
+    self._stopping = True
+
+    try :
+      self._queue.put(_STOP, timeout = timeout)
+    except Full :
+      print("데이터베이스 일괄 저장 대기열 종료 신호 전달 실패")
+
+    self._thread.join(timeout)
+    print(f"데이터베이스 일괄 저장 종료 (저장 {self.stats['written']}건, 임시 저장 {self.stats['spooled']}건, 버림 {self.stats['dropped'] + self.stats['failed']}건)")
+
+  # 대기열 상태 조회
+  def get_stats(self) :
+    return {
+      **self.stats,
+      'queue_depth' : self._queue.qsize(),
+      'spool_pending' : self._spool_pending
+    }
+
+# 모든 작업 스레드가 공유하는 일괄 저장 객체 (통합 시스템에서 시작)
+writer = DBWriter()
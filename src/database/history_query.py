@@ -0,0 +1,233 @@
+# 농작물 환경 모니터링을 위한 기간별 데이터 조회 (서버 측 구간 집계)
+                                                                # 표준 라이브러리
+import math
+from datetime import datetime, timedelta
+                                                                # 로컬 모듈
+from database.db_pool import pool
+from database.rollup import floor_hour, floor_day, to_datetime
+
+# 조회 항목별 (테이블, 컬럼, 시각 컬럼)
+METRIC_COLUMNS = {
+  'temperature' : ('GROWING_ENVIRONMENT', 'TEMPER', 'CREATE_DATE'),
+  'humidity' : ('GROWING_ENVIRONMENT', 'HUMIDITY', 'CREATE_DATE'),
+  'soil_moisture' : ('GROWING_ENVIRONMENT', 'SOIL_HUMIDITY', 'CREATE_DATE'),
+  'light_value' : ('GROWING_ENVIRONMENT', 'ILLUMINATION', 'CREATE_DATE'),
+  'motion' : ('DEVICE_STATUS', 'MOTION_DETECTED', 'TIMESTAMP'),
+  'fan' : ('DEVICE_STATUS', 'FAN_MOTOR', 'TIMESTAMP'),
+  'pump' : ('DEVICE_STATUS', 'WATER_PUMP', 'TIMESTAMP'),
+  'led' : ('DEVICE_STATUS', 'LED_LIGHT', 'TIMESTAMP')
+}
+
+# 조회 제한
+MAX_POINTS = 5000                                          # 항목별 최대 구간 수
+DEFAULT_POINTS = 500                                       # 기본 구간 수
+CHUNK_SIZE = 200                                           # 한 번에 전송할 구간 수
+
+# 시각 문자열 또는 epoch 초를 datetime 으로 변환
+def parse_time(value, default) :
+  if value is None :
+    return default
+
+  if isinstance(value, (int, float)) :
+    return datetime.fromtimestamp(value)
+
+  return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+
+# 환경 데이터 집계 테이블 (구간 길이가 집계 단위의 배수이면 원본 대신 사용)
+ROLLUP_TABLES = (
+  (86400, 'GROWING_ENVIRONMENT_DAILY'),
+  (3600, 'GROWING_ENVIRONMENT_HOURLY')
+)
+
+# 조회 기간과 목표 구간 수로 구간 길이(초) 계산
+def bucket_seconds(start, end, points) :
+  span = (end - start).total_seconds()
+  return max(1, math.ceil(span / max(1, points)))
+
+# 구간 길이에 쓸 집계 단위 (집계 단위 이상이면 가장 큰 단위, 아니면 None)
+def rollup_unit(bucket) :
+  for unit, _ in ROLLUP_TABLES :
+    if bucket >= unit :
+      return unit
+
+  return None
+
+# 조회 요청 검증 및 정규화
+def build_request(data) :
+  end = parse_time(data.get('end'), datetime.now())
+  start = parse_time(data.get('start'), end - timedelta(days = 1))
+
+  if start >= end :
+    raise ValueError("조회 시작 시각이 종료 시각보다 늦습니다")
+
+  metrics = data.get('metrics') or ['temperature', 'humidity', 'soil_moisture', 'light_value']
+  unknown = [metric for metric in metrics if metric not in METRIC_COLUMNS]
+  if unknown :
+    raise ValueError(f"알 수 없는 조회 항목 : {', '.join(unknown)}")
+
+  points = min(int(data.get('points', DEFAULT_POINTS)), MAX_POINTS)
+  bucket = bucket_seconds(start, end, points)
+  unit = rollup_unit(bucket)
+
+  # 집계 단위 이상이면 구간 길이를 단위의 배수로 올리고 구간 기준을 집계 행 경계(현지 정시, 자정)에 맞춤
+  # (구간마다 같은 수의 집계 행이 들어가고 첫/마지막 구간이 집계 행 일부만 포함하지 않게)
+  if unit is not None :
+    bucket = math.ceil(bucket / unit) * unit
+    start = floor_day(start) if unit == 86400 else floor_hour(start)
+    origin = int(start.timestamp())
+    end = datetime.fromtimestamp(origin + math.ceil((end.timestamp() - origin) / bucket) * bucket)
+
+  else :
+    origin = math.floor(start.timestamp() / bucket) * bucket
+
+  return {
+    'start' : start,
+    'end' : end,
+    'metrics' : metrics,
+    'bucket' : bucket,
+    'origin' : origin                                      # 구간 기준 시각 (epoch 초, 구간 = origin + n * bucket)
+  }
+
+# 테이블별로 조회 항목 묶기
+def group_by_table(metrics) :
+  tables = {}
+  for metric in metrics :
+    table, column, time_column = METRIC_COLUMNS[metric]
+    tables.setdefault((table, time_column), []).append((metric, column))
+
+  return tables
+
+# 집계 테이블에서 구간별 최소, 최대, 가중 평균 집계 쿼리 생성 (원본 대신 수백 행만 조회)
+def build_rollup_sql(rollup_table, columns) :
+  aggregates = ', '.join(
+    f"MIN({column}_MIN), MAX({column}_MAX), SUM({column}_AVG * SAMPLE_COUNT) / SUM(SAMPLE_COUNT)"
+    for _, column in columns
+  )
+
+  return f"""
+    SELECT FLOOR((UNIX_TIMESTAMP(BUCKET_START) - %s) / %s) AS BUCKET, SUM(SAMPLE_COUNT), {aggregates}
+    FROM {rollup_table}
+    WHERE BUCKET_START >= %s AND BUCKET_START < %s
+    GROUP BY BUCKET
+    ORDER BY BUCKET
+  """
+
+# 구간 길이가 집계 단위의 배수인 환경 데이터 집계 테이블 (없으면 None)
+def rollup_table_for(table, bucket) :
+  if table == 'GROWING_ENVIRONMENT' :
+    for unit, rollup_table in ROLLUP_TABLES :
+      if bucket >= unit and bucket % unit == 0 :
+        return unit, rollup_table
+
+  return None
+
+# 구간별 최소, 최대, 평균 집계 쿼리 생성 (use_rollup 이면 집계 테이블 사용 가능 여부 확인)
+def build_bucket_sql(table, time_column, columns, bucket = 1, use_rollup = True) :
+  rollup = rollup_table_for(table, bucket) if use_rollup else None
+  if rollup is not None :
+    return build_rollup_sql(rollup[1], columns)
+
+  aggregates = ', '.join(
+    f"MIN({column}), MAX({column}), AVG({column})" for _, column in columns
+  )
+
+  return f"""
+    SELECT FLOOR((UNIX_TIMESTAMP({time_column}) - %s) / %s) AS BUCKET, COUNT(*), {aggregates}
+    FROM {table}
+    WHERE {time_column} >= %s AND {time_column} < %s
+    GROUP BY BUCKET
+    ORDER BY BUCKET
+  """
+
+# 집계 행 묶음을 항목별 열 배열로 변환 (JSON 크기 절감)
+def to_columns(rows, columns, bucket, origin = 0) :
+  chunk = {
+    't' : [origin + int(row[0]) * bucket for row in rows], # 구간 시작 시각 (epoch 초)
+    'count' : [int(row[1]) for row in rows]
+  }
+
+  for index, (metric, _) in enumerate(columns) :
+    offset = 2 + index * 3
+    chunk[metric] = {
+      'min' : [row[offset] for row in rows],
+      'max' : [row[offset + 1] for row in rows],
+      'avg' : [round(float(row[offset + 2]), 2) if row[offset + 2] is not None else None for row in rows]
+    }
+
+  return chunk
+
+# 조회 기간을 CHUNK_SIZE 구간씩 나눈 (시작, 끝) 시각 목록 - 구간 경계(origin + 구간 배수)에 맞춰 구간이 두 묶음으로 갈리지 않게
+def page_ranges(request, chunk_size = CHUNK_SIZE) :
+  bucket = request['bucket']
+  span = bucket * chunk_size
+  first = request['origin']
+
+  ranges = []
+  page_start = request['start']
+  for boundary in range(int(first) + span, math.ceil(request['end'].timestamp()) + span, span) :
+    page_end = min(request['end'], datetime.fromtimestamp(boundary))
+    if page_start < page_end :
+      ranges.append((page_start, page_end))
+    page_start = page_end
+
+  return ranges
+
+# 집계 테이블 진행 위치 조회 (이 시각 이전 집계 행만 확정, 없으면 None)
+def rollup_watermark(table) :
+  with pool.connection() as db :
+    with db.cursor() as cursor :
+      cursor.execute("SELECT WATERMARK FROM ROLLUP_STATE WHERE TABLE_NAME = %s", (table,))
+      row = cursor.fetchone()
+
+  return to_datetime(row[0]) if row and row[0] is not None else None
+
+# 테이블 조회 구간 목록 (쿼리, 시작, 끝) - 집계 테이블은 진행 위치 이전 구간 경계까지만, 이후는 원본 테이블에서 집계
+def table_segments(request, table, time_column, columns) :
+  bucket = request['bucket']
+  start, end = request['start'], request['end']
+  raw_sql = build_bucket_sql(table, time_column, columns, bucket, use_rollup = False)
+
+  if rollup_table_for(table, bucket) is None :
+    return [(raw_sql, start, end)]
+
+  # 진행 위치를 구간 경계로 내림 (경계 구간이 집계 테이블과 원본에 나뉘어 두 번 나오지 않게)
+  watermark = rollup_watermark(table)
+  if watermark is None :
+    return [(raw_sql, start, end)]
+
+  origin = request['origin']
+  boundary = origin + math.floor((watermark.timestamp() - origin) / bucket) * bucket
+  split = min(end, max(start, datetime.fromtimestamp(boundary)))
+
+  segments = []
+  if start < split :
+    segments.append((build_bucket_sql(table, time_column, columns, bucket), start, split))
+  if split < end :
+    segments.append((raw_sql, split, end))
+
+  return segments
+
+# 구간 집계 결과를 CHUNK_SIZE 단위로 나누어 반환하는 생성기 (전체 결과를 메모리에 올리지 않음)
+# 묶음마다 연결을 빌려 조회하고 바로 반납 (느린 클라이언트에 전송하는 동안 연결 풀을 점유하지 않음)
+def iter_history(request, chunk_size = CHUNK_SIZE) :
+  bucket = request['bucket']
+  origin = request['origin']
+  ranges = page_ranges(request, chunk_size)
+
+  for (table, time_column), columns in group_by_table(request['metrics']).items() :
+    segments = table_segments(request, table, time_column, columns)
+
+    for page_start, page_end in ranges :
+      rows = []
+
+      with pool.connection() as db :
+        with db.cursor() as cursor :
+          # 묶음이 집계 테이블, 원본 구간에 걸치면 나누어 조회 (경계가 구간 경계이므로 구간 순서 유지)
+          for sql, start, end in segments :
+            start, end = max(start, page_start), min(end, page_end)
+            if start < end :
+              cursor.execute(sql, (origin, bucket, start, end))
+              rows.extend(cursor.fetchall())
+
+      if rows :
+        yield table, to_columns(rows, columns, bucket, origin)
@@ -0,0 +1,290 @@
+# 농작물 환경 모니터링을 위한 시간별, 일별 집계 테이블 관리
+                                                                # 표준 라이브러리
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+                                                                # 로컬 모듈
+from config.constant import ROLLUP_CONFIG
+from database.db_pool import pool
+
+# 환경 데이터 집계 컬럼
+ENV_FIELDS = ('TEMPER', 'HUMIDITY', 'SOIL_HUMIDITY', 'ILLUMINATION')
+
+# 집계 테이블 컬럼 목록 (구간 시작, 표본 수, 항목별 최소/최대/평균)
+ENV_ROLLUP_COLUMNS = ['BUCKET_START', 'SAMPLE_COUNT'] + [
+  f"{field}_{kind}" for field in ENV_FIELDS for kind in ('MIN', 'MAX', 'AVG')
+]
+
+# 갱신 시 덮어쓸 컬럼
+ENV_UPDATE = ', '.join(f"{column} = VALUES({column})" for column in ENV_ROLLUP_COLUMNS[1 :])
+
+# 원본 데이터 → 시간별 집계 (구간 단위로 다시 계산하므로 여러 번 실행해도 결과 동일)
+ENV_HOURLY_SQL = f"""
+  INSERT INTO GROWING_ENVIRONMENT_HOURLY ({', '.join(ENV_ROLLUP_COLUMNS)})
+  SELECT DATE_FORMAT(CREATE_DATE, '%%Y-%%m-%%d %%H:00:00') AS BUCKET, COUNT(*),
+    {', '.join(f"MIN({field}), MAX({field}), AVG({field})" for field in ENV_FIELDS)}
+  FROM GROWING_ENVIRONMENT
+  WHERE CREATE_DATE >= %s AND CREATE_DATE < %s
+  GROUP BY BUCKET
+  ON DUPLICATE KEY UPDATE {ENV_UPDATE}
+"""
+
+# 시간별 집계 → 일별 집계 (평균은 표본 수 가중 평균)
+ENV_DAILY_SQL = f"""
+  INSERT INTO GROWING_ENVIRONMENT_DAILY ({', '.join(ENV_ROLLUP_COLUMNS)})
+  SELECT DATE(BUCKET_START) AS BUCKET, SUM(SAMPLE_COUNT),
+    {', '.join(
+      f"MIN({field}_MIN), MAX({field}_MAX), SUM({field}_AVG * SAMPLE_COUNT) / SUM(SAMPLE_COUNT)"
+      for field in ENV_FIELDS
+    )}
+  FROM GROWING_ENVIRONMENT_HOURLY
+  WHERE BUCKET_START >= %s AND BUCKET_START < %s
+  GROUP BY BUCKET
+  ON DUPLICATE KEY UPDATE {ENV_UPDATE}
+"""
+
+# 제어 상태 집계 컬럼 (구간 시작, 기록 수, 모션 감지 수, 장치별 가동 시간)
+DEVICE_ROLLUP_COLUMNS = ('BUCKET_START', 'EVENT_COUNT', 'MOTION_COUNT', 'FAN_ON_SECONDS', 'PUMP_ON_SECONDS', 'LED_ON_SECONDS')
+DEVICE_UPDATE = ', '.join(f"{column} = VALUES({column})" for column in DEVICE_ROLLUP_COLUMNS[1 :])
+
+DEVICE_HOURLY_SQL = f"""
+  INSERT INTO DEVICE_STATUS_HOURLY ({', '.join(DEVICE_ROLLUP_COLUMNS)})
+  VALUES ({', '.join(['%s'] * len(DEVICE_ROLLUP_COLUMNS))})
+  ON DUPLICATE KEY UPDATE {DEVICE_UPDATE}
+"""
+
+DEVICE_DAILY_SQL = f"""
+  INSERT INTO DEVICE_STATUS_DAILY ({', '.join(DEVICE_ROLLUP_COLUMNS)})
+  SELECT DATE(BUCKET_START) AS BUCKET, {', '.join(f"SUM({column})" for column in DEVICE_ROLLUP_COLUMNS[1 :])}
+  FROM DEVICE_STATUS_HOURLY
+  WHERE BUCKET_START >= %s AND BUCKET_START < %s
+  GROUP BY BUCKET
+  ON DUPLICATE KEY UPDATE {DEVICE_UPDATE}
+"""
+
+# 원본 테이블별 시각 컬럼
+TIME_COLUMNS = {
+  'GROWING_ENVIRONMENT' : 'CREATE_DATE',
+  'DEVICE_STATUS' : 'TIMESTAMP'
+}
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 정시로 내림
+def floor_hour(value) :
+  return value.replace(minute = 0, second = 0, microsecond = 0)
+
+# 자정으로 내림
+def floor_day(value) :
+  return value.replace(hour = 0, minute = 0, second = 0, microsecond = 0)
+
+# 시각 문자열 또는 datetime 을 datetime 으로 변환
+def to_datetime(value) :
+  if isinstance(value, datetime) :
+    return value
+
+  return datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S')
+
+# 제어 상태 기록으로 시간별 장치 가동 시간 계산
+# rows : (시각, 모션, 팬, 펌프, LED) 시간순, state : 구간 시작 시점의 (팬, 펌프, LED) 상태
+def device_hourly_rows(rows, state, start, end) :
+  buckets = {}
+  hour = start
+  while hour < end :
+    buckets[hour] = [0, 0, 0, 0, 0]                            # 기록 수, 모션 수, 팬/펌프/LED 가동 초
+    hour += timedelta(hours = 1)
+
+  # 이전 상태 유지 구간의 가동 시간을 시간 구간별로 나누어 누적
+  def accumulate(state, begin, finish) :
+    while begin < finish :
+      bucket = floor_hour(begin)
+      boundary = min(bucket + timedelta(hours = 1), finish)
+      seconds = (boundary - begin).total_seconds()
+      for index, on in enumerate(state) :
+        if on :
+          buckets[bucket][2 + index] += seconds
+      begin = boundary
+
+  cursor = start
+  for timestamp, motion, fan, pump, led in rows :
+    timestamp = to_datetime(timestamp)
+    accumulate(state, cursor, timestamp)
+    cursor = timestamp
+
+    bucket = buckets[floor_hour(timestamp)]
+    bucket[0] += 1
+
+    # 모션 감지 기록은 장치 상태를 담고 있지 않으므로 상태 갱신에서 제외
+    if motion :
+      bucket[1] += 1
+    else :
+      state = (fan, pump, led)
+
+  accumulate(state, cursor, end)
+
+  return [
+    (hour, values[0], values[1], *(int(round(seconds)) for seconds in values[2 :]))
+    for hour, values in buckets.items()
+  ]
+
+# 집계 관리 클래스 - 진행 위치 이후 구간만 다시 계산하여 집계 테이블을 점진적으로 갱신
+class RollupCompactor :
+  def __init__(self, interval = ROLLUP_CONFIG['interval'],
+               max_days_per_run = ROLLUP_CONFIG['max_days_per_run'],
+               settle = ROLLUP_CONFIG['settle']) :
+    self.interval = interval                                   # 집계 갱신 주기 (초)
+    self.max_days_per_run = max_days_per_run                   # 한 번에 집계할 최대 기간 (일)
+    self.settle = timedelta(seconds = settle)                  # 진행 위치를 늦출 시간 (대기열에 남은 행 저장 대기)
+    self._last_run = 0.0
+    self._dirty = {}                                           # 늦게 저장된 데이터의 가장 이른 시각 (원본 테이블별)
+    self._lock = threading.Lock()
+
+  # 과거 시각 데이터가 늦게 저장된 경우 (임시 저장 재전송) 해당 시각부터 다시 집계
+  def invalidate(self, table, since) :
+    since = to_datetime(since)
+
+    with self._lock :
+      if table not in self._dirty or since < self._dirty[table] :
+        self._dirty[table] = since
+
+  # 집계 시작 위치와 반영할 재집계 요청 조회 (진행 위치가 없으면 원본 데이터의 가장 이른 시각)
+  def _start_of(self, cursor, table) :
+    cursor.execute("SELECT WATERMARK FROM ROLLUP_STATE WHERE TABLE_NAME = %s", (table,))
+    row = cursor.fetchone()
+
+    if row is None :
+      cursor.execute(f"SELECT MIN({TIME_COLUMNS[table]}) FROM {table}")
+      row = cursor.fetchone()
+
+    start = row[0] if row else None
+
+    with self._lock :
+      dirty = self._dirty.get(table)
+
+    if dirty is not None and (start is None or dirty < start) :
+      start = dirty
+
+    return (floor_hour(to_datetime(start)) if start is not None else None), dirty
+
+  # 집계 진행 위치 저장
+  def _save_watermark(self, cursor, table, watermark) :
+    cursor.execute(
+      "INSERT INTO ROLLUP_STATE (TABLE_NAME, WATERMARK) VALUES (%s, %s) "
+      "ON DUPLICATE KEY UPDATE WATERMARK = VALUES(WATERMARK)",
+      (table, watermark)
+    )
+
+  # 환경 데이터 시간별, 일별 집계
+  def _compact_environment(self, cursor, start, end) :
+    cursor.execute(ENV_HOURLY_SQL, (start, end))
+    cursor.execute(ENV_DAILY_SQL, (floor_day(start), end))
+
+  # 제어 상태 시간별, 일별 집계
+  def _compact_device(self, cursor, start, end) :
+    # 구간 시작 시점의 장치 상태 (마지막 제어 기록)
+    cursor.execute(
+      "SELECT FAN_MOTOR, WATER_PUMP, LED_LIGHT FROM DEVICE_STATUS "
+      "WHERE TIMESTAMP < %s AND MOTION_DETECTED = 0 ORDER BY TIMESTAMP DESC LIMIT 1",
+      (start,)
+    )
+    previous = cursor.fetchone()
+
+    cursor.execute(
+      "SELECT TIMESTAMP, MOTION_DETECTED, FAN_MOTOR, WATER_PUMP, LED_LIGHT FROM DEVICE_STATUS "
+      "WHERE TIMESTAMP >= %s AND TIMESTAMP < %s ORDER BY TIMESTAMP, STATUS_ID",
+      (start, end)
+    )
+    rows = cursor.fetchall()
+
+    hourly = device_hourly_rows(rows, tuple(previous) if previous else (0, 0, 0), start, end)
+    if hourly :
+      cursor.executemany(DEVICE_HOURLY_SQL, hourly)
+
+    cursor.execute(DEVICE_DAILY_SQL, (floor_day(start), end))
+
+  # 원본 테이블 하나를 진행 위치부터 집계 (모두 따라잡았으면 True)
+  def _compact(self, db, table, now) :
+    with db.cursor() as cursor :
+      start, dirty = self._start_of(cursor, table)
+      if start is None :
+        return True                                            # 원본 데이터 없음
+
+      end = min(start + timedelta(days = self.max_days_per_run), now)
+
+      if table == 'GROWING_ENVIRONMENT' :
+        self._compact_environment(cursor, start, end)
+      else :
+        self._compact_device(cursor, start, end)
+
+      # 진행 중인 현재 시간 구간과 대기열에 남은 행이 아직 저장되지 않았을 수 있는 시간 구간은 다음 실행에서 다시 계산
+      self._save_watermark(cursor, table, floor_hour(min(end, now - self.settle)))
+
+    db.commit()
+
+    # 반영된 재집계 요청 제거 (집계 중 새로 들어온 요청은 유지)
+    with self._lock :
+      if dirty is not None and self._dirty.get(table) == dirty :
+        del self._dirty[table]
+
+    return end >= now
+
+  # 모든 집계 테이블 갱신 (모두 따라잡았으면 True)
+  def run(self, now = None) :
+    now = now or datetime.now().replace(microsecond = 0)
+    self._last_run = time.monotonic()
+    caught_up = True
+
+    with pool.connection() as db :
+      for table in TIME_COLUMNS :
+        caught_up = self._compact(db, table, now) and caught_up
+
+    return caught_up
+
+  # 집계 주기가 지났으면 갱신 (일괄 저장 스레드에서 호출)
+  def run_if_due(self) :
+    if time.monotonic() - self._last_run < self.interval :
+      return
+
+    try :
+      self.run()
+
+    except Exception as e :
+      print(f"[{current_time()}] 집계 테이블 갱신 오류 : {e}")
+
+  # 기존 원본 데이터로 집계 테이블 채우기 (since 가 없으면 원본 데이터 처음부터)
+  def backfill(self, since = None) :
+    with pool.connection() as db :
+      with db.cursor() as cursor :
+        for table in TIME_COLUMNS :
+          if since is None :
+            cursor.execute("DELETE FROM ROLLUP_STATE WHERE TABLE_NAME = %s", (table,))
+          else :
+            self._save_watermark(cursor, table, floor_hour(to_datetime(since)))
+      db.commit()
+
+    while not self.run() :
+      print(f"[{current_time()}] 집계 테이블 채우는 중...")
+
+    print(f"[{current_time()}] 집계 테이블 채우기 완료")
+
+# 일괄 저장 스레드가 사용하는 집계 관리 객체
+compactor = RollupCompactor()
+
+# 독립 실행 모드 - 기존 데이터로 집계 테이블 채우기
+if __name__ == "__main__" :
+  parser = argparse.ArgumentParser(description = "시간별, 일별 집계 테이블 채우기")
+  parser.add_argument('--since', help = "집계 시작 시각 (YYYY-MM-DD HH:MM:SS), 생략 시 원본 데이터 처음부터")
+  args = parser.parse_args()
+
+  print("═" * 50)
+  print("집계 테이블 채우기")
+  print("═" * 50)
+
+  try :
+    compactor.backfill(args.since)
+
+  finally :
+    pool.close()
@@ -0,0 +1,54 @@
+# 농작물 환경 모니터링을 위한 하드웨어 백엔드 선택 (라즈베리파이 또는 시뮬레이터)
+#
+# 백엔드는 아래 항목을 제공하며 센서, 제어, 모션 감지 모듈은 이 항목만 사용
+# - gpio : RPi.GPIO 와 같은 함수를 가진 객체 (출력 장치, PIR 입력 및 상승 에지, PWM)
+# - dht22(pin) : temperature, humidity 속성을 가진 DHT22 온습도 센서 객체
+# - mcp3008(bus, device, max_speed_hz) : read(channel) 로 0 ~ 1023 값을 읽는 ADC 객체
+# - close() : 백엔드 리소스 정리
+                                                                # 표준 라이브러리
+import os
+import threading
+                                                                # 로컬 모듈
+from config.constant import SETTINGS, SIMULATOR_CONFIG
+
+# 사용 가능한 백엔드
+BACKENDS = ('rpi', 'sim')
+
+# 백엔드 선택 환경 변수 (SETTINGS 보다 우선)
+BACKEND_ENV = 'FARM_HARDWARE'
+
+# 현재 사용 중인 백엔드
+_backend = None
+_lock = threading.Lock()
+
+# 이름으로 백엔드 생성 (하드웨어 라이브러리는 선택된 백엔드만 불러옴)
+def create_backend(name, **options) :
+  if name == 'rpi' :
+    from hardware.rpi_backend import RPiBackend
+    return RPiBackend()
+
+  if name == 'sim' :
+    from hardware.sim_backend import SimBackend
+    return SimBackend(**{**SIMULATOR_CONFIG, **options})
+
+  raise ValueError(f"알 수 없는 하드웨어 백엔드 : {name} (사용 가능 : {', '.join(BACKENDS)})")
+
+# 현재 백엔드 반환 (처음 호출 시 환경 변수 또는 설정값으로 생성)
+def get_backend() :
+  global _backend
+
+  with _lock :
+    if _backend is None :
+      name = os.environ.get(BACKEND_ENV) or SETTINGS['HARDWARE_BACKEND']
+      _backend = create_backend(name)
+      print(f"하드웨어 백엔드 : {name}")
+
+    return _backend
+
+# 사용할 백엔드 지정 (센서, 제어 모듈을 불러오기 전에 호출, 백엔드 객체를 직접 넣을 수도 있음)
+def use_backend(backend, **options) :
+  global _backend
+
+  with _lock :
+    _backend = create_backend(backend, **options) if isinstance(backend, str) else backend
+    return _backend
@@ -0,0 +1,73 @@
+# 농작물 환경 모니터링을 위한 하드웨어 자원 지연 초기화 및 정리 (모듈을 불러오기만 할 때는 하드웨어를 건드리지 않음)
+                                                                # 표준 라이브러리
+import threading
+import time
+
+# 생성된 자원 목록 (생성 순서, 정리는 역순)
+_opened = []
+_opened_lock = threading.Lock()
+
+# 하드웨어 자원 클래스 - 처음 get() 할 때 생성하고 close() 로 해제 (해제 후 다시 get() 하면 재생성)
+class Resource :
+  def __init__(self, name, open, close = None) :
+    self.name = name                                           # 자원 이름 (로그 출력용)
+    self._open = open                                          # 자원 생성 함수
+    self._close = close                                        # 자원 해제 함수 (자원을 인자로 받음)
+    self._value = None
+    self._lock = threading.Lock()                              # 여러 스레드가 동시에 처음 사용할 때 한 번만 생성
+    self.open_seconds = None                                   # 마지막 생성 소요 시간 (초)
+
+  # 생성 여부
+  @property
+  def opened(self) :
+    return self._value is not None
+
+  # 자원 반환 (없으면 생성)
+  def get(self) :
+    value = self._value
+    if value is not None :
+      return value
+
+    with self._lock :
+      if self._value is None :
+        start = time.perf_counter()
+        self._value = self._open()
+        self.open_seconds = time.perf_counter() - start
+        print(f"{self.name} 초기화 ({self.open_seconds * 1000:.1f}ms)")
+
+        with _opened_lock :
+          _opened.append(self)
+
+      return self._value
+
+  # 자원 해제 (생성되지 않았으면 아무것도 하지 않음)
+  def close(self) :
+    with self._lock :
+      value, self._value = self._value, None
+
+    if value is None :
+      return
+
+    with _opened_lock :
+      if self in _opened :
+        _opened.remove(self)
+
+    if self._close is not None :
+      self._close(value)
+
+# 생성된 자원 이름과 생성 소요 시간 목록
+def opened_resources() :
+  with _opened_lock :
+    return [(resource.name, resource.open_seconds) for resource in _opened]
+
+# 생성된 모든 자원을 역순으로 해제 (각 자원의 오류는 출력 후 계속 진행)
+def close_all() :
+  with _opened_lock :
+    resources = list(reversed(_opened))
+
+  for resource in resources :
+    try :
+      resource.close()
+
+    except Exception as e :
+      print(f"{resource.name} 해제 오류 : {e}")
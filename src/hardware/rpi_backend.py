@@ -0,0 +1,43 @@
+# 농작물 환경 모니터링을 위한 라즈베리파이 하드웨어 백엔드 (실제 센서 및 GPIO)
+                                                                # 외부 라이브러리
+import board
+import adafruit_dht
+import spidev
+import RPi.GPIO as GPIO
+
+# MCP3008 ADC 클래스 - SPI 통신으로 채널별 10비트 아날로그 값 읽기
+class MCP3008 :
+  def __init__(self, bus = 0, device = 0, max_speed_hz = 1000000) :
+    self.spi = spidev.SpiDev()
+    self.spi.open(bus, device)                                 # SPI 채널 0, 디바이스 0 (CE0 핀)
+    self.spi.max_speed_hz = max_speed_hz                       # SPI 통신 속도 : 1MHz
+
+  # 채널 값 읽기 (0 ~ 1023 범위)
+  def read(self, channel) :
+    # MCP3008 SPI 통신 프로토콜
+    val = self.spi.xfer2([1, (8 + channel) << 4, 0])
+    # 10비트 ADC 값 추출 (상위 2비트 + 하위 8비트 조합)
+    return ((val[1] & 3) << 8) + val[2]
+
+  # SPI 연결 종료
+  def close(self) :
+    self.spi.close()
+
+# 라즈베리파이 백엔드 클래스
+class RPiBackend :
+  name = 'rpi'
+
+  def __init__(self) :
+    self.gpio = GPIO                                           # RPi.GPIO 모듈 그대로 사용
+
+  # DHT22 온습도 센서 객체 생성
+  def dht22(self, pin) :
+    return adafruit_dht.DHT22(getattr(board, f"D{pin}"))
+
+  # MCP3008 ADC 객체 생성
+  def mcp3008(self, bus = 0, device = 0, max_speed_hz = 1000000) :
+    return MCP3008(bus, device, max_speed_hz)
+
+  # 백엔드 리소스 정리 (GPIO, SPI 는 각 모듈에서 정리)
+  def close(self) :
+    pass
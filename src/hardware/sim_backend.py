@@ -0,0 +1,327 @@
+# 농작물 환경 모니터링을 위한 하드웨어 시뮬레이터 백엔드 (라즈베리파이 없이 실행, 실제 시간보다 빠르게 재생)
+                                                                # 표준 라이브러리
+import math
+import random
+import threading
+import time
+                                                                # 로컬 모듈
+from config.constant import SETTINGS
+from hardware.sim_trace import SyntheticTrace, RecordedTrace
+
+# 장치 동작이 환경에 미치는 영향
+FAN_COOLING = -4.0                                         # 팬 가동 시 목표 온도 변화 (℃)
+FAN_TIME_CONSTANT = 600                                    # 팬 냉각 반응 시간 상수 (초)
+PUMP_RATE = 0.05                                           # 펌프 가동 시 토양 수분 증가 속도 (%/초)
+SOIL_DRAIN_TIME_CONSTANT = 6 * 3600                        # 준 물이 빠지는 시간 상수 (초)
+LED_LIGHT = 150                                            # LED 점등 시 조도 센서 증가량
+MOTION_HOLD = 3                                            # PIR 신호 유지 시간 (초)
+
+# 가상 시계 - 시뮬레이션 시작(자정) 이후 경과 초, 백엔드의 step 으로만 흐름
+class SimClock :
+  def __init__(self, start = 0.0) :
+    self.now = start
+
+  # 현재 시뮬레이션 시각 (time.monotonic 대신 넣어 사용)
+  def time(self) :
+    return self.now
+
+# 가상 PWM 출력 (RPi.GPIO.PWM 과 같은 함수)
+class SimPWM :
+  def __init__(self, pin, frequency) :
+    self.pin = pin
+    self.frequency = frequency                                 # 현재 주파수 (Hz)
+    self.duty = 0.0                                            # 현재 듀티 사이클 (%)
+    self.running = False
+    self.changes = 0                                           # 출력 변경 횟수
+
+  def start(self, duty) :
+    self.duty = duty
+    self.running = True
+    self.changes += 1
+
+  def ChangeFrequency(self, frequency) :
+    self.frequency = frequency
+    self.changes += 1
+
+  def ChangeDutyCycle(self, duty) :
+    self.duty = duty
+    self.changes += 1
+
+  def stop(self) :
+    self.running = False
+    self.changes += 1
+
+# 가상 GPIO (RPi.GPIO 와 같은 함수, 입력 핀은 set_input 으로 외부에서 변경)
+class SimGPIO :
+  BCM = 11
+  BOARD = 10
+  OUT = 0
+  IN = 1
+  LOW = 0
+  HIGH = 1
+  RISING = 31
+  FALLING = 32
+  BOTH = 33
+  PUD_OFF = 20
+  PUD_DOWN = 21
+  PUD_UP = 22
+
+  def __init__(self) :
+    self.mode = None
+    self.directions = {}                                       # 핀 → 입출력 방향
+    self.levels = {}                                           # 핀 → 현재 신호 (0, 1)
+    self.callbacks = {}                                        # 핀 → (감지 에지, 콜백)
+    self.writes = 0                                            # 출력 변경 횟수 (장치 전환 횟수 확인용)
+    self.pwms = []
+
+  def setwarnings(self, flag) :
+    pass
+
+  def setmode(self, mode) :
+    self.mode = mode
+
+  def setup(self, pin, direction, pull_up_down = None, initial = None) :
+    self.directions[pin] = direction
+    if initial is not None :
+      self.levels[pin] = int(initial)
+    else :
+      self.levels.setdefault(pin, self.LOW)
+
+  def output(self, pin, value) :
+    if self.directions.get(pin) != self.OUT :
+      raise RuntimeError(f"GPIO {pin} 번 핀이 출력 모드로 설정되지 않음")
+
+    value = int(value)
+    if self.levels.get(pin) != value :
+      self.writes += 1
+    self.levels[pin] = value
+
+  def input(self, pin) :
+    return self.levels.get(pin, self.LOW)
+
+  # 외부 신호로 입력 핀 변경 (PIR 등) - 등록된 에지 콜백을 바로 호출
+  def set_input(self, pin, value) :
+    value = int(value)
+    previous = self.levels.get(pin, self.LOW)
+    self.levels[pin] = value
+
+    if pin not in self.callbacks or previous == value :
+      return
+
+    edge, callback = self.callbacks[pin]
+    rising = value == self.HIGH
+    if edge == self.BOTH or (edge == self.RISING) == rising :
+      callback(pin)
+
+  def add_event_detect(self, pin, edge, callback = None, bouncetime = None) :
+    if pin in self.callbacks :
+      raise RuntimeError(f"GPIO {pin} 번 핀에 이미 에지 감지가 설정됨")
+
+    self.callbacks[pin] = (edge, callback or (lambda channel : None))
+
+  def remove_event_detect(self, pin) :
+    self.callbacks.pop(pin, None)
+
+  def PWM(self, pin, frequency) :
+    pwm = SimPWM(pin, frequency)
+    self.pwms.append(pwm)
+    return pwm
+
+  def cleanup(self, pins = None) :
+    if pins is None :
+      self.directions.clear()
+      self.callbacks.clear()
+      return
+
+    for pin in ([pins] if isinstance(pins, int) else pins) :
+      self.directions.pop(pin, None)
+      self.callbacks.pop(pin, None)
+
+# 가상 DHT22 센서 (현재 시뮬레이션 환경 값을 소수 첫째 자리로 반환, 설정 확률로 읽기 실패)
+class SimDHT22 :
+  def __init__(self, backend, failure_rate = 0.0, seed = 0) :
+    self.backend = backend
+    self.failure_rate = failure_rate
+    self._rng = random.Random(seed)
+    self.reads = 0
+
+  def _read(self, metric) :
+    self.reads += 1
+    if self.failure_rate and self._rng.random() < self.failure_rate :
+      raise RuntimeError("Checksum did not validate. Try again.")
+
+    return round(self.backend.environment()[metric], 1)
+
+  @property
+  def temperature(self) :
+    return self._read('temperature')
+
+  @property
+  def humidity(self) :
+    return self._read('humidity')
+
+  def exit(self) :
+    pass
+
+# 가상 MCP3008 ADC (토양 수분, 조도 채널에 현재 환경 값을 원시값으로 변환하여 반환)
+# 실제 센서처럼 측정마다 잡음이 섞이고 가끔 값이 튐
+class SimMCP3008 :
+  def __init__(self, backend, noise = 0.0, spike_rate = 0.0, seed = 0) :
+    self.backend = backend
+    self.noise = noise                                         # 잡음 표준편차 (원시값 단위)
+    self.spike_rate = spike_rate                               # 순간 튀는 값 발생 확률
+    self._rng = random.Random(seed)
+    self.reads = 0
+
+  def read(self, channel) :
+    self.reads += 1
+    environment = self.backend.environment()
+
+    if channel == SETTINGS['SOIL_CHANNEL'] :
+      # 토양 수분 % 를 센서 원시값으로 (값이 클수록 건조)
+      raw = (100 - environment['soil_moisture']) * 1023 / 100
+    elif channel == SETTINGS['LIGHT_CHANNEL'] :
+      raw = environment['light_value']
+    else :
+      raw = 0
+
+    if self.noise :
+      raw += self._rng.gauss(0, self.noise)
+    if self.spike_rate and self._rng.random() < self.spike_rate :
+      raw = self._rng.uniform(0, 1023)
+
+    return min(1023, max(0, int(round(raw))))
+
+  def close(self) :
+    pass
+
+# 시뮬레이터 백엔드 클래스 - 환경 데이터에 장치 동작 효과를 더해 결정적으로 재생
+class SimBackend :
+  name = 'sim'
+
+  def __init__(self, seed = 0, trace = None, dht_failure_rate = 0.0, adc_noise = 0.0, adc_spike_rate = 0.0,
+               motion_per_hour = 2, speed = 1.0, start = 0.0) :
+    self.seed = seed
+    self.speed = speed                                         # 실제 1초당 시뮬레이션 시간 (0 이면 step 으로만 진행)
+    self.clock = SimClock(start)
+    self._wall = time.monotonic()                              # 마지막으로 실제 시간을 따라간 시각
+    self._lock = threading.RLock()                             # 센서, 제어, 모션 스레드 동시 접근 보호
+    self.gpio = SimGPIO()
+    self.dht_failure_rate = dht_failure_rate
+    self.adc_noise = adc_noise
+    self.adc_spike_rate = adc_spike_rate
+
+    # 환경 데이터 (CSV 경로를 주면 기록 재생, 없으면 합성 데이터)
+    if isinstance(trace, str) :
+      trace = RecordedTrace.load(trace)
+    self.trace = trace or SyntheticTrace(seed)
+
+    # 장치 동작으로 생긴 환경 변화량
+    self.offsets = {'temperature' : 0.0, 'soil_moisture' : 0.0}
+
+    # 모션 발생 일정 (평균 간격의 지수 분포)
+    self._motion_rng = random.Random(seed + 1)
+    self._motion_rate = motion_per_hour / 3600
+    self._next_motion = self._schedule_motion(self.clock.now)
+    self._motion_end = None
+    self.motions = 0                                           # 발생한 모션 수
+
+  # 다음 모션 발생 시각
+  def _schedule_motion(self, after) :
+    if self._motion_rate <= 0 :
+      return math.inf
+
+    return after + self._motion_rng.expovariate(self._motion_rate)
+
+  # 장치 동작 여부 (출력 모드로 설정된 핀만, 팬과 펌프는 신호 반전)
+  def device_on(self, device) :
+    pin = SETTINGS[f'{device.upper()}_PIN']
+    if self.gpio.directions.get(pin) != SimGPIO.OUT :
+      return False
+
+    return self.gpio.input(pin) == (SimGPIO.LOW if device in ('fan', 'pump') else SimGPIO.HIGH)
+
+  # 장치 출력 세기 (0 ~ 1, PWM 출력 중이면 듀티 비율, 팬과 펌프는 신호 반전)
+  def device_level(self, device) :
+    pin = SETTINGS[f'{device.upper()}_PIN']
+    pwm = next((pwm for pwm in reversed(self.gpio.pwms) if pwm.pin == pin and pwm.running), None)
+    if pwm is None :
+      return 1.0 if self.device_on(device) else 0.0
+
+    duty = pwm.duty / 100
+    return 1.0 - duty if device in ('fan', 'pump') else duty
+
+  # 실제 경과 시간만큼 시뮬레이션 진행 (speed 가 0 이면 진행하지 않음)
+  def _follow_wall_clock(self) :
+    if not self.speed :
+      return
+
+    now = time.monotonic()
+    elapsed = now - self._wall
+    self._wall = now
+
+    if elapsed > 0 :
+      self.step(elapsed * self.speed)
+
+  # 현재 시뮬레이션 환경 값 (환경 데이터 + 장치 동작 효과)
+  def environment(self) :
+    with self._lock :
+      self._follow_wall_clock()
+
+      values = self.trace.at(self.clock.now)
+      values['temperature'] += self.offsets['temperature']
+      values['soil_moisture'] = min(100.0, max(0.0, values['soil_moisture'] + self.offsets['soil_moisture']))
+
+      values['light_value'] += LED_LIGHT * self.device_level('led')
+
+      return values
+
+  # 시뮬레이션 시간 진행 (장치 효과 적분, 모션 신호 발생)
+  def step(self, seconds) :
+    with self._lock :
+      self._step(seconds)
+
+  # 시뮬레이션 시간 진행 본체 (잠금 안에서 호출)
+  def _step(self, seconds) :
+    end = self.clock.now + seconds
+
+    # 팬 : 목표 변화량으로 지수 수렴 / 펌프 : 가동 중 증가, 정지 시 지수 감소
+    fan_target = FAN_COOLING * self.device_level('fan')
+    decay = math.exp(-seconds / FAN_TIME_CONSTANT)
+    self.offsets['temperature'] = fan_target + (self.offsets['temperature'] - fan_target) * decay
+
+    if self.device_on('pump') :
+      self.offsets['soil_moisture'] += PUMP_RATE * seconds
+    else :
+      self.offsets['soil_moisture'] *= math.exp(-seconds / SOIL_DRAIN_TIME_CONSTANT)
+
+    # 구간 안의 모션 신호를 시각 순서대로 발생 (콜백이 가상 시계를 쓰면 정확한 간격으로 보임)
+    pir_pin = SETTINGS['PIR_PIN']
+    while True :
+      next_event = min(self._next_motion, self._motion_end if self._motion_end is not None else math.inf)
+      if next_event > end :
+        break
+
+      self.clock.now = next_event
+      if self._motion_end is not None and self._motion_end <= self._next_motion :
+        self.gpio.set_input(pir_pin, SimGPIO.LOW)
+        self._motion_end = None
+      else :
+        self.gpio.set_input(pir_pin, SimGPIO.HIGH)
+        self.motions += 1
+        self._motion_end = self._next_motion + MOTION_HOLD
+        self._next_motion = self._schedule_motion(self._next_motion)
+
+    self.clock.now = end
+
+  # DHT22 온습도 센서 객체 생성
+  def dht22(self, pin) :
+    return SimDHT22(self, self.dht_failure_rate, self.seed)
+
+  # MCP3008 ADC 객체 생성
+  def mcp3008(self, bus = 0, device = 0, max_speed_hz = 1000000) :
+    return SimMCP3008(self, self.adc_noise, self.adc_spike_rate, self.seed + 2)
+
+  # 백엔드 리소스 정리
+  def close(self) :
+    pass
@@ -0,0 +1,85 @@
+# 농작물 환경 모니터링을 위한 시뮬레이션 환경 데이터 (합성 하루 주기 또는 기록 CSV 재생)
+                                                                # 표준 라이브러리
+import bisect
+import csv
+import math
+import random
+from datetime import datetime
+
+# 환경 데이터 항목
+TRACE_METRICS = ('temperature', 'humidity', 'soil_moisture', 'light_value')
+
+# 하루 (초)
+DAY_SECONDS = 86400
+
+# 합성 환경 데이터 - 하루 주기 곡선에 고정 시드 잡음을 더함 (같은 시드, 같은 시각이면 항상 같은 값)
+class SyntheticTrace :
+  def __init__(self, seed = 0) :
+    rng = random.Random(seed)
+
+    # 1분 단위 잡음 (온도, 습도, 조도)
+    self._noise = [(rng.gauss(0, 0.3), rng.gauss(0, 1.5), rng.gauss(0, 8)) for _ in range(DAY_SECONDS // 60)]
+
+  # 시뮬레이션 시작(자정) 이후 경과 초의 환경 값
+  def at(self, seconds) :
+    day_seconds = seconds % DAY_SECONDS
+    temp_noise, humidity_noise, light_noise = self._noise[int(day_seconds // 60)]
+
+    # 온도는 15시에 가장 높고 습도는 반대로 움직임
+    wave = math.sin(2 * math.pi * (day_seconds / DAY_SECONDS - 0.375))
+
+    # 조도는 06 ~ 18시 사이 해의 높이에 비례
+    sun = max(0.0, math.sin(math.pi * (day_seconds - 21600) / 43200))
+
+    # 토양 수분은 하루 동안 조금씩 마름 (물 주기는 시뮬레이터가 펌프 동작으로 반영)
+    return {
+      'temperature' : 15 + 6 * wave + temp_noise,
+      'humidity' : 62 - 12 * wave + humidity_noise,
+      'soil_moisture' : 72 - 8 * day_seconds / DAY_SECONDS,
+      'light_value' : 60 + 800 * sun + light_noise
+    }
+
+# 기록 환경 데이터 재생 - CSV (측정 시각, 온도, 습도, 토양 수분, 조도) 를 시간에 맞춰 선형 보간, 끝나면 처음부터 반복
+class RecordedTrace :
+  def __init__(self, times, rows) :
+    if len(times) < 2 :
+      raise ValueError("환경 기록은 2행 이상 필요")
+
+    self.times = times                                         # 첫 행 기준 경과 초
+    self.rows = rows                                           # 항목별 값 튜플
+    self.span = times[-1] - times[0]                           # 기록 전체 길이 (초)
+
+  # CSV 파일 불러오기 (timestamp 열은 'YYYY-MM-DD HH:MM:SS' 또는 초)
+  @classmethod
+  def load(cls, path) :
+    times = []
+    rows = []
+
+    with open(path, newline = '', encoding = 'utf-8') as f :
+      for record in csv.DictReader(f) :
+        stamp = record['timestamp']
+        try :
+          seconds = float(stamp)
+        except ValueError :
+          seconds = datetime.strptime(stamp, '%Y-%m-%d %H:%M:%S').timestamp()
+
+        times.append(seconds)
+        rows.append(tuple(float(record[metric]) for metric in TRACE_METRICS))
+
+    start = times[0]
+    return cls([seconds - start for seconds in times], rows)
+
+  # 시뮬레이션 시작 이후 경과 초의 환경 값
+  def at(self, seconds) :
+    offset = seconds % self.span if self.span else 0
+    index = bisect.bisect_right(self.times, offset) - 1
+    index = min(max(index, 0), len(self.times) - 2)
+
+    start, end = self.times[index], self.times[index + 1]
+    ratio = (offset - start) / (end - start) if end > start else 0.0
+    before, after = self.rows[index], self.rows[index + 1]
+
+    return {
+      metric : before[i] + (after[i] - before[i]) * ratio
+      for i, metric in enumerate(TRACE_METRICS)
+    }
@@ -6,13 +6,31 @@ from datetime import datetime
 import signal
 import sys
 import asyncio
+import os
+
+# 시작 시간 측정 기준 (모듈 불러오기 시간 포함)
+STARTUP_BEGIN = time.perf_counter()
                                                                # 로컬 모듈
 import sensor.multi_sensor as multi_sensor
 import control.multi_control as multi_control
 import control.motion_detector as motion_detector
+from control.pwm_control import PwmController
 import network.websocket_server as websocket_server
-from config.constant import SETTINGS 
+import database.db_utils as db_utils
+import database.db_writer as db_writer
+from sensor.ring_buffer import SensorRingBuffer
+from sensor.sensor_bus import SensorBus
+from sensor.sensor_snapshot import SnapshotStore
+from runtime.scheduler import PeriodicSchedule
+from config.constant import SETTINGS, SCHEDULER_CONFIG, PWM_CONFIG
 from config.config_manager import ConfigManager
+from hardware import lifecycle
+
+# 모듈 불러오기 소요 시간 (하드웨어는 처음 사용할 때 초기화되므로 포함되지 않음)
+IMPORT_SECONDS = time.perf_counter() - STARTUP_BEGIN
+
+# 실행 방식 선택 환경 변수 (SETTINGS 보다 우선, threads : 작업별 스레드, async : 단일 이벤트 루프)
+RUNTIME_ENV = 'FARM_RUNTIME'
 
 # 통합 농작물 환경 모니터링 시스템 - 모든 센서와 자동 제어 장비를 동시에 관리하는 클래스
 class IntegratedSystem:
@@ -21,14 +39,25 @@ class IntegratedSystem:
         self.running = False                                   # 시스템 실행 상태 플래그
         self.threads = []                                      # 멀티스레드 작업 목록
         
-        # 공유 센서 데이터 (모든 스레드가 접근 가능한 메모리)
-        self.shared_sensor_data = {
-            'temperature': None,                               # 온도 (℃)
-            'humidity': None,                                  # 습도 (%)
-            'soil_moisture': None,                             # 토양 수분 (%)
-            'light_value': None,                               # 조도 (0 ~ 1023)
-            'last_update': None                                # 마지막 업데이트 시간
-        }
+        # 공유 센서 데이터 스냅샷 (측정마다 변경 불가 스냅샷을 통째로 교체, 읽는 쪽은 잠금 없이 일관된 값 사용)
+        self.sensor_snapshots = SnapshotStore()
+
+        # 최근 측정 데이터 보관소 (1분 간격 7일, 데이터베이스 조회 없이 기간별 통계 계산)
+        self.sensor_history = SensorRingBuffer()
+
+        # 센서 데이터 버스 (측정 작업이 한 번 읽은 값을 실시간 체크, 저장, 자동 제어가 구독 순서대로 사용)
+        self.sensor_bus = SensorBus()
+        self.sensor_bus.subscribe('실시간 체크', self.check_reading)
+        self.sensor_bus.subscribe('데이터 저장', self.store_reading, interval = SETTINGS['SAVE_INTERVAL'],
+                                  align = SCHEDULER_CONFIG['align'])
+        self.sensor_bus.subscribe('자동 제어', self.control_reading)
+
+        # 측정 주기 일정 (시작 직후 1회 측정 후 매분 0초, 작업 시간만큼 밀리지 않음)
+        self.sampling_schedule = PeriodicSchedule("환경 센서 측정", SETTINGS['READ_INTERVAL'])
+
+        # 팬, LED 비례 제어 (출력 방식이 pwm 인 자동 모드 장치만, 측정 주기보다 빠른 고정 주기)
+        self.pwm_controller = PwmController()
+        self.pwm_schedule = PeriodicSchedule("팬, LED 비례 제어", PWM_CONFIG['tick'], align = False)
 
         # 설정 관리자 초기화
         self.config_manager = ConfigManager()
@@ -44,13 +73,25 @@ class IntegratedSystem:
         print("시스템 종료 중...")
         self.running = False
 
-        # 모든 하드웨어 모듈의 리소스 정리
+        self.cleanup()
+
+        print("시스템 종료 완료")
+        sys.exit(0)
+
+    # 모든 하드웨어 모듈 및 데이터베이스 리소스 정리
+    def cleanup(self) :
         try :
             multi_sensor.cleanup()                             # 센서 모듈 정리 (SPI 연결 해제)
         except Exception as e :
             print(f"센서 모듈 정리 중 오류 : {e}")
             pass
         
+        try :
+            self.pwm_controller.close()                        # 비례 제어 PWM 출력 정리 (제어 출력 정리 전)
+        except Exception as e :
+            print(f"비례 제어 정리 중 오류 : {e}")
+            pass
+
         try :
             multi_control.cleanup()                            # 모션 감지 모듈 정리 (GPIO 해제)
         except Exception as e :
@@ -62,111 +103,148 @@ class IntegratedSystem:
         except Exception as e :
             print(f"모션 감지 모듈 정리 중 오류 : {e}")
             pass
-        
-        print("시스템 종료 완료")
-        sys.exit(0)
 
-    # 환경 센서 데이터 수집 및 데이터베이스 저장 작업 스레드 (대기 시간 : 1시간)
-    def sensor_data_worker(self) :
+        try :
+            db_utils.cleanup()                                 # 대기열 데이터 저장 후 연결 풀 정리
+        except Exception as e :
+            print(f"데이터베이스 정리 중 오류 : {e}")
+            pass
+
+        # 모듈 정리에서 빠진 하드웨어 자원 해제
+        lifecycle.close_all()
+
+    # 환경 센서 측정 작업 스레드 (주기 : 1분) - 센서를 한 번 읽고 측정 기록을 모든 구독자에게 전달
+    def sensor_sampling_worker(self) :
         while self.running :
             try :
-                current_time = datetime.now().strftime('%H:%M:%S')
-                print(f"\n[{current_time}] 환경 센서 데이터 수집 시작")
+                # 다음 예정 시각까지 대기 (측정, 구독 처리 시간과 관계없이 고정 주기)
+                missed = self.sampling_schedule.wait()
+                if missed :
+                    print(f"환경 센서 측정 {missed}회 지연으로 건너뜀")
 
-                sensor_data = multi_sensor.read_all_sensors()
-                
-                if sensor_data and sensor_data.get('status') == 'success' :
-                    print(f"다음 수집까지 {SETTINGS['SAVE_INTERVAL']//60}분 대기\n")
-                    time.sleep(SETTINGS['SAVE_INTERVAL'])
-
-                else :
-                    print("데이터 수집 실패 - 1분 후 재시도\n")
-                    time.sleep(60)                               # 1분 대기 후 재시도
+                reading = multi_sensor.sample_sensors()
+                self.sensor_bus.publish(reading)
 
             except Exception as e :
-                print(f"환경 센서 시스템 스레드 오류 : {e}")
+                print(f"환경 센서 측정 스레드 오류 : {e}")
                 time.sleep(2)
 
-    # 환경 센서 데이터 실시간 체크 작업 스레드 (대기 시간 : 1분)
-    def sensor_read_worker(self) :
+    # 실시간 체크 구독 (모든 측정 기록) - 오류 알림, 최근 측정 데이터 보관, 공유 데이터 갱신 및 클라이언트 알림
+    def check_reading(self, reading) :
+        # 센서 오류 발생 시 알림 전송
+        if reading.error :
+            websocket_server.alert_queue.put({
+                'type': 'sensor_error',
+                'message': reading.error,
+                'timestamp': datetime.fromtimestamp(reading.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            })
+
+        # 최근 측정 데이터 보관소에 추가 (온습도 읽기 실패 시 해당 항목은 빈 값)
+        self.sensor_history.append(
+            timestamp = reading.timestamp,
+            temperature = reading.temperature,
+            humidity = reading.humidity,
+            soil_moisture = reading.soil_moisture,
+            light_value = reading.light_value
+        )
+
+        # 공유 센서 데이터 스냅샷 발행
+        if reading.temperature is not None and reading.humidity is not None :
+            self.sensor_snapshots.publish(
+                temperature = reading.temperature,
+                humidity = reading.humidity,
+                soil_moisture = reading.soil_moisture,
+                light_value = reading.light_value,
+                last_update = datetime.fromtimestamp(reading.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            )
+
+            # 공유 센서 데이터 출력
+            multi_sensor.print_sensor_data(reading.temperature, reading.humidity, reading.soil_moisture,
+                                           reading.light_value, title = "공유 센서 데이터")
+
+            # 구독 클라이언트에게 갱신 알림
+            websocket_server.notify_sensor_update()
+
+    # 데이터베이스 저장 구독 (1시간 간격, 저장 실패 시 다음 측정 기록에서 재시도)
+    def store_reading(self, reading) :
+        success = db_utils.save_sensor(reading.temperature, reading.humidity, reading.soil_moisture, reading.light_value)
+
+        if success :
+            print(f"다음 수집까지 {SETTINGS['SAVE_INTERVAL']//60}분 대기\n")
+        else :
+            print(f"데이터 수집 실패 - {SETTINGS['READ_INTERVAL']//60}분 후 재시도\n")
+
+        return success
+
+    # 자동 제어 구독 (측정마다 확인, 기준 통과, 설정 변경, 낮/밤 전환 시 또는 30분 감시 주기마다 실행)
+    def control_reading(self, reading) :
+        sensor_data = reading._asdict()
+
+        if multi_control.control_due(sensor_data) is not None :
+            self.run_control(sensor_data)
+
+    # 자동 제어 실행
+    def run_control(self, sensor_data) :
+        # 모든 제어 장비 동작 및 상태 데이터베이스 저장 (제어 잠금은 multi_control 이 관리)
+        multi_control.control_all_devices(sensor_data)
+
+        # 제어 상태를 원격 제어 클라이언트용 버전 관리 상태에 반영
+        websocket_server.publish_device_state()
+
+    # 모션 감지 알림 전송
+    def send_motion_alert(self, timestamp = None) :
+        websocket_server.alert_queue.put({
+            'type' : 'motion',
+            'message' : '모션이 감지되었습니다.',
+            'timestamp' : timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    # 낮/밤 전환 작업 스레드 - 전환 시각에 최근 측정 기록으로 자동 제어 실행 (시간대별 기준 바로 적용)
+    def daylight_worker(self) :
         while self.running :
             try :
-                # DHT22 온습도 센서 읽기 (재시도 로직)
-                temperature, humidity, error = multi_sensor.read_dht22()
-
-                # 센서 오류 발생 시 알림 전송
-                if error :
-                    websocket_server.alert_queue.put({
-                        'type': 'sensor_error',
-                        'message': error,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                
-                # 토양 수분 센서 읽기
-                soil_value = multi_sensor.read_channel(multi_sensor.SOIL_CHANNEL)
-                soil_percent = multi_sensor.convert_to_percent(soil_value)
-                
-                # 조도 센서 읽기
-                light_value = multi_sensor.read_channel(multi_sensor.LIGHT_CHANNEL)
-                
-                # 공유 메모리에 센서 데이터 저장
-                if temperature is not None and humidity is not None :
-                    self.shared_sensor_data.update({
-                        'temperature' : temperature,
-                        'humidity' : humidity,
-                        'soil_moisture' : soil_percent,
-                        'light_value' : light_value,
-                        'last_update' : datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                
-                    # 공유 센서 데이터 출력
-                    multi_sensor.print_sensor_data(temperature, humidity, soil_percent, light_value, title = "공유 센서 데이터")
-
-                time.sleep(SETTINGS['READ_INTERVAL'])
-            
+                daytime = multi_control.daylight.wait()
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {'낮' if daytime else '밤'} 시간대 전환")
+
+                reading = self.sensor_bus.latest
+                if reading is not None :
+                    self.run_control(reading._asdict())
+
             except Exception as e :
-                print(f"환경 센서 데이터 실시간 체크 스레드 오류 : {e}")
+                print(f"낮/밤 전환 스레드 오류 : {e}")
                 time.sleep(2)
 
-    # 자동 제어 시스템 작업 스레드 (대기 시간 : 5분)
-    def control_worker(self) :
-        multi_control.init_config(self.config_manager)
-
+    # 팬, LED 비례 제어 작업 스레드 - 제어 주기마다 측정값과 설정값의 오차로 PWM 출력 세기 조절
+    def pwm_worker(self) :
         while self.running :
             try :
-                sensor_data = {
-                    'temperature' : self.shared_sensor_data['temperature'],
-                    'humidity' : self.shared_sensor_data['humidity'],
-                    'soil_moisture' : self.shared_sensor_data['soil_moisture'],
-                    'light_value' : multi_control.get_light_value()
-                }
+                self.pwm_schedule.wait()
+                self.pwm_controller.step()
 
-                # 모든 제어 장비 동작 및 상태 데이터베이스 저장
-                results = multi_control.control_all_devices(sensor_data)
+            except Exception as e :
+                print(f"비례 제어 스레드 오류 : {e}")
+                time.sleep(2)
 
-                time.sleep(SETTINGS['CONTROL_INTERVAL'])        # 5분 대기 후 재시도
+    # 모션 감지 및 알람 작업 스레드 (인터럽트 방식 또는 1초 주기 확인)
+    def motion_worker(self) :
+        if SETTINGS['MOTION_MODE'] == 'edge' :
+            try :
+                self.motion_edge_worker()
+                return
 
             except Exception as e :
-                print(f"제어 시스템 스레드 오류 : {e}")
-                time.sleep(10)
+                print(f"모션 인터럽트 감지 시작 오류 : {e} - 주기 확인 방식으로 전환")
 
-    # 모션 감지 및 알람 작업 스레드 (대기 시간 : 1초)
-    def motion_worker(self) :
         # PIR 센서 모션 감지 및 부저 알람
         while self.running :
             try :
                 motion_result = motion_detector.detect_motion()
 
                 if motion_result['status'] == 'detected' :
-                    # 시스템 알림에 모션 감지 데이터 추가
-                    websocket_server.alert_queue.put({
-                        'type' : 'motion',
-                        'message' : '모션이 감지되었습니다.',
-                        'timestamp' : datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-
-                    time.sleep(5)                                   # 알람 완료 후 5초 대기
-                
+                    # 시스템 알림에 모션 감지 데이터 추가 (알람은 별도 스레드에서 재생)
+                    self.send_motion_alert()
+                    time.sleep(1)                                   # 감지 후에도 1초마다 계속 확인
+
                 elif motion_result['status'] == 'error' :
                     time.sleep(2)                                   # 오류 시 2초 후 재시도
 
@@ -177,6 +255,30 @@ class IntegratedSystem:
                 print(f"모션 감지 스레드 오류 : {e}")
                 time.sleep(2)
 
+    # 인터럽트 방식 모션 감지 (PIR 상승 에지 이벤트가 올 때까지 대기)
+    def motion_edge_worker(self) :
+        detector = motion_detector.MotionEdgeDetector()
+        detector.start()
+        print("모션 감지 : GPIO 인터럽트 방식")
+
+        try :
+            while self.running :
+                # 종료 확인을 위해 1초마다 대기에서 깨어남
+                timestamp = detector.wait_event(timeout = 1)
+                if timestamp is None :
+                    continue
+
+                try :
+                    # 알림 전송 후 부저 알람 요청 및 데이터베이스 저장 (알람 재생은 기다리지 않음)
+                    self.send_motion_alert(timestamp)
+                    motion_detector.handle_motion()
+
+                except Exception as e :
+                    print(f"모션 감지 처리 오류 : {e}")
+
+        finally :
+            detector.stop()
+
     # 실시간 원격 제어 작업 스레드
     def websocket_worker(self) :
         loop = asyncio.new_event_loop()
@@ -186,8 +288,9 @@ class IntegratedSystem:
             # 실시간 원격 제어 서버 시작
             loop.run_until_complete(
                 websocket_server.start_server(
-                    self.shared_sensor_data,                        # 센서 데이터 공유
+                    self.sensor_snapshots,                          # 센서 데이터 스냅샷 공유
                     self.config_manager,                            # 설정 관리자 공유
+                    self.sensor_history,                            # 최근 측정 데이터 보관소 공유
                 )
             )
         
@@ -203,21 +306,27 @@ class IntegratedSystem:
 
         self.running = True                                         # 작업 시작 신호
 
+        # 데이터베이스 일괄 저장 스레드 시작 (작업 스레드는 대기열에 추가만 수행)
+        db_writer.writer.start()
+
+        # DHT22 측정 스레드 시작 (센서는 이 스레드만 읽고 다른 작업은 마지막 정상값 사용)
+        multi_sensor.dht_reader.start()
+
         # 각각의 작업을 담당하는 스레드 생성
         self.threads = [
             threading.Thread(
-                target = self.sensor_data_worker,
-                name = "환경 센서 데이터 수집",
+                target = self.sensor_sampling_worker,
+                name = "환경 센서 측정 (실시간 체크, 데이터 저장, 자동 제어)",
                 daemon = True                                       # 메인 프로그램 종료 시 같이 종료
             ),
             threading.Thread(
-                target = self.sensor_read_worker,
-                name = "환경 센서 데이터 실시간 체크",
+                target = self.daylight_worker,
+                name = "낮/밤 전환 제어",
                 daemon = True
             ),
             threading.Thread(
-                target = self.control_worker,
-                name = "자동 제어 시스템",
+                target = self.pwm_worker,
+                name = "팬, LED 비례 제어",
                 daemon = True
             ),
             threading.Thread(
@@ -245,11 +354,22 @@ def main() :
     try :
         system.start_all()                                          # 모든 센서 작업 스레드 시작
 
+        # 시작 소요 시간 출력
+        startup = time.perf_counter() - STARTUP_BEGIN
+        print(f"시스템 시작 완료 : {startup * 1000:.0f}ms (모듈 불러오기 {IMPORT_SECONDS * 1000:.0f}ms)")
+
         # 상태 체크 루프 (시스템이 잘 돌아가는지 15초마다 확인)
         start_time = datetime.now()
+        hardware_reported = False
         while True :
             time.sleep(15)                                          # 15초 대기
 
+            # 작업 스레드가 처음 사용하며 초기화한 하드웨어 출력 (한 번만)
+            if not hardware_reported :
+                resources = ', '.join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in lifecycle.opened_resources())
+                print(f"하드웨어 초기화 : {resources or '없음'}")
+                hardware_reported = True
+
             # 현재 시간 및 실행 시간 계산
             elapsed = datetime.now() - start_time
             current_time = datetime.now().strftime('%H:%M:%S')
@@ -267,6 +387,19 @@ def main() :
 
             print(f"[{current_time}] 농작물 환경 모니터링 시스템 정상 작동 중 (실행시간 : {runtime})")
 
+            # 측정 주기 지연 통계
+            schedule = system.sampling_schedule.get_stats()
+            print(f"측정 주기 : {schedule['ticks']}회, 지연 평균 {schedule['jitter_avg_ms']}ms, 최대 {schedule['jitter_max_ms']}ms (놓침 {schedule['missed']}회)")
+
+            # 자동 제어 실행 통계
+            trigger = multi_control.trigger.get_stats()
+            print(f"자동 제어 : 확인 {trigger['checks']}회, 실행 {trigger['runs']}회 {trigger['reasons']}")
+
+            # 비례 제어 중인 장치 출력 (현재 듀티, 최근 1시간 평균)
+            pwm = system.pwm_controller.get_stats()
+            if pwm :
+                print("비례 제어 : " + ', '.join(f"{device.upper()} {stats['duty']}% (1시간 평균 {stats['average_1h']}%)" for device, stats in pwm.items()))
+
     except Exception as e :
         print(f"시스템 오류 : {e}")
         system.stop_system()
@@ -275,5 +408,10 @@ if __name__ == "__main__":
     print("═" * 50)
     print("농작물 환경 모니터링 통합 시스템")
     print("═" * 50)
-    
-    main()                                                             # 메인 함수 실행
\ No newline at end of file
+
+    # 실행 방식 선택 (환경 변수가 설정값보다 우선)
+    if (os.environ.get(RUNTIME_ENV) or SETTINGS['RUNTIME_MODE']) == 'async' :
+        from runtime import async_runtime
+        async_runtime.main(IntegratedSystem())                         # 단일 이벤트 루프 실행
+    else :
+        main()                                                         # 메인 함수 실행
\ No newline at end of file
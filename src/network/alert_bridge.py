@@ -0,0 +1,71 @@
+# 농작물 환경 모니터링을 위한 작업 스레드 → 이벤트 루프 알림 전달 (즉시 깨우기)
+                                                                # 표준 라이브러리
+import asyncio
+import threading
+from collections import deque
+
+# 알림 대기열 설정
+ALERT_QUEUE_SIZE = 1000                                    # 최대 대기 알림 수 (초과 시 가장 오래된 알림 버림)
+ALERT_BATCH_SIZE = 50                                      # 한 번에 꺼낼 최대 알림 수
+
+# 알림 전달 클래스 - 작업 스레드가 put 하면 call_soon_threadsafe 로 이벤트 루프를 즉시 깨움
+class AlertBridge :
+  def __init__(self, maxsize = ALERT_QUEUE_SIZE) :
+    self.maxsize = maxsize
+    self.dropped = 0                                           # 대기열 초과로 버린 알림 수
+    self._loop = None                                          # 알림을 받을 이벤트 루프
+    self._queue = None                                         # 이벤트 루프 전용 대기열
+    self._pending = deque(maxlen = maxsize)                    # 이벤트 루프 연결 전 들어온 알림
+    self._lock = threading.Lock()
+
+  # 이벤트 루프 연결 (웹소켓 서버 시작 시 루프 안에서 호출)
+  def bind(self, loop = None) :
+    with self._lock :
+      self._loop = loop or asyncio.get_running_loop()
+      self._queue = asyncio.Queue(maxsize = self.maxsize)
+
+      # 연결 전 들어온 알림 옮기기
+      while self._pending :
+        self._enqueue(self._pending.popleft())
+
+  # 알림 추가 (작업 스레드에서 호출, 스레드 안전, 기다리지 않음)
+  def put(self, item) :
+    with self._lock :
+      if self._loop is None :
+        self._pending.append(item)
+        return
+
+      loop = self._loop
+
+    try :
+      loop.call_soon_threadsafe(self._enqueue, item)
+
+    except RuntimeError :
+      # 이벤트 루프 종료 후 들어온 알림은 버림
+      self.dropped += 1
+
+  # 이벤트 루프 대기열에 추가 (가득 차면 가장 오래된 알림을 버림)
+  def _enqueue(self, item) :
+    try :
+      self._queue.put_nowait(item)
+
+    except asyncio.QueueFull :
+      self._queue.get_nowait()
+      self._queue.put_nowait(item)
+      self.dropped += 1
+
+  # 알림이 올 때까지 기다렸다가 쌓인 알림을 한 번에 꺼내기
+  async def get_batch(self, max_batch = ALERT_BATCH_SIZE) :
+    batch = [await self._queue.get()]
+
+    while len(batch) < max_batch and not self._queue.empty() :
+      batch.append(self._queue.get_nowait())
+
+    return batch
+
+  # 대기 중인 알림 여부
+  def empty(self) :
+    if self._queue is None :
+      return not self._pending
+
+    return self._queue.empty()
@@ -0,0 +1,155 @@
+# 농작물 환경 모니터링을 위한 클라이언트별 전송 대기열 및 동시 브로드캐스트
+                                                                # 표준 라이브러리
+import asyncio
+import json
+from datetime import datetime
+
+# 전송 대기열 설정
+OUTBOUND_QUEUE_SIZE = 100                                  # 클라이언트별 전송 대기열 최대 크기
+OVERFLOW_POLICIES = ('drop_oldest', 'disconnect')          # 대기열 가득 참 처리 정책
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 클라이언트 전송 채널 클래스 - 클라이언트마다 전용 대기열과 전송 작업을 두어 느린 클라이언트가 다른 클라이언트를 막지 않음
+class ClientChannel :
+  def __init__(self, websocket, queue_size = OUTBOUND_QUEUE_SIZE, overflow_policy = 'drop_oldest') :
+    if overflow_policy not in OVERFLOW_POLICIES :
+      raise ValueError(f"알 수 없는 대기열 정책 : {overflow_policy}")
+
+    self.websocket = websocket
+    self.overflow_policy = overflow_policy                     # 대기열 가득 참 처리 정책
+    self.queue = asyncio.Queue(maxsize = queue_size)           # 전송 대기열 (직렬화된 문자열)
+    self.sent = 0                                              # 전송 완료 메시지 수
+    self.dropped = 0                                           # 대기열 정책으로 버려진 메시지 수
+    self.closed = False
+    self._task = None
+
+  # 전송 작업 시작
+  def start(self) :
+    self._task = asyncio.create_task(self._sender())
+    return self
+
+  # 전송 대기열에 메시지 추가 (기다리지 않음, 추가 여부 반환)
+  def offer(self, payload) :
+    if self.closed :
+      return False
+
+    try :
+      self.queue.put_nowait(payload)
+      return True
+
+    except asyncio.QueueFull :
+      if self.overflow_policy == 'disconnect' :
+        # 계속 밀리는 클라이언트는 연결 종료
+        # (바로 닫힘 상태로 표시해 이번 브로드캐스트에서 채널 정리, 끊김 수 집계)
+        print(f"[{current_time()}] 전송 대기열 초과 - 클라이언트 연결 종료")
+        self.closed = True
+        asyncio.create_task(self.close())
+        return False
+
+      # 가장 오래된 메시지를 버리고 새 메시지 추가
+      self.queue.get_nowait()
+      self.queue.put_nowait(payload)
+      self.dropped += 1
+      return True
+
+  # 대기열의 메시지를 순서대로 전송
+  async def _sender(self) :
+    try :
+      while True :
+        payload = await self.queue.get()
+        await self.websocket.send(payload)
+        self.sent += 1
+
+    except asyncio.CancelledError :
+      raise
+
+    except Exception as e :
+      print(f"[{current_time()}] 클라이언트 전송 오류 : {e}")
+      self.closed = True
+
+  # 전송 작업 중지 및 연결 종료
+  async def close(self) :
+    if self.closed and self._task is None :
+      return
+
+    self.closed = True
+
+    if self._task is not None and self._task is not asyncio.current_task() :
+      self._task.cancel()
+    self._task = None
+
+    try :
+      await self.websocket.close()
+
+    except Exception :
+      pass
+
+  # 현재 대기 중인 메시지 수
+  def depth(self) :
+    return self.queue.qsize()
+
+# 브로드캐스트 관리 클래스 - 메시지를 한 번만 직렬화하여 모든 클라이언트 대기열에 동시에 추가
+class Broadcaster :
+  def __init__(self, queue_size = OUTBOUND_QUEUE_SIZE, overflow_policy = 'drop_oldest') :
+    self.queue_size = queue_size
+    self.overflow_policy = overflow_policy
+    self.channels = {}                                         # 웹소켓 → 전송 채널
+    self.disconnected = 0                                      # 오류, 대기열 초과로 끊긴 클라이언트 수
+
+  # 클라이언트 등록 (이벤트 루프 안에서 호출)
+  def register(self, websocket) :
+    channel = ClientChannel(websocket, self.queue_size, self.overflow_policy).start()
+    self.channels[websocket] = channel
+    return channel
+
+  # 클라이언트 해제
+  async def unregister(self, websocket) :
+    channel = self.channels.pop(websocket, None)
+    if channel is not None :
+      await channel.close()
+
+  # 특정 클라이언트에게 전송 (대기열 경유)
+  def send_to(self, websocket, message) :
+    channel = self.channels.get(websocket)
+    if channel is None :
+      return False
+
+    return channel.offer(json.dumps(message, ensure_ascii = False))
+
+  # 모든 클라이언트에게 전송 (직렬화 1회, 전송 완료를 기다리지 않음, 추가된 클라이언트 수 반환)
+  def broadcast(self, message) :
+    if not self.channels :
+      return 0
+
+    payload = json.dumps(message, ensure_ascii = False)
+    delivered = 0
+    closed = []
+
+    for websocket, channel in self.channels.items() :
+      if channel.offer(payload) :
+        delivered += 1
+      elif channel.closed :
+        closed.append(websocket)
+
+    # 끊긴 클라이언트 정리
+    for websocket in closed :
+      self.channels.pop(websocket, None)
+      self.disconnected += 1
+
+    return delivered
+
+  # 전송 대기열 지표
+  def metrics(self) :
+    depths = [channel.depth() for channel in self.channels.values()]
+
+    return {
+      'clients' : len(self.channels),
+      'queue_depth_max' : max(depths, default = 0),
+      'queue_depth_total' : sum(depths),
+      'sent' : sum(channel.sent for channel in self.channels.values()),
+      'dropped' : sum(channel.dropped for channel in self.channels.values()),
+      'disconnected' : self.disconnected
+    }
@@ -0,0 +1,94 @@
+# 농작물 환경 모니터링을 위한 센서 데이터 구독 관리 (변화가 있을 때만 클라이언트에 전송)
+                                                                # 표준 라이브러리
+import math
+import time
+
+# 구독 가능한 센서 항목
+SENSOR_METRICS = ('temperature', 'humidity', 'soil_moisture', 'light_value')
+
+# 구독 제한
+MIN_INTERVAL_FLOOR = 1.0                                   # 최소 전송 간격 하한 (초)
+
+# 구독 요청 검증 및 정규화
+def parse_subscription(data) :
+  metrics = data.get('metrics') or list(SENSOR_METRICS)
+  unknown = [metric for metric in metrics if metric not in SENSOR_METRICS]
+  if unknown :
+    raise ValueError(f"알 수 없는 구독 항목 : {', '.join(unknown)}")
+
+  min_interval = max(MIN_INTERVAL_FLOOR, float(data.get('min_interval', MIN_INTERVAL_FLOOR)))
+
+  # 불감대 : 숫자 하나(모든 항목 공통) 또는 항목별 값
+  deadband = data.get('deadband', 0)
+  if isinstance(deadband, dict) :
+    deadband = {metric : float(deadband.get(metric, 0)) for metric in metrics}
+  else :
+    deadband = {metric : float(deadband) for metric in metrics}
+
+  return metrics, min_interval, deadband
+
+# 클라이언트별 구독 정보
+class Subscription :
+  def __init__(self, metrics, min_interval, deadband) :
+    self.metrics = metrics                                     # 구독 항목
+    self.min_interval = min_interval                           # 최소 전송 간격 (초)
+    self.deadband = deadband                                   # 항목별 불감대 (마지막 전송값 대비 변화량)
+    self.last_values = {}                                      # 마지막으로 전송한 항목별 값
+    self.last_sent = -math.inf                                 # 마지막 전송 시각 (monotonic)
+
+  # 마지막 전송값 대비 불감대를 넘은 항목 (불감대 0 이면 값이 바뀐 항목)
+  def changed(self, data) :
+    changed = {}
+
+    for metric in self.metrics :
+      value = data.get(metric)
+      last = self.last_values.get(metric)
+
+      if value is None or value == last :
+        continue
+
+      if last is None or abs(value - last) >= self.deadband[metric] :
+        changed[metric] = value
+
+    return changed
+
+  # 전송 기록 갱신
+  def mark_sent(self, values, now) :
+    self.last_values.update(values)
+    self.last_sent = now
+
+# 구독 관리 클래스
+class SubscriptionManager :
+  def __init__(self) :
+    self.subscriptions = {}                                    # 클라이언트 → 구독 정보
+
+  # 구독 등록 (같은 클라이언트가 다시 요청하면 덮어쓰기)
+  def subscribe(self, client, metrics, min_interval, deadband) :
+    subscription = Subscription(metrics, min_interval, deadband)
+    self.subscriptions[client] = subscription
+    return subscription
+
+  # 구독 해제
+  def unsubscribe(self, client) :
+    return self.subscriptions.pop(client, None) is not None
+
+  # 전송할 (클라이언트, 변경 항목) 목록과 최소 간격 때문에 미룬 경우 다음 확인 시각 반환
+  def due(self, data, now = None) :
+    now = time.monotonic() if now is None else now
+    ready = []
+    next_check = None
+
+    for client, subscription in self.subscriptions.items() :
+      changed = subscription.changed(data)
+      if not changed :
+        continue
+
+      ready_at = subscription.last_sent + subscription.min_interval
+      if now >= ready_at :
+        subscription.mark_sent(changed, now)
+        ready.append((client, changed))
+
+      elif next_check is None or ready_at < next_check :
+        next_check = ready_at
+
+    return ready, next_check
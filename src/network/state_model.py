@@ -0,0 +1,57 @@
+# 농작물 환경 모니터링을 위한 버전 관리 상태 모델 (클라이언트에 변경된 항목만 전송)
+                                                                # 표준 라이브러리
+import threading
+from collections import deque
+
+# 변경 이력 보관 개수 (이보다 뒤처진 클라이언트는 전체 상태 재동기화)
+HISTORY_LIMIT = 256
+
+# 버전 관리 상태 클래스 - 값이 바뀔 때마다 버전이 1씩 증가하고 버전별 변경 항목을 보관
+class VersionedState :
+  def __init__(self, history_limit = HISTORY_LIMIT) :
+    self.version = 0                                           # 현재 상태 버전 (단조 증가)
+    self._state = {}                                           # 항목별 현재 값
+    self._changes = deque(maxlen = history_limit)              # (버전, 변경 항목) 이력
+    self._lock = threading.Lock()                              # 센서, 제어, 웹소켓 스레드 동시 갱신 보호
+
+  # 상태 갱신 (바뀐 항목이 있을 때만 버전 증가, 현재 버전 반환)
+  def update(self, fields) :
+    with self._lock :
+      changed = {key : value for key, value in fields.items() if self._state.get(key, object()) != value}
+
+      if changed :
+        self.version += 1
+        self._state.update(changed)
+        self._changes.append((self.version, changed))
+
+      return self.version
+
+  # 전체 상태
+  def snapshot(self) :
+    with self._lock :
+      return {
+        'type' : 'full',
+        'version' : self.version,
+        'state' : dict(self._state)
+      }
+
+  # since 버전 이후 변경 항목 (이력이 남아 있지 않으면 전체 상태)
+  def since(self, version) :
+    with self._lock :
+      current = self.version
+
+      if version == current :
+        return {'type' : 'delta', 'base' : version, 'version' : current, 'changes' : {}}
+
+      # 잘못된 버전이거나 이력보다 오래 뒤처진 경우 전체 재동기화
+      oldest_base = self._changes[0][0] - 1 if self._changes else current
+      if version is None or version > current or version < oldest_base :
+        return {'type' : 'full', 'version' : current, 'state' : dict(self._state)}
+
+      # 이후 변경 항목 병합 (같은 항목은 최신 값으로)
+      changes = {}
+      for change_version, changed in self._changes :
+        if change_version > version :
+          changes.update(changed)
+
+      return {'type' : 'delta', 'base' : version, 'version' : current, 'changes' : changes}
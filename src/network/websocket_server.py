@@ -3,24 +3,36 @@
 import asyncio
 import json
 from datetime import datetime
-from queue import Queue
                                                                 # 외부 라이브러리
 import websockets
-import RPi.GPIO as GPIO
                                                                 # 로컬 모듈
-import multi_sensor
-import multi_control
-from config_manager import ConfigManager
+import sensor.multi_sensor as multi_sensor
+import control.multi_control as multi_control
+from config.config_manager import ConfigManager, validate_device_control
+from database import history_query
+from network.sensor_subscription import SubscriptionManager, parse_subscription
+from network.state_model import VersionedState
+from network.client_channel import Broadcaster
+from network.alert_bridge import AlertBridge
 
 # 웹소켓 서버 설정
 WS_HOST = '0.0.0.0'                                        # 모든 네트워크 인터페이스에서 접속 허용
 WS_PORT = 8765                                             # 웹소켓 포트 번호
 
 # 전역 변수 - 통합 시스템과 공유할 데이터
-sensor_data = None                                         # 센서 데이터 공유 변수
+sensor_store = None                                        # 공유 센서 데이터 스냅샷 보관소
+published_seq = None                                       # 버전 관리 상태에 마지막으로 반영한 스냅샷 순번
+sensor_history = None                                      # 최근 측정 데이터 보관소
 config = None                                              # 설정 관리자
-clients = set()                                            # 연결된 클라이언트 목록
-alert_queue = Queue()                                      # 시스템 알림 전달용
+broadcaster = Broadcaster()                                # 연결된 클라이언트별 전송 대기열
+alert_queue = AlertBridge()                                # 시스템 알림 전달용 (작업 스레드 → 이벤트 루프)
+subscriptions = SubscriptionManager()                      # 센서 데이터 구독 목록
+shared_state = VersionedState()                            # 버전 관리 상태 (센서 + 제어 상태)
+acked_versions = {}                                        # 클라이언트별 마지막 확인 버전
+
+# 센서 데이터 갱신 알림 (이벤트 루프에서 생성)
+event_loop = None                                          # 웹소켓 서버 이벤트 루프
+sensor_updated = None                                      # 센서 데이터 갱신 이벤트
 
 # 현재 시각 문자열 반환 (로그 출력용)
 def current_time() :
@@ -31,10 +43,11 @@ def datetime_stamp() :
   return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
 # 공유 데이터 초기화
-def init_shared_data(sensor_ref, config_ref) :
-  global sensor_data, config
-  sensor_data = sensor_ref
+def init_shared_data(sensor_ref, config_ref, history_ref = None) :
+  global sensor_store, config, sensor_history
+  sensor_store = sensor_ref
   config = config_ref
+  sensor_history = history_ref
 
 # 웹소켓 응답 JSON 생성
 def make_response(command, status = 'success', **data) :
@@ -55,22 +68,9 @@ async def send_error(websocket, command, error) :
   await websocket.send(json.dumps(response, ensure_ascii = False))
   print(f"[{current_time()}] {command} 오류 : {error}")
 
-# 모든 연결된 클라이언트에서 메시지 전송
+# 모든 연결된 클라이언트에게 메시지 전송 (한 번 직렬화 후 클라이언트별 대기열에 추가, 느린 클라이언트를 기다리지 않음)
 async def broadcast(message) :
-  if clients :
-    # 연결이 끊긴 클라이언트 제거를 위한 리스트
-    disconnected = set()
-
-    for client in clients :
-      try :
-        await client.send(json.dumps(message, ensure_ascii = False))
-      
-      except Exception as e :
-        print(f"[{current_time()}] 브로드캐스트 오류 : {e}")
-        disconnected.add(client)
-    
-    # 끊긴 클라이언트 제거
-    clients.difference_update(disconnected)
+  return broadcaster.broadcast(message)
 
 # 모든 클라이언트에게 알림 전송
 async def send_alert(alert_type, message, data = None) :
@@ -90,17 +90,18 @@ async def send_alert(alert_type, message, data = None) :
 # 센서 데이터 조회 명령 처리
 async def get_sensor_data(websocket) :
   try :
-    # sensor_data가 None이거나 비어있는지 확인
-    if sensor_data is None:
+    # 스냅샷 보관소가 연결되지 않았는지 확인
+    if sensor_store is None:
       print(f"[{current_time()}] 오류 : 센서 데이터가 초기화되지 않았습니다")
       await send_error(websocket, 'get_sensor_data', '센서 데이터가 초기화되지 않았습니다')
       return
     
-    # 센서 데이터 가져오기
-    temperature = sensor_data.get('temperature')
-    humidity = sensor_data.get('humidity')
-    soil_moisture = sensor_data.get('soil_moisture')
-    light_value = sensor_data.get('light_value')
+    # 센서 데이터 가져오기 (한 스냅샷의 값만 사용하여 모든 항목이 같은 측정 시점)
+    snapshot = sensor_store.current
+    temperature = snapshot.temperature
+    humidity = snapshot.humidity
+    soil_moisture = snapshot.soil_moisture
+    light_value = snapshot.light_value
     
     # 센서 데이터 출력 (공통 함수 사용)
     if temperature is not None and humidity is not None :
@@ -119,7 +120,7 @@ async def get_sensor_data(websocket) :
           'humidity' : round(humidity, 1) if humidity is not None else None,
           'soil_moisture' : round(soil_moisture, 1) if soil_moisture is not None else None,
           'light_value' : light_value,
-          'last_update' : sensor_data.get('last_update')
+          'last_update' : snapshot.last_update
       },
       created_at = datetime_stamp()
     )
@@ -131,6 +132,209 @@ async def get_sensor_data(websocket) :
     print(f"[{current_time()}] 실시간 원격 제어 데이터 조회 오류 : {e}")
     await send_error(websocket, 'get_sensor_data', e)
 
+# 최근 기간 센서 통계 조회 명령 처리 (메모리 보관소 사용, 데이터베이스 조회 없음)
+async def get_recent_stats(websocket, data) :
+  try :
+    if sensor_history is None :
+      await send_error(websocket, 'get_recent_stats', '최근 측정 데이터 보관소가 초기화되지 않았습니다')
+      return
+
+    hours = float(data.get('hours', 1))
+    metrics = data.get('metrics') or None
+
+    stats = sensor_history.stats(seconds = hours * 3600, metrics = metrics)
+
+    response = make_response(
+      'get_recent_stats',
+      hours = hours,
+      data = stats,
+      created_at = datetime_stamp()
+    )
+
+    await websocket.send(json.dumps(response, ensure_ascii = False))
+    print(f"[{current_time()}] 최근 {hours}시간 센서 통계 전송 완료\n")
+
+  except Exception as e :
+    print(f"[{current_time()}] 최근 센서 통계 조회 오류 : {e}")
+    await send_error(websocket, 'get_recent_stats', e)
+
+# 기간별 데이터 조회 명령 처리 (서버 측 구간 집계 결과를 여러 메시지로 나누어 전송)
+async def get_history(websocket, data) :
+  try :
+    request = history_query.build_request(data)
+
+  except Exception as e :
+    await send_error(websocket, 'get_history', e)
+    return
+
+  loop = asyncio.get_running_loop()
+  chunks = history_query.iter_history(request)
+  seq = 0
+  total = 0
+
+  try :
+    while True :
+      # 데이터베이스 읽기는 실행기에서 처리 (이벤트 루프 차단 방지)
+      item = await loop.run_in_executor(None, next, chunks, None)
+      if item is None :
+        break
+
+      table, chunk = item
+      total += len(chunk['t'])
+
+      await websocket.send(json.dumps(make_response(
+        'get_history',
+        seq = seq,
+        done = False,
+        table = table,
+        bucket_seconds = request['bucket'],
+        data = chunk
+      ), ensure_ascii = False))
+      seq += 1
+
+    # 전송 완료 메시지
+    await websocket.send(json.dumps(make_response(
+      'get_history',
+      seq = seq,
+      done = True,
+      start = request['start'].strftime('%Y-%m-%d %H:%M:%S'),
+      end = request['end'].strftime('%Y-%m-%d %H:%M:%S'),
+      bucket_seconds = request['bucket'],
+      total_buckets = total
+    ), ensure_ascii = False))
+    print(f"[{current_time()}] 기간별 데이터 {total}구간 전송 완료 ({seq}개 메시지)\n")
+
+  except Exception as e :
+    print(f"[{current_time()}] 기간별 데이터 조회 오류 : {e}")
+    await send_error(websocket, 'get_history', e)
+
+  finally :
+    await loop.run_in_executor(None, chunks.close)            # 조회 중단 (연결은 묶음마다 반납됨)
+
+# 공유 센서 데이터 스냅샷을 버전 관리 상태에 반영 (이미 반영한 스냅샷이면 순번 비교만 하고 건너뜀)
+def publish_sensor_state() :
+  global published_seq
+
+  if sensor_store is None :
+    return shared_state.version
+
+  snapshot = sensor_store.current
+  if snapshot.seq == published_seq :
+    return shared_state.version
+
+  fields = {}
+  for key in ('temperature', 'humidity', 'soil_moisture') :
+    value = snapshot.get(key)
+    fields[key] = round(value, 1) if value is not None else None
+
+  fields['light_value'] = snapshot.light_value
+  fields['last_update'] = snapshot.last_update
+
+  published_seq = snapshot.seq
+  return shared_state.update(fields)
+
+# 현재 제어 상태와 모드를 버전 관리 상태에 반영 (제어 스레드, 웹소켓 명령에서 호출)
+def publish_device_state(device_status = None) :
+  device_status = device_status or multi_control.get_device_status()
+  if device_status is None or config is None :
+    return shared_state.version
+
+  fields = {}
+  for device in ('led', 'fan', 'pump') :
+    fields[f'{device}.status'] = device_status[device]
+    fields[f'{device}.mode'] = config.get_device_mode(device)
+
+  return shared_state.update(fields)
+
+# 상태 동기화 명령 처리 (since 또는 마지막 확인 버전 이후 바뀐 항목만 전송)
+async def get_state(websocket, data) :
+  try :
+    since = data.get('since', acked_versions.get(websocket))
+    response = make_response('get_state', **shared_state.since(since))
+
+    await websocket.send(json.dumps(response, ensure_ascii = False))
+
+  except Exception as e :
+    await send_error(websocket, 'get_state', e)
+
+# 상태 버전 확인 명령 처리 (다음 get_state 의 기준 버전)
+async def ack(websocket, data) :
+  try :
+    acked_versions[websocket] = int(data.get('version'))
+
+  except Exception as e :
+    await send_error(websocket, 'ack', e)
+
+# 센서 데이터 갱신 알림 (센서 스레드에서 호출, 스레드 안전)
+def notify_sensor_update() :
+  publish_sensor_state()
+
+  if event_loop is not None and sensor_updated is not None :
+    event_loop.call_soon_threadsafe(sensor_updated.set)
+
+# 센서 데이터 구독 명령 처리
+async def subscribe(websocket, data) :
+  try :
+    metrics, min_interval, deadband = parse_subscription(data)
+    subscription = subscriptions.subscribe(websocket, metrics, min_interval, deadband)
+
+    # 구독 직후 현재 값 전송
+    current = subscription.changed(sensor_store.current if sensor_store is not None else {})
+    subscription.mark_sent(current, asyncio.get_running_loop().time())
+
+    response = make_response(
+      'subscribe',
+      metrics = metrics,
+      min_interval = min_interval,
+      deadband = deadband,
+      data = current
+    )
+
+    await websocket.send(json.dumps(response, ensure_ascii = False))
+    print(f"[{current_time()}] 센서 데이터 구독 등록 : {', '.join(metrics)}")
+
+  except Exception as e :
+    await send_error(websocket, 'subscribe', e)
+
+# 센서 데이터 구독 해제 명령 처리
+async def unsubscribe(websocket) :
+  removed = subscriptions.unsubscribe(websocket)
+  await websocket.send(json.dumps(make_response('unsubscribe', removed = removed), ensure_ascii = False))
+
+# 센서 데이터가 갱신되면 구독 클라이언트에게 바뀐 항목만 전송
+async def subscription_pusher() :
+  loop = asyncio.get_running_loop()
+
+  while True :
+    try :
+      await sensor_updated.wait()
+      sensor_updated.clear()
+
+      if sensor_store is None :
+        continue
+
+      snapshot = sensor_store.current
+      ready, next_check = subscriptions.due(snapshot, loop.time())
+
+      for client, values in ready :
+        message = make_response(
+          'sensor_update',
+          data = values,
+          last_update = snapshot.last_update
+        )
+
+        # 클라이언트 전송 대기열 경유 (끊긴 클라이언트는 구독 해제)
+        if not broadcaster.send_to(client, message) :
+          subscriptions.unsubscribe(client)
+
+      # 최소 전송 간격 때문에 미룬 변경은 간격이 지난 뒤 다시 확인
+      if next_check is not None :
+        loop.call_at(next_check, sensor_updated.set)
+
+    except Exception as e :
+      print(f"[{current_time()}] 구독 데이터 전송 모니터 오류 : {e}")
+      await asyncio.sleep(1)
+
 # 설정값 조회 명령 처리
 async def get_settings(websocket) :
   try :
@@ -153,34 +357,50 @@ async def update_settings(websocket, data) :
   try :
     key = data.get('key')
     value = data.get('value')
+    device = data.get('device')                                # 장치 제어 동작 설정 변경 시 장치 이름 (출력 방식, 히스테리시스, 최소 유지 시간, 최대 가동률)
+
+    # 장치 제어 동작은 저장 전에 장치, 항목, 값 검증 (잘못된 값이 저장되면 자동 제어가 멈춤)
+    if device is not None :
+      try :
+        value = validate_device_control(device, key, value)
+
+      except ValueError as e :
+        await send_error(websocket, 'update_settings', e)
+        return
 
     # 기존 값 가져오기
-    old_value = config.get_setting(key)
+    old_value = config.get_device_control(device).get(key) if device is not None else config.get_setting(key)
 
     print(f"[{current_time()}] 설정 변경 요청 : {old_value} → {value}")
 
     # 설정값 업데이트
-    success = config.update_setting(key, value)
+    if device is not None :
+      success = config.update_device_control(device, key, value)
+    else :
+      success = config.update_setting(key, value)
 
     if success :
       print(f"[{current_time()}] 설정 적용 완료")
 
-      # 설정 변경 시 해당 장치를 자동 모드로 전환
-      if 'fan' in key :
-        config.set_device_mode('fan', 'auto')
+      # 설정 변경 시 해당 장치를 자동 모드로 전환 (제어 동작 설정은 모드 유지)
+      if device is None :
+        if 'fan' in key :
+          config.set_device_mode('fan', 'auto')
 
-      elif 'light' in key or 'illum' in key :
-        config.set_device_mode('led', 'auto')
-        
-      elif 'soil' in key :
-        config.set_device_mode('pump', 'auto')
+        elif 'light' in key or 'illum' in key :
+          config.set_device_mode('led', 'auto')
+          
+        elif 'soil' in key :
+          config.set_device_mode('pump', 'auto')
 
-      # 설정 변경 후 즉시 제어 실행
-      control_result = auto_control()
+      # 설정 변경 후 즉시 제어 실행 (센서 읽기, 제어 잠금 대기가 이벤트 루프를 막지 않도록 실행기에서)
+      control_result = await asyncio.get_running_loop().run_in_executor(None, auto_control)
+      publish_device_state()
 
       response = make_response(
         'update_settings',
         key = key,
+        device = device,
         new_value = value,
         control_result = control_result
       )
@@ -204,17 +424,12 @@ async def manual_control(websocket, data) :
     state_bool = (state == 'ON')
     config.set_device_mode(device, 'manual', state_bool)
 
-    # 즉시 제어 실행
-    pin = getattr(multi_control, f'{device.upper()}_PIN')
-
-    # 팬과 펌프는 신호 반전 (LOW = ON, HIGH = OFF)
-    if device in ['fan', 'pump'] :
-        GPIO.output(pin, GPIO.LOW if state == 'ON' else GPIO.HIGH)
-    else:
-        GPIO.output(pin, GPIO.HIGH if state == 'ON' else GPIO.LOW)
+    # 즉시 제어 실행 (팬과 펌프 신호 반전은 제어 모듈에서 처리)
+    multi_control.set_device(device, state_bool)
     
-    # 수동 제어 출력
+    # 수동 제어 출력 및 상태 반영
     multi_control.print_control_status(device, state, 'manual')
+    publish_device_state()
       
     response = make_response(
         'manual_control',
@@ -251,7 +466,7 @@ async def set_mode(websocket, data) :
 
     # 자동 모드로 전환 시 : 즉시 제어 실행
     if mode == 'auto' and success :
-      control_result = auto_control()
+      control_result = await asyncio.get_running_loop().run_in_executor(None, auto_control)
 
     # 수동 모드로 전환 시 : 현재 제어 상태 전송
     elif mode == 'manual' and success :
@@ -279,39 +494,30 @@ async def set_mode(websocket, data) :
 
     if not success :
       response['message'] = '모드 변경 실패'
-        
+
+    publish_device_state()
     await websocket.send(json.dumps(response, ensure_ascii = False))
 
   except Exception as e :
       await send_error(websocket, 'set_mode', e)
 
-# 설정 변경 시 즉시 제어 실행
+# 설정 변경 시 즉시 제어 실행 (실행기 스레드에서 호출)
 def auto_control() :
-  global sensor_data
-
   try :
-    # 메모리에서 최신 센서 데이터 가져오기
+    # 최신 센서 데이터 스냅샷 가져오기
+    snapshot = sensor_store.current
     current_data = {
-      'temperature' : sensor_data.get('temperature'),
-      'humidity' : sensor_data.get('humidity'),
-      'soil_moisture' : sensor_data.get('soil_moisture'),
+      'temperature' : snapshot.temperature,
+      'humidity' : snapshot.humidity,
+      'soil_moisture' : snapshot.soil_moisture,
       'light_value' : multi_control.get_light_value()
     }
 
-    # 제어 실행 (자동 모드인 장치만)
+    # 제어 실행 (자동 모드인 장치만, 규칙 엔진이 장치별 측정 항목과 기준 적용)
     results = {}
-
-    # LED 제어 (자동 모드인 경우)
-    if config.get_device_mode('led') == 'auto' :
-      results['led'] = multi_control.control_led(current_data['light_value'])
-
-    # 팬 제어 (자동 모드인 경우)
-    if config.get_device_mode('fan') == 'auto' :
-      results['fan'] = multi_control.control_fan(current_data['temperature'])
-    
-    # 펌프 제어 (자동 모드인 경우)
-    if config.get_device_mode('pump') == 'auto' :
-      results['pump'] = multi_control.control_pump(current_data['soil_moisture'])
+    for device in multi_control.engine.devices :
+      if config.get_device_mode(device) == 'auto' :
+        results[device] = multi_control.control_device(device, current_data)
     
     return results
 
@@ -343,6 +549,7 @@ async def get_device_status(websocket) :
     ]
 
     multi_control.print_control_status(device_list, None, 'auto')
+    publish_device_state(device_status)
     
     response = make_response(
       'get_device_status',
@@ -370,15 +577,26 @@ async def get_device_status(websocket) :
     print(f"[{current_time()}] 제어 상태 조회 오류 : {e}")
     await send_error(websocket, 'get_device_status', e)
 
-# 시스템 알림 확인 및 전송 (대기 시간 : 0.5초)
+# 서버 상태 지표 조회 명령 처리 (클라이언트별 전송 대기열 상태)
+async def get_server_metrics(websocket) :
+  response = make_response(
+    'get_server_metrics',
+    broadcast = broadcaster.metrics(),
+    subscriptions = len(subscriptions.subscriptions),
+    state_version = shared_state.version,
+    created_at = datetime_stamp()
+  )
+
+  await websocket.send(json.dumps(response, ensure_ascii = False))
+
+# 시스템 알림 전송 (알림이 들어오면 즉시 깨어나 쌓인 알림을 한 번에 전송)
 async def alert_monitor() :
   while True :
     try :
-      # 큐에 알림이 있는지 확인
-      if not alert_queue.empty() :
-        alert_data = alert_queue.get_nowait()
-        
-        # 모든 클라이언트에게 알림 전송
+      batch = await alert_queue.get_batch()
+
+      # 모든 클라이언트에게 알림 전송
+      for alert_data in batch :
         await send_alert(
           alert_type = alert_data['type'],
           message = alert_data['message'],
@@ -386,9 +604,6 @@ async def alert_monitor() :
             'timestamp' : alert_data['timestamp']
           }
         )
-      
-      # 0.5초마다 체크
-      await asyncio.sleep(0.5)
     
     except Exception as e :
       print(f"[{current_time()}] 알림 모니터 오류 : {e}")
@@ -396,8 +611,8 @@ async def alert_monitor() :
 
 # 클라이언트 연결 처리
 async def handle_client(websocket, path) :
-  # 연결된 클라이언트 목록에 추가
-  clients.add(websocket)
+  # 연결된 클라이언트 목록에 추가 (전용 전송 대기열 생성)
+  broadcaster.register(websocket)
 
   try :
     # 클라이언트로부터 메시지 수신 대기
@@ -411,6 +626,27 @@ async def handle_client(websocket, path) :
         if command == 'get_sensor_data' :
           await get_sensor_data(websocket)
 
+        elif command == 'get_recent_stats' :
+          await get_recent_stats(websocket, data)
+
+        elif command == 'get_history' :
+          await get_history(websocket, data)
+
+        elif command == 'get_server_metrics' :
+          await get_server_metrics(websocket)
+
+        elif command == 'get_state' :
+          await get_state(websocket, data)
+
+        elif command == 'ack' :
+          await ack(websocket, data)
+
+        elif command == 'subscribe' :
+          await subscribe(websocket, data)
+
+        elif command == 'unsubscribe' :
+          await unsubscribe(websocket)
+
         elif command == 'get_settings' :
           await get_settings(websocket) 
         
@@ -440,21 +676,30 @@ async def handle_client(websocket, path) :
 
   finally :
     # 연결 종료 시 목록에서 제거
-    clients.discard(websocket)
+    await broadcaster.unregister(websocket)
+    subscriptions.unsubscribe(websocket)
+    acked_versions.pop(websocket, None)
 
 # 실시간 원격 제어 시작
-async def start_server(sensor_ref, config_ref) :
+async def start_server(sensor_ref, config_ref, history_ref = None) :
+  global event_loop, sensor_updated
+
   # 공유 데이터 초기화
-  init_shared_data(sensor_ref, config_ref)
+  init_shared_data(sensor_ref, config_ref, history_ref)
+
+  # 센서 스레드에서 갱신을 알릴 수 있도록 이벤트 루프 등록
+  event_loop = asyncio.get_running_loop()
+  sensor_updated = asyncio.Event()
+  alert_queue.bind(event_loop)
 
   # 실시간 원격 제어 서버 구동
   async with websockets.serve(handle_client, WS_HOST, WS_PORT) :
     print(f"\n[{current_time()}] 실시간 원격 제어 시작 : ws://{WS_HOST}:{WS_PORT}\n")
 
-    # 알림 모니터 시작
-    asyncio.create_task(alert_monitor())
-
-    await asyncio.Future()                                 # 서버 계속 실행
+    # 알림 모니터 및 구독 데이터 전송 (서버 작업이 취소되면 함께 취소됨)
+    async with asyncio.TaskGroup() as group :
+      group.create_task(alert_monitor())
+      group.create_task(subscription_pusher())
 
 # 독립 실행 모드
 if __name__ == "__main__" :
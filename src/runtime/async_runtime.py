@@ -0,0 +1,403 @@
+# 농작물 환경 모니터링을 위한 단일 이벤트 루프 실행 방식 (작업 스레드 대신 코루틴, 블로킹 작업은 크기 제한 실행기)
+#
+# 센서 측정, 자동 제어, 모션 감지, 데이터베이스 저장, 실시간 원격 제어가 모두 한 이벤트 루프의 작업으로 실행됨
+# - 하드웨어, 데이터베이스 호출은 작업 스레드 수와 동시 요청 수가 제한된 실행기에서 처리
+# - 공유 센서 데이터 스냅샷은 이벤트 루프에서만 발행
+# - 종료 시 모든 작업을 함께 취소한 뒤 남은 데이터 저장, 하드웨어 정리
+                                                                # 표준 라이브러리
+import asyncio
+import functools
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+                                                                # 로컬 모듈
+import sensor.multi_sensor as multi_sensor
+import control.multi_control as multi_control
+import control.motion_detector as motion_detector
+import network.websocket_server as websocket_server
+import database.db_writer as db_writer
+from config.constant import SETTINGS, ASYNC_RUNTIME_CONFIG
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 경과 시간을 읽기 쉽게 변환
+def format_elapsed(seconds) :
+  hours, rest = divmod(int(seconds), 3600)
+  minutes, seconds = divmod(rest, 60)
+
+  if hours > 0 :
+    return f"{hours}시간 {minutes}분 {seconds}초"
+  if minutes > 0 :
+    return f"{minutes}분 {seconds}초"
+  return f"{seconds}초"
+
+# 크기 제한 실행기 클래스 - 작업 스레드 수와 동시 요청 수를 제한하여 블로킹 호출을 이벤트 루프 밖에서 실행
+# 동시 요청 수를 넘으면 빈자리가 날 때까지 호출한 작업이 기다림 (대기열이 끝없이 늘지 않음)
+class BoundedExecutor :
+  def __init__(self, name, workers, limit = ASYNC_RUNTIME_CONFIG['executor_limit']) :
+    self.name = name                                           # 실행기 이름 (로그, 통계용)
+    self.pool = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = name)
+    self._slots = asyncio.Semaphore(limit)                     # 동시 요청 수 제한
+
+    self.calls = 0                                             # 처리 요청 수
+    self.errors = 0                                            # 오류 발생 요청 수
+    self.active = 0                                            # 현재 처리 중 또는 대기 중인 요청 수
+    self.max_active = 0                                        # 최대 동시 요청 수
+    self.max_seconds = 0.0                                     # 가장 오래 걸린 요청 시간 (대기 포함, 초)
+
+  # 블로킹 함수 실행 (결과 반환, 오류는 그대로 전달)
+  async def run(self, func, *args, **kwargs) :
+    start = time.perf_counter()
+
+    async with self._slots :
+      self.active += 1
+      self.max_active = max(self.max_active, self.active)
+
+      try :
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, functools.partial(func, *args, **kwargs))
+
+      except Exception :
+        self.errors += 1
+        raise
+
+      finally :
+        self.active -= 1
+        self.calls += 1
+        self.max_seconds = max(self.max_seconds, time.perf_counter() - start)
+
+  # 작업 스레드 종료
+  def shutdown(self) :
+    self.pool.shutdown(wait = True, cancel_futures = True)
+
+  # 실행 통계
+  def get_stats(self) :
+    return {
+      'calls' : self.calls,
+      'errors' : self.errors,
+      'active' : self.active,
+      'max_active' : self.max_active,
+      'max_ms' : round(self.max_seconds * 1000, 1)
+    }
+
+# 이벤트 루프 지연 측정 클래스 - 일정 주기로 잠들었다가 예정보다 늦게 깨어난 시간을 기록
+# 지연이 크면 어떤 작업이 블로킹 호출로 이벤트 루프를 막고 있다는 뜻
+class LoopMonitor :
+  def __init__(self, interval = ASYNC_RUNTIME_CONFIG['lag_interval'], warning = ASYNC_RUNTIME_CONFIG['lag_warning']) :
+    self.interval = interval                                   # 측정 주기 (초)
+    self.warning = warning                                     # 경고 기준 (초)
+
+    self.samples = 0                                           # 측정 횟수
+    self.total = 0.0                                           # 누적 지연 (초)
+    self.last = 0.0                                            # 마지막 지연 (초)
+    self.max = 0.0                                             # 최대 지연 (초)
+    self.slow = 0                                              # 경고 기준을 넘은 횟수
+
+  # 지연 측정 작업
+  async def run(self) :
+    loop = asyncio.get_running_loop()
+
+    while True :
+      expected = loop.time() + self.interval
+      await asyncio.sleep(self.interval)
+      lag = max(0.0, loop.time() - expected)
+
+      self.samples += 1
+      self.total += lag
+      self.last = lag
+      self.max = max(self.max, lag)
+
+      if lag >= self.warning :
+        self.slow += 1
+        print(f"[{current_time()}] 이벤트 루프 지연 {lag * 1000:.0f}ms")
+
+  # 지연 통계 (ms)
+  def get_stats(self) :
+    return {
+      'samples' : self.samples,
+      'last_ms' : round(self.last * 1000, 1),
+      'avg_ms' : round(self.total / self.samples * 1000, 1) if self.samples else 0.0,
+      'max_ms' : round(self.max * 1000, 1),
+      'slow' : self.slow
+    }
+
+# 단일 이벤트 루프 실행 클래스 - 통합 시스템의 센서 버스, 구독 처리를 그대로 쓰고 작업 스레드만 코루틴으로 대체
+class AsyncRuntime :
+  def __init__(self, system) :
+    self.system = system                                       # 통합 시스템 객체 (센서 버스, 공유 데이터, 설정 관리자)
+    self.hardware = None                                       # 하드웨어 실행기 (이벤트 루프 안에서 생성)
+    self.database = None                                       # 데이터베이스 실행기
+    self.monitor = LoopMonitor()
+    self.started = None                                        # 시작 시각 (monotonic)
+
+    self._stop = None                                          # 종료 요청 이벤트
+    self._group = None                                         # 실행 중인 작업 그룹
+    self._spawned = set()                                      # 실행 중 추가로 만든 작업 (종료 시 함께 취소)
+
+  # 종료 요청 (시그널 처리기에서 호출)
+  def stop(self) :
+    if self._stop is not None and not self._stop.is_set() :
+      print("시스템 종료 중...")
+      self._stop.set()
+
+  # 자동 제어 구독 - 실행이 필요할 때만 측정 작업을 막지 않도록 하드웨어 실행기로 넘김
+  def schedule_control(self, reading) :
+    sensor_data = reading._asdict()
+
+    if self._group is not None and multi_control.control_due(sensor_data) is not None :
+      task = self._group.create_task(self.control(sensor_data))
+      self._spawned.add(task)
+      task.add_done_callback(self._spawned.discard)
+
+  # 자동 제어 실행 (오류는 출력만 하고 다른 작업은 계속)
+  async def control(self, sensor_data) :
+    try :
+      await self.hardware.run(self.system.run_control, sensor_data)
+
+    except Exception as e :
+      print(f"제어 시스템 작업 오류 : {e}")
+
+  # 환경 센서 측정 작업 (주기 : 1분, 고정 주기 일정) - 측정 기록을 센서 버스로 발행
+  async def sampling(self) :
+    schedule = self.system.sampling_schedule
+
+    while True :
+      missed = await schedule.wait_async()
+      if missed :
+        print(f"환경 센서 측정 {missed}회 지연으로 건너뜀")
+
+      try :
+        reading = await self.hardware.run(multi_sensor.sample_sensors)
+        self.system.sensor_bus.publish(reading)
+
+      except Exception as e :
+        print(f"환경 센서 측정 작업 오류 : {e}")
+
+  # 낮/밤 전환 작업 - 전환 시각에 최근 측정 기록으로 자동 제어 실행
+  async def daylight(self) :
+    while True :
+      try :
+        daytime = await multi_control.daylight.wait_async()
+        print(f"[{current_time()}] {'낮' if daytime else '밤'} 시간대 전환")
+
+        reading = self.system.sensor_bus.latest
+        if reading is not None :
+          await self.control(reading._asdict())
+
+      except Exception as e :
+        print(f"낮/밤 전환 작업 오류 : {e}")
+        await asyncio.sleep(2)
+
+  # 팬, LED 비례 제어 작업 (주기 : PWM_CONFIG tick, 고정 주기 일정) - 측정, 출력 변경은 하드웨어 실행기
+  async def pwm(self) :
+    schedule = self.system.pwm_schedule
+
+    while True :
+      await schedule.wait_async()
+
+      try :
+        await self.hardware.run(self.system.pwm_controller.step)
+
+      except Exception as e :
+        print(f"비례 제어 작업 오류 : {e}")
+
+  # DHT22 주기 측정 작업 (측정 스레드 대신 이벤트 루프가 측정 간격을 관리)
+  async def dht_reading(self) :
+    reader = multi_sensor.dht_reader
+    reader.external = True
+
+    try :
+      while True :
+        delay = await self.hardware.run(reader.read_once)
+        await asyncio.sleep(delay)
+
+    finally :
+      reader.external = False
+
+  # 데이터베이스 일괄 저장 작업 (저장 주기마다 대기열의 행을 데이터베이스 실행기에서 저장)
+  async def database_writer(self) :
+    writer = db_writer.writer
+
+    # 이전 실행에서 남은 임시 저장 데이터 확인 (첫 저장 주기에 재전송)
+    await self.database.run(writer.check_spool)
+
+    while True :
+      await asyncio.sleep(writer.flush_interval)
+
+      try :
+        await self.database.run(writer.flush_pending)
+
+      except Exception as e :
+        print(f"데이터베이스 일괄 저장 작업 오류 : {e}")
+
+  # 모션 감지 작업 (인터럽트 방식은 감지 이벤트가 올 때만 깨어남, 실패 시 1초 주기 확인)
+  async def motion(self) :
+    if SETTINGS['MOTION_MODE'] == 'edge' :
+      try :
+        await self.motion_edge()
+        return
+
+      except Exception as e :
+        print(f"모션 인터럽트 감지 시작 오류 : {e} - 주기 확인 방식으로 전환")
+
+    while True :
+      try :
+        result = await self.hardware.run(motion_detector.detect_motion)
+
+        if result['status'] == 'detected' :
+          self.system.send_motion_alert()
+
+        await asyncio.sleep(2 if result['status'] == 'error' else 1)
+
+      except Exception as e :
+        print(f"모션 감지 작업 오류 : {e}")
+        await asyncio.sleep(2)
+
+  # 인터럽트 방식 모션 감지 (GPIO 콜백 스레드 → 이벤트 루프 대기열)
+  async def motion_edge(self) :
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue(maxsize = 100)
+
+    # 감지 이벤트 추가 (가득 차면 버림)
+    def put_event(timestamp) :
+      if not events.full() :
+        events.put_nowait(timestamp)
+
+    detector = await self.hardware.run(
+      motion_detector.MotionEdgeDetector,
+      on_event = lambda timestamp : loop.call_soon_threadsafe(put_event, timestamp)
+    )
+    await self.hardware.run(detector.start)
+    print("모션 감지 : GPIO 인터럽트 방식")
+
+    try :
+      while True :
+        timestamp = await events.get()
+
+        try :
+          # 알림 전송 후 부저 알람 요청 및 데이터베이스 저장
+          self.system.send_motion_alert(timestamp)
+          await self.hardware.run(motion_detector.handle_motion)
+
+        except Exception as e :
+          print(f"모션 감지 처리 오류 : {e}")
+
+    finally :
+      await self.hardware.run(detector.stop)
+
+  # 실시간 원격 제어 서버 작업 (서버 오류는 출력만 하고 다른 작업은 계속)
+  async def websocket(self) :
+    try :
+      await websocket_server.start_server(
+        self.system.sensor_snapshots,
+        self.system.config_manager,
+        self.system.sensor_history
+      )
+
+    except Exception as e :
+      print(f"실시간 원격 제어 작업 오류 : {e}")
+
+  # 상태 출력 작업 (15초마다 실행 시간, 이벤트 루프 지연, 실행기 통계)
+  async def status(self) :
+    while True :
+      await asyncio.sleep(15)
+
+      lag = self.monitor.get_stats()
+      schedule = self.system.sampling_schedule.get_stats()
+      hardware = self.hardware.get_stats()
+      database = self.database.get_stats()
+
+      print(f"[{current_time()}] 농작물 환경 모니터링 시스템 정상 작동 중 (실행시간 : {format_elapsed(time.monotonic() - self.started)})")
+      print(f"이벤트 루프 지연 : 평균 {lag['avg_ms']}ms, 최대 {lag['max_ms']}ms (경고 {lag['slow']}회) / "
+            f"하드웨어 실행기 {hardware['calls']}회 (최대 {hardware['max_ms']}ms) / "
+            f"데이터베이스 실행기 {database['calls']}회 (최대 {database['max_ms']}ms)")
+      print(f"측정 주기 : {schedule['ticks']}회, 지연 평균 {schedule['jitter_avg_ms']}ms, 최대 {schedule['jitter_max_ms']}ms (놓침 {schedule['missed']}회)")
+
+      trigger = multi_control.trigger.get_stats()
+      print(f"자동 제어 : 확인 {trigger['checks']}회, 실행 {trigger['runs']}회 {trigger['reasons']}")
+
+      pwm = self.system.pwm_controller.get_stats()
+      if pwm :
+        print("비례 제어 : " + ', '.join(f"{device.upper()} {stats['duty']}% (1시간 평균 {stats['average_1h']}%)" for device, stats in pwm.items()))
+
+  # 모든 작업 실행 (종료 요청 시 모든 작업을 함께 취소)
+  async def run(self) :
+    loop = asyncio.get_running_loop()
+    self.started = time.monotonic()
+    self._stop = asyncio.Event()
+
+    self.hardware = BoundedExecutor("하드웨어", ASYNC_RUNTIME_CONFIG['hardware_workers'])
+    self.database = BoundedExecutor("데이터베이스", ASYNC_RUNTIME_CONFIG['database_workers'])
+
+    # 웹소켓 기간별 조회 등 기본 실행기 호출도 데이터베이스 실행기 작업 스레드 수로 제한
+    loop.set_default_executor(self.database.pool)
+
+    for sig in (signal.SIGINT, signal.SIGTERM) :
+      loop.add_signal_handler(sig, self.stop)
+
+    # 자동 제어는 하드웨어 실행기에서 처리하도록 구독 교체
+    self.system.sensor_bus.subscribe('자동 제어', self.schedule_control)
+
+    # 저장 스레드 없이 대기열에 추가만 하고 저장은 database_writer 작업이 맡음 (이벤트 루프에서 직접 저장하지 않게)
+    db_writer.writer.external = True
+
+    print("통합 모니터링 시스템 시작 (단일 이벤트 루프)")
+    self.system.running = True
+
+    try :
+      async with asyncio.TaskGroup() as group :
+        self._group = group
+        tasks = [
+          group.create_task(self.dht_reading(), name = "DHT22 측정"),
+          group.create_task(self.sampling(), name = "환경 센서 측정 (실시간 체크, 데이터 저장, 자동 제어)"),
+          group.create_task(self.daylight(), name = "낮/밤 전환 제어"),
+          group.create_task(self.pwm(), name = "팬, LED 비례 제어"),
+          group.create_task(self.database_writer(), name = "데이터베이스 일괄 저장"),
+          group.create_task(self.motion(), name = "모션 감지 알람"),
+          group.create_task(self.websocket(), name = "실시간 원격 제어"),
+          group.create_task(self.monitor.run(), name = "이벤트 루프 지연 측정"),
+          group.create_task(self.status(), name = "상태 출력")
+        ]
+
+        for task in tasks :
+          print(f"- {task.get_name()}", flush = True)
+
+        await self._stop.wait()
+
+        # 종료 요청 시 고정 작업과 추가로 만든 작업 모두 취소 (작업 그룹이 취소 완료까지 기다림)
+        for task in [*tasks, *self._spawned] :
+          task.cancel()
+
+    except* Exception as errors :
+      for error in errors.exceptions :
+        print(f"시스템 오류 : {error}")
+
+    finally :
+      self._group = None
+      self.system.running = False
+      db_writer.writer.external = False                       # 종료 중 저장은 직접 저장 (남은 대기열은 shutdown 에서 저장)
+      await self.shutdown()
+
+  # 남은 데이터 저장 후 하드웨어, 데이터베이스 정리
+  async def shutdown(self) :
+    try :
+      await self.database.run(db_writer.writer.flush_pending)
+
+    except Exception as e :
+      print(f"데이터베이스 일괄 저장 종료 오류 : {e}")
+
+    await self.hardware.run(self.system.cleanup)
+
+    self.hardware.shutdown()
+    self.database.shutdown()
+
+    lag = self.monitor.get_stats()
+    print(f"이벤트 루프 지연 : 평균 {lag['avg_ms']}ms, 최대 {lag['max_ms']}ms ({lag['samples']}회 측정)")
+    print("시스템 종료 완료")
+
+# 단일 이벤트 루프 실행 (통합 시스템 객체를 받아 종료 요청까지 실행)
+def main(system) :
+  asyncio.run(AsyncRuntime(system).run())
@@ -0,0 +1,111 @@
+# 농작물 환경 모니터링을 위한 고정 주기 일정 (작업 시간만큼 주기가 밀리지 않고, 실제 시각의 정각 경계에 맞춤)
+                                                                # 표준 라이브러리
+import asyncio
+import time
+                                                                # 로컬 모듈
+from config.constant import SCHEDULER_CONFIG
+
+# 다음 정각 경계까지 남은 시간 (초) - 경계 바로 위면 0
+def until_boundary(timestamp, interval) :
+  return -timestamp % interval
+
+# 고정 주기 일정 클래스 - 예정 시각을 monotonic 기준으로 interval 씩 더해 작업 시간과 관계없이 주기 유지
+# 작업이 주기보다 오래 걸려 놓친 예정 시각은 몰아서 실행하지 않고 놓친 횟수로만 기록
+# 정렬 시 예정 시각이 실제 시각의 정각 경계(1분 주기 → 매분 0초, 1시간 주기 → 매시 정각)에 오도록 맞추고,
+# 시계 동기화 등으로 실제 시각이 바뀌어 resync 초 넘게 어긋나면 다시 맞춤
+class PeriodicSchedule :
+  def __init__(self, name, interval, align = SCHEDULER_CONFIG['align'], immediate = True,
+               resync = SCHEDULER_CONFIG['resync'], clock = time.monotonic, wall = time.time) :
+    self.name = name                                           # 일정 이름 (로그, 통계용)
+    self.interval = interval                                   # 주기 (초)
+    self.align = align                                         # 실제 시각 정각 경계 정렬 여부
+    self.resync = resync                                       # 다시 맞출 실제 시각 차이 (초)
+    self.clock = clock
+    self.wall = wall
+
+    # 첫 예정 시각 (immediate 이면 바로 한 번 실행 후 다음 경계부터)
+    self._immediate = immediate
+    self._deadline = self._next_boundary(self.clock()) if align else self.clock()
+
+    self.ticks = 0                                             # 실행 횟수
+    self.missed = 0                                            # 놓친 예정 시각 수
+    self.resyncs = 0                                           # 실제 시각에 다시 맞춘 횟수
+    self.jitter_last = 0.0                                     # 마지막 실행 지연 (예정 시각 대비, 초)
+    self.jitter_max = 0.0                                      # 최대 실행 지연 (초)
+    self._jitter_total = 0.0
+    self._jitter_count = 0
+
+  # 현재 monotonic 시각 기준 다음 정각 경계의 monotonic 예정 시각 (경계 바로 위면 다음 경계)
+  def _next_boundary(self, now) :
+    return now + (until_boundary(self.wall(), self.interval) or self.interval)
+
+  # 다음 실행까지 남은 시간 (초)
+  def delay(self) :
+    if self._immediate :
+      return 0.0
+
+    return max(0.0, self._deadline - self.clock())
+
+  # 예정 시각 도달 처리 (지연 기록, 놓친 예정 시각 건너뛰기, 다음 예정 시각 계산) - 이번에 놓친 횟수 반환
+  def arrive(self) :
+    now = self.clock()
+    self.ticks += 1
+
+    if self._immediate :
+      self._immediate = False
+      if self.align :
+        self._deadline = self._next_boundary(now)
+        return 0
+
+      self._deadline = now
+
+    # 다음 예정 시각 (이미 지난 예정 시각은 놓친 것으로 세고 건너뜀)
+    lateness = max(0.0, now - self._deadline)
+    skipped = int(lateness // self.interval)
+    self.missed += skipped
+    self._deadline += (skipped + 1) * self.interval
+
+    # 가장 최근 예정 시각 대비 지연 기록
+    jitter = lateness - skipped * self.interval
+    self.jitter_last = jitter
+    self.jitter_max = max(self.jitter_max, jitter)
+    self._jitter_total += jitter
+    self._jitter_count += 1
+
+    # 실제 시각 경계와 어긋났으면 다시 맞춤 (시계 동기화, 시계 변경)
+    if self.align :
+      offset = until_boundary(self.wall() + (self._deadline - now), self.interval)
+      error = min(offset, self.interval - offset)
+      if error > self.resync :
+        self._deadline = self._next_boundary(now)
+        self.resyncs += 1
+
+    return skipped
+
+  # 다음 예정 시각까지 대기 후 도달 처리 (작업 스레드용, stop 이벤트가 설정되면 바로 반환)
+  def wait(self, stop = None) :
+    delay = self.delay()
+
+    if stop is None :
+      time.sleep(delay)
+    elif stop.wait(delay) :
+      return None
+
+    return self.arrive()
+
+  # 다음 예정 시각까지 대기 후 도달 처리 (이벤트 루프용)
+  async def wait_async(self) :
+    await asyncio.sleep(self.delay())
+    return self.arrive()
+
+  # 일정 통계 (지연 ms)
+  def get_stats(self) :
+    return {
+      'interval' : self.interval,
+      'ticks' : self.ticks,
+      'missed' : self.missed,
+      'resyncs' : self.resyncs,
+      'jitter_last_ms' : round(self.jitter_last * 1000, 1),
+      'jitter_avg_ms' : round(self._jitter_total / self._jitter_count * 1000, 1) if self._jitter_count else 0.0,
+      'jitter_max_ms' : round(self.jitter_max * 1000, 1)
+    }
@@ -0,0 +1,100 @@
+# 농작물 환경 모니터링을 위한 MCP3008 다채널 일괄 측정 (채널별 여러 번 측정 후 필터링, 공유 스냅샷)
+                                                                # 표준 라이브러리
+import statistics
+import threading
+import time
+from collections import namedtuple
+                                                                # 로컬 모듈
+from config.constant import ADC_SAMPLER_CONFIG
+
+# 필터 종류 (median : 측정값 중앙값, ema : 측정값 평균의 지수 이동 평균)
+FILTERS = ('median', 'ema')
+
+# 측정 결과 스냅샷 (채널 → 필터링 값, 채널 → 이번 측정 원시값 목록, 측정 시각 monotonic)
+AdcSnapshot = namedtuple('AdcSnapshot', ['values', 'samples', 'timestamp'])
+
+# ADC 일괄 측정 클래스 - 모든 채널을 한 번에 측정하고 결과를 스냅샷으로 공유
+# MCP3008 은 변환 1회마다 CS 신호를 한 번 올렸다 내려야 하므로 변환 자체는 채널, 횟수만큼 필요하지만
+# 한 번의 측정을 모든 사용처가 나눠 써서 실제 SPI 통신 횟수를 줄임
+class AdcSampler :
+  def __init__(self, read, channels, oversample = ADC_SAMPLER_CONFIG['oversample'],
+               filter = ADC_SAMPLER_CONFIG['filter'], alpha = ADC_SAMPLER_CONFIG['ema_alpha'],
+               max_age = ADC_SAMPLER_CONFIG['max_age'], clock = time.monotonic) :
+    if filter not in FILTERS :
+      raise ValueError(f"알 수 없는 필터 : {filter}")
+
+    self._read = read                                          # 채널 1회 변환 함수 (채널 → 0 ~ 1023)
+    self.channels = tuple(channels)                            # 측정할 채널 목록
+    self.oversample = max(1, oversample)                       # 채널별 측정 횟수
+    self.filter = filter                                       # 필터 종류
+    self.alpha = alpha                                         # 지수 이동 평균 가중치 (새 값 비율)
+    self.max_age = max_age                                     # 스냅샷 재사용 최대 경과 시간 (초)
+    self.clock = clock
+
+    self._snapshot = None                                      # 마지막 측정 결과
+    self._scan_lock = threading.Lock()                         # 동시에 한 스레드만 SPI 사용
+
+    self.scans = 0                                             # 일괄 측정 횟수
+    self.conversions = 0                                       # ADC 변환 횟수 (SPI 통신 횟수)
+    self.reused = 0                                            # 측정 없이 스냅샷을 돌려준 횟수
+
+  # 모든 채널 일괄 측정 (채널을 번갈아 측정하여 같은 순간의 값이 되도록 함)
+  def scan(self) :
+    with self._scan_lock :
+      return self._scan()
+
+  def _scan(self) :
+    samples = {channel : [] for channel in self.channels}
+
+    for _ in range(self.oversample) :
+      for channel in self.channels :
+        samples[channel].append(self._read(channel))
+    self.conversions += self.oversample * len(self.channels)
+
+    previous = self._snapshot.values if self._snapshot is not None else {}
+    values = {}
+
+    for channel, readings in samples.items() :
+      if self.filter == 'median' :
+        values[channel] = statistics.median(readings)
+      else :
+        # 이번 평균을 이전 값과 섞음 (첫 측정은 평균 그대로)
+        mean = sum(readings) / len(readings)
+        last = previous.get(channel)
+        values[channel] = mean if last is None else last + self.alpha * (mean - last)
+
+    self._snapshot = AdcSnapshot(values, samples, self.clock())
+    self.scans += 1
+    return self._snapshot
+
+  # 최근 스냅샷 (max_age 보다 오래됐거나 없으면 새로 측정, max_age 를 0 으로 주면 항상 측정)
+  def snapshot(self, max_age = None) :
+    max_age = self.max_age if max_age is None else max_age
+
+    snapshot = self._snapshot
+    if snapshot is not None and self.clock() - snapshot.timestamp < max_age :
+      self.reused += 1
+      return snapshot
+
+    with self._scan_lock :
+      # 기다리는 동안 다른 스레드가 측정했으면 그 결과 사용
+      snapshot = self._snapshot
+      if snapshot is not None and self.clock() - snapshot.timestamp < max_age :
+        self.reused += 1
+        return snapshot
+
+      return self._scan()
+
+  # 채널의 필터링 값
+  def value(self, channel, max_age = None) :
+    return self.snapshot(max_age).values[channel]
+
+  # 측정 통계
+  def get_stats(self) :
+    return {
+      'scans' : self.scans,
+      'conversions' : self.conversions,
+      'reused' : self.reused,
+      'oversample' : self.oversample,
+      'filter' : self.filter
+    }
@@ -0,0 +1,168 @@
+# 농작물 환경 모니터링을 위한 DHT22 단일 소유 측정기 (최소 측정 간격 준수, 마지막 정상값 공유)
+                                                                # 표준 라이브러리
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+                                                                # 로컬 모듈
+from config.constant import DHT_READER_CONFIG
+
+# DHT22 데이터시트 최소 측정 간격 (초) - 이보다 자주 읽으면 이전 값이 나오거나 실패
+DHT_MIN_PERIOD = 2.0
+
+# 정상 측정값 (온도, 습도, 측정 시각 epoch 초, 측정 시각 monotonic)
+DhtReading = namedtuple('DhtReading', ['temperature', 'humidity', 'timestamp', 'monotonic'])
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# DHT22 측정기 클래스 - 센서는 이 객체만 읽고, 다른 스레드는 마지막 정상값을 기다림 없이 가져감
+# 측정 스레드가 실행 중이면 주기적으로 읽고, 아니면 (단독 실행 모드) 요청 시 최소 간격을 지켜 직접 읽음
+class DhtReader :
+  def __init__(self, sensor, period = DHT_READER_CONFIG['period'], max_age = DHT_READER_CONFIG['max_age'],
+               max_attempts = DHT_READER_CONFIG['max_attempts'], clock = time.monotonic) :
+    self.sensor = sensor                                       # DHT22 센서 자원 (get() 으로 센서 객체)
+    self.period = max(DHT_MIN_PERIOD, period)                  # 측정 주기 (초)
+    self.max_age = max_age                                     # 마지막 정상값 최대 허용 경과 시간 (초)
+    self.max_attempts = max_attempts                           # 요청 시 직접 읽을 때 최대 시도 횟수
+    self.clock = clock
+
+    self._last = None                                          # 마지막 정상 측정값
+    self._last_attempt = -math.inf                             # 마지막 측정 시도 시각
+    self._lock = threading.Lock()                              # 센서를 동시에 한 곳에서만 읽음
+    self._stop = threading.Event()
+    self._ready = threading.Event()                            # 첫 정상값 측정 완료
+    self._thread = None
+    self.external = False                                      # 외부 이벤트 루프가 read_once 로 주기 측정을 맡는지 여부
+
+    self.reads = 0                                             # 측정 시도 횟수
+    self.failures = 0                                          # 측정 실패 횟수
+    self.consecutive_failures = 0                              # 연속 실패 횟수
+    self.last_error = None                                     # 마지막 실패 원인
+
+  # 마지막 정상 측정값 (없으면 None)
+  @property
+  def last_good(self) :
+    return self._last
+
+  # 측정 스레드 실행 여부 (외부 이벤트 루프가 주기 측정을 맡은 경우 포함)
+  def is_running(self) :
+    return self.external or (self._thread is not None and self._thread.is_alive())
+
+  # 측정 스레드 시작
+  def start(self) :
+    if self._thread is not None and self._thread.is_alive() :
+      return
+
+    self._stop.clear()
+    self._thread = threading.Thread(target = self._run, name = "DHT22 측정", daemon = True)
+    self._thread.start()
+
+  # 측정 스레드 중지
+  def stop(self, timeout = 5) :
+    self._stop.set()
+
+    if self._thread is not None :
+      self._thread.join(timeout = timeout)
+      self._thread = None
+
+  # 센서 1회 측정 (잠금 안에서 호출, 성공 여부 반환)
+  def _attempt(self) :
+    self._last_attempt = self.clock()
+    self.reads += 1
+
+    try :
+      sensor = self.sensor.get()
+      temperature = sensor.temperature
+      humidity = sensor.humidity
+      error = None if temperature is not None and humidity is not None else "측정값 없음"
+
+    except Exception as e :
+      error = str(e)
+
+    if error is None :
+      if self.consecutive_failures :
+        print(f"[{current_time()}] DHT22 센서 복구 (연속 실패 {self.consecutive_failures}회 후)")
+
+      self._last = DhtReading(temperature, humidity, time.time(), self._last_attempt)
+      self._ready.set()
+      self.consecutive_failures = 0
+      return True
+
+    # 연속 실패는 처음 한 번만 출력
+    if self.consecutive_failures == 0 :
+      print(f"[{current_time()}] DHT22 센서 읽기 실패 : {error} - {DHT_MIN_PERIOD:.0f}초 후 재시도")
+
+    self.failures += 1
+    self.consecutive_failures += 1
+    self.last_error = error
+    return False
+
+  # 1회 측정 후 다음 측정까지 대기 시간 반환 (성공 시 측정 주기, 실패 시 최소 측정 간격)
+  def read_once(self) :
+    with self._lock :
+      success = self._attempt()
+
+    return self.period if success else DHT_MIN_PERIOD
+
+  # 측정 스레드
+  def _run(self) :
+    while not self._stop.is_set() :
+      self._stop.wait(self.read_once())
+
+  # 측정 스레드 없이 직접 읽기 (최근 측정값이 있으면 재사용, 실패 시 최소 간격을 지켜 재시도)
+  def _refresh(self, max_age) :
+    with self._lock :
+      for _ in range(self.max_attempts) :
+        now = self.clock()
+        last = self._last
+        age = now - last.monotonic if last is not None else math.inf
+
+        # 다른 요청이 방금 읽었으면 그 값 사용
+        if age < self.period :
+          return
+
+        wait = self._last_attempt + DHT_MIN_PERIOD - now
+        if wait > 0 :
+          # 허용 시간 안의 값이 있으면 기다리지 않음
+          if age <= max_age :
+            return
+          time.sleep(wait)
+
+        if self._attempt() :
+          return
+
+  # 마지막 정상값 (온도, 습도, 오류) - max_age 보다 오래되었거나 없으면 오류 메시지와 None 반환
+  def latest(self, max_age = None) :
+    max_age = self.max_age if max_age is None else max_age
+
+    if not self.is_running() :
+      self._refresh(max_age)
+
+    # 측정 스레드 시작 직후에는 첫 정상값을 기다림 (최대 시도 횟수만큼의 측정 간격)
+    elif self._last is None :
+      self._ready.wait(self.max_attempts * DHT_MIN_PERIOD)
+
+    last = self._last
+    if last is None :
+      return None, None, "DHT22 센서 데이터 수신 실패"
+
+    age = self.clock() - last.monotonic
+    if age > max_age :
+      return None, None, f"DHT22 센서 데이터 수신 실패 (마지막 정상값 {age:.0f}초 전)"
+
+    return last.temperature, last.humidity, None
+
+  # 측정 통계
+  def get_stats(self) :
+    last = self._last
+
+    return {
+      'reads' : self.reads,
+      'failures' : self.failures,
+      'consecutive_failures' : self.consecutive_failures,
+      'last_error' : self.last_error,
+      'age' : round(self.clock() - last.monotonic, 1) if last is not None else None
+    }
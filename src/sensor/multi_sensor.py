@@ -1,26 +1,32 @@
 # 농작물 환경 모니터링을 위한 온습도, 토양 수분, 조도 센서 시스템
                                                                 # 표준 라이브러리
 import time
-                                                                # 외부 라이브러리
-import board
-import adafruit_dht
-import spidev
                                                                 # 로컬 모듈
 from config.constant import SETTINGS
 from config.crop_config import CROP_SETTINGS
 from database.db_utils import save_sensor
+from hardware.backend import get_backend
+from hardware.lifecycle import Resource
+from sensor.adc_sampler import AdcSampler
+from sensor.dht_reader import DhtReader
+from sensor.sensor_bus import Reading
 
 # 농작물 설정값 가져오기
 config = CROP_SETTINGS['strawberry']
 
-# DHT22 온습도 센서 초기화
+# DHT22 온습도 센서 (처음 읽을 때 생성, 라즈베리파이 또는 시뮬레이터)
 DHT22_PIN = SETTINGS['DHT22_PIN']                      # GPIO 14번 핀
-dht_sensor = adafruit_dht.DHT22(getattr(board, f"D{DHT22_PIN}")) 
+dht_sensor = Resource("DHT22 센서", lambda : get_backend().dht22(DHT22_PIN), lambda sensor : sensor.exit())
 
-# MCP3008 ADC 통신 설정 (토양 수분, 조도센서 아날로그 값 읽기용)
-spi = spidev.SpiDev()
-spi.open(0, 0)                                         # SPI 채널 0, 디바이스 0 (CE0 핀)
-spi.max_speed_hz = 1000000                             # SPI 통신 속도 : 1MHz
+# DHT22 측정기 (센서는 측정기만 읽고, 모든 사용처가 마지막 정상값 공유)
+dht_reader = DhtReader(dht_sensor)
+
+# MCP3008 ADC 통신 설정 (토양 수분, 조도센서 아날로그 값 읽기용, 처음 읽을 때 SPI 연결)
+adc = Resource(
+    "MCP3008 ADC",
+    lambda : get_backend().mcp3008(0, 0, 1000000),     # SPI 채널 0, 디바이스 0 (CE0 핀), 1MHz
+    lambda device : device.close()
+)
 
 # 센서별 하드웨어 채널 및 핀 설정
 SOIL_CHANNEL = SETTINGS['SOIL_CHANNEL']                # FC-28 토양 수분 센서 MCP3008 채널
@@ -29,16 +35,15 @@ LIGHT_CHANNEL = SETTINGS['LIGHT_CHANNEL']              # LDR 조도센서 MCP300
 # MCP3008 ADC에서 아날로그 값 읽기 (0 ~ 1023 범위)
 def read_channel(channel) :
     try :
-        # MCP3008 SPI 통신 프로토콜
-        val = spi.xfer2([1, (8 + channel) << 4, 0])
-        # 10비트 ADC 값 추출 (상위 2비트 + 하위 8비트 조합)
-        data = ((val[1] & 3) << 8) + val[2]
-        return data
+        return adc.get().read(channel)
 
     except Exception as e :
         print(f"ADC 채널 {channel} 읽기 오류 : {e}")
         return 0
 
+# 토양 수분, 조도 채널 일괄 측정 (채널별 여러 번 측정 후 필터링, 모든 사용처가 같은 측정 결과 공유)
+sampler = AdcSampler(read_channel, (SOIL_CHANNEL, LIGHT_CHANNEL))
+
 # 토양 수분 퍼센트로 변환 (0 ~ 100%)
 def convert_to_percent(value) :
     try :
@@ -48,30 +53,30 @@ def convert_to_percent(value) :
         print(f"토양 수분 퍼센트 변환 오류 : {e}")
         return 0.0
     
-# DHT22 센서 재시도 로직
-def read_dht22(retry_delay = 2, max_attempts = 3) :
-    for attempt in range(max_attempts) :
-        try :
-            # DHT22 온습도 센서 읽기
-            temperature = dht_sensor.temperature
-            humidity = dht_sensor.humidity
-
-            # 센서 읽기 성공 여부 확인
-            if temperature is None or humidity is None :
-                print(f"DHT22 센서 읽기 실패 - {retry_delay}초 후 재시도 ({attempt + 1}/{max_attempts})")
-                if attempt < 2 :
-                    time.sleep(retry_delay)
-
-            else :
-                print("DHT22 센서 읽기 성공")
-                return temperature, humidity, None     # 성공 시 루프 탈출
-
-        except Exception as e :
-            print(f"DHT22 센서 오류 : {e} - {retry_delay}초 후 재시도 ({attempt + 1}/{max_attempts})")
-            if attempt < max_attempts - 1 :
-                time.sleep(retry_delay)
-    
-    return None, None, "DHT22 센서 데이터 수신 실패"        # 모든 재시도 실패 시 None 반환
+# 토양 수분(%), 조도 일괄 측정값 (fresh 이면 최근 측정 결과를 재사용하지 않고 새로 측정, max_age 초 이내 측정 결과는 재사용)
+def read_adc(fresh = False, max_age = None) :
+    snapshot = sampler.snapshot(0 if fresh else max_age)
+    soil_percent = convert_to_percent(snapshot.values[SOIL_CHANNEL])
+    light_value = int(round(snapshot.values[LIGHT_CHANNEL]))
+    return soil_percent, light_value
+
+# DHT22 온습도 마지막 정상값 (측정 스레드가 실행 중이면 기다리지 않음, 오래된 값이면 오류 반환)
+def read_dht22(max_age = None) :
+    return dht_reader.latest(max_age)
+
+# 모든 환경 센서 1회 측정 기록 (센서별로 한 번씩만 읽고, 측정 시각을 붙여 반환)
+def sample_sensors(timestamp = None) :
+    temperature, humidity, error = read_dht22()
+    soil_percent, light_value = read_adc(fresh = True)
+
+    return Reading(
+        time.time() if timestamp is None else timestamp,
+        temperature,
+        humidity,
+        soil_percent,
+        light_value,
+        error
+    )
 
 # 환경 센서 데이터 출력 공통 함수
 def print_sensor_data(temperature, humidity, soil_moisture, light_value, title = "환경 센서 데이터") :
@@ -89,15 +94,11 @@ def print_sensor_data(temperature, humidity, soil_moisture, light_value, title =
     
 # 모든 환경 센서 데이터를 수집하고 데이터베이스에 저장하는 메인 함수
 def read_all_sensors() :
-    # DHT22 온습도 센서 읽기 (재시도 로직 적용)
+    # DHT22 온습도 마지막 정상값 (측정 스레드가 없으면 최소 측정 간격을 지켜 직접 읽음)
     temperature, humidity, error = read_dht22()
 
-    # FC-28 토양 수분 센서 읽기
-    soil_value = read_channel(SOIL_CHANNEL)
-    soil_percent = convert_to_percent(soil_value)
-
-    # LDR 조도 센서 읽기
-    light_value  = read_channel(LIGHT_CHANNEL)
+    # FC-28 토양 수분, LDR 조도 센서 읽기 (최근 일괄 측정 결과 재사용)
+    soil_percent, light_value = read_adc()
 
     # 수집된 센서 데이터 결과값 출력 (성공 시에만)
     if temperature is not None and humidity is not None :
@@ -118,7 +119,7 @@ def read_all_sensors() :
 
 # 외부 모듈에서 조도값을 요청할 때 사용하는 함수
 def get_light_value() :
-    return read_channel(LIGHT_CHANNEL)
+    return read_adc()[1]
 
 # 외부 모듈에서 온도값을 요청할 때 사용하는 함수
 def get_temperature() :
@@ -127,13 +128,14 @@ def get_temperature() :
 
 # 외부 모듈에서 토양 수분값을 요청할 때 사용하는 함수
 def get_soil_moisture():
-    soil_value = read_channel(SOIL_CHANNEL)
-    return convert_to_percent(soil_value)
+    return read_adc()[0]
 
 # 프로그램 종료시 리소스 정리
 def cleanup() :
     try :
-        spi.close()                                     # SPI 연결 종료
+        dht_reader.stop()                               # DHT22 측정 스레드 중지 (실행 중인 경우만)
+        adc.close()                                     # SPI 연결 종료 (연결된 경우만)
+        dht_sensor.close()                              # DHT22 센서 해제 (생성된 경우만)
         print("리소스 정리 완료")
 
     except Exception as e :
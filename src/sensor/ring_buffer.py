@@ -0,0 +1,132 @@
+# 농작물 환경 모니터링을 위한 최근 센서 데이터 메모리 보관소 (고정 크기 링 버퍼)
+                                                                # 표준 라이브러리
+import math
+import threading
+import time
+from array import array
+                                                                # 로컬 모듈
+from config.constant import SETTINGS
+
+# 보관할 센서 항목
+METRICS = ('temperature', 'humidity', 'soil_moisture', 'light_value')
+
+# 정렬된 값에서 백분위수 계산 (선형 보간)
+def percentile(sorted_values, p) :
+  if not sorted_values :
+    return None
+
+  rank = (len(sorted_values) - 1) * p / 100
+  low = int(rank)
+  high = min(low + 1, len(sorted_values) - 1)
+  return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+# 센서 데이터 링 버퍼 클래스 - 항목별 고정 크기 실수 배열에 측정값을 순환 저장 (추가 O(1))
+class SensorRingBuffer :
+  def __init__(self, capacity = SETTINGS['HISTORY_SIZE'], metrics = METRICS, clock = time.monotonic) :
+    self.capacity = capacity                                   # 최대 보관 개수
+    self.metrics = metrics                                     # 보관 항목
+    self.clock = clock                                         # 기간 계산용 시계 (시스템 시각 변경에 영향 없음)
+
+    # 추가 시각(monotonic, 기간 검색용), 측정 시각(epoch 초, 표시용)과 항목별 측정값 배열 (측정 실패 값은 NaN)
+    # 시스템 시각은 RTC 없는 라즈베리파이에서 NTP 동기화 시 뒤로 갈 수 있으므로 이진 탐색은 추가 시각으로만 수행
+    self._ticks = array('d', bytes(8 * capacity))
+    self._times = array('d', bytes(8 * capacity))
+    self._values = {metric : array('d', [math.nan]) * capacity for metric in metrics}
+
+    self._next = 0                                             # 다음 저장 위치
+    self._size = 0                                             # 현재 보관 개수
+    self._lock = threading.Lock()
+
+  # 현재 보관 개수
+  def __len__(self) :
+    return self._size
+
+  # 측정 데이터 추가 (가장 오래된 데이터 위에 덮어쓰기)
+  def append(self, timestamp = None, **values) :
+    with self._lock :
+      index = self._next
+      self._ticks[index] = self.clock()
+      self._times[index] = time.time() if timestamp is None else timestamp
+
+      for metric in self.metrics :
+        value = values.get(metric)
+        self._values[metric][index] = math.nan if value is None else value
+
+      self._next = (index + 1) % self.capacity
+      self._size = min(self._size + 1, self.capacity)
+
+  # 가장 오래된 데이터의 배열 위치
+  def _oldest(self) :
+    return (self._next - self._size) % self.capacity
+
+  # since(monotonic) 이후 첫 데이터의 순서 번호 (오래된 순 0부터, 추가 시각 이진 탐색)
+  def _first_after(self, since) :
+    oldest = self._oldest()
+    low, high = 0, self._size
+
+    while low < high :
+      middle = (low + high) // 2
+      if self._ticks[(oldest + middle) % self.capacity] < since :
+        low = middle + 1
+      else :
+        high = middle
+
+    return low
+
+  # 순서 번호 범위를 배열 조각으로 복사 (버퍼 끝을 넘으면 두 조각을 이어 붙임)
+  def _slice(self, source, start, end) :
+    begin = (self._oldest() + start) % self.capacity
+    count = end - start
+
+    if begin + count <= self.capacity :
+      return source[begin : begin + count]
+
+    return source[begin :] + source[: begin + count - self.capacity]
+
+  # 최근 seconds 초 동안의 (측정 시각 배열, 항목별 측정값 배열) 반환 (기간은 추가 시각 기준)
+  def window(self, seconds = None, metrics = None) :
+    metrics = metrics or self.metrics
+
+    with self._lock :
+      start = 0 if seconds is None else self._first_after(self.clock() - seconds)
+      times = self._slice(self._times, start, self._size)
+      values = {metric : self._slice(self._values[metric], start, self._size) for metric in metrics}
+
+    return times, values
+
+  # 최근 seconds 초 동안의 항목별 최소, 최대, 평균, 백분위수 계산 (데이터가 없으면 같은 항목에 None)
+  def stats(self, seconds = None, metrics = None, percentiles = (50, 95)) :
+    _, values = self.window(seconds, metrics)
+    result = {}
+
+    for metric, series in values.items() :
+      valid = sorted(value for value in series if not math.isnan(value))
+
+      if not valid :
+        result[metric] = {'count' : 0, 'min' : None, 'max' : None, 'mean' : None, **{f'p{p}' : None for p in percentiles}}
+        continue
+
+      result[metric] = {
+        'count' : len(valid),
+        'min' : valid[0],
+        'max' : valid[-1],
+        'mean' : math.fsum(valid) / len(valid),
+        **{f'p{p}' : percentile(valid, p) for p in percentiles}
+      }
+
+    return result
+
+  # 가장 최근 측정 데이터
+  def latest(self) :
+    with self._lock :
+      if self._size == 0 :
+        return None
+
+      index = (self._next - 1) % self.capacity
+      timestamp = self._times[index]
+      values = {metric : self._values[metric][index] for metric in self.metrics}
+
+    return {
+      'timestamp' : timestamp,
+      **{metric : None if math.isnan(value) else value for metric, value in values.items()}
+    }
@@ -0,0 +1,119 @@
+# 농작물 환경 모니터링을 위한 센서 측정 기록 발행, 구독 (한 번 측정한 값을 저장, 제어, 실시간 전송이 나눠 씀)
+                                                                # 표준 라이브러리
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+                                                                # 로컬 모듈
+from config.constant import SCHEDULER_CONFIG
+
+# 측정 기록 (측정 시각 epoch 초, 온도, 습도, 토양 수분, 조도, 온습도 오류 메시지)
+Reading = namedtuple('Reading', ['timestamp', 'temperature', 'humidity', 'soil_moisture', 'light_value', 'error'])
+
+# 현재 시각 문자열 반환 (로그 출력용)
+def current_time() :
+  return datetime.now().strftime('%H:%M:%S')
+
+# 구독자 클래스 - 측정 기록을 받을 함수와 최소 처리 간격
+# 정렬 구독자는 측정 시각이 새 정각 구간(1시간 간격 → 매시 정각부터 1시간)에 들어간 첫 기록만 처리
+class Subscriber :
+  def __init__(self, name, callback, interval = 0, align = False) :
+    self.name = name                                           # 구독자 이름 (로그, 통계용)
+    self.callback = callback                                   # 측정 기록을 받는 함수 (False 반환 시 다음 기록에서 다시 처리)
+    self.interval = interval                                   # 최소 처리 간격 (초, 0 이면 모든 기록)
+    self.align = align and interval > 0                        # 실제 시각 정각 구간 정렬 여부
+    self.next_due = -math.inf                                  # 다음 처리 가능 시각
+    self._slot = None                                          # 마지막 처리한 정각 구간 번호
+
+    self.calls = 0                                             # 처리 횟수
+    self.errors = 0                                            # 처리 오류 횟수
+    self.seconds = 0.0                                         # 누적 처리 시간 (초)
+
+  # 측정 기록 전달 (처리 간격 전이면 건너뜀)
+  def deliver(self, reading, now) :
+    if self.align :
+      # 정각 직전 측정도 시계 오차 범위 안이면 다음 구간으로 봄
+      slot = math.floor((reading.timestamp + SCHEDULER_CONFIG['resync']) / self.interval)
+      if slot == self._slot :
+        return
+
+    elif now < self.next_due :
+      return
+
+    start = time.perf_counter()
+
+    try :
+      handled = self.callback(reading)
+
+    except Exception as e :
+      print(f"[{current_time()}] 센서 데이터 구독 '{self.name}' 처리 오류 : {e}")
+      self.errors += 1
+      handled = False
+
+    self.calls += 1
+    self.seconds += time.perf_counter() - start
+
+    # 처리 실패 시 간격을 기다리지 않고 다음 기록에서 다시 처리
+    if handled is not False :
+      self.next_due = now + self.interval
+      if self.align :
+        self._slot = slot
+
+# 센서 데이터 버스 클래스 - 측정 작업이 발행한 기록을 구독 순서대로 모든 구독자에게 전달
+# 구독자는 측정 스레드에서 바로 호출되므로 오래 걸리는 작업은 대기열에 넘기고 바로 반환해야 함
+class SensorBus :
+  def __init__(self, clock = time.monotonic) :
+    self.clock = clock
+    self._subscribers = []
+    self._lock = threading.Lock()
+
+    self.latest = None                                         # 마지막 발행 기록
+    self.published = 0                                         # 발행 횟수
+
+  # 구독 등록 (같은 이름이면 교체)
+  def subscribe(self, name, callback, interval = 0, align = False) :
+    subscriber = Subscriber(name, callback, interval, align)
+
+    with self._lock :
+      self._subscribers = [item for item in self._subscribers if item.name != name] + [subscriber]
+
+    return subscriber
+
+  # 구독 해제 (해제 여부 반환)
+  def unsubscribe(self, name) :
+    with self._lock :
+      remaining = [item for item in self._subscribers if item.name != name]
+      removed = len(remaining) != len(self._subscribers)
+      self._subscribers = remaining
+
+    return removed
+
+  # 측정 기록 발행 (한 구독자의 오류가 다른 구독자에게 영향을 주지 않음)
+  def publish(self, reading) :
+    with self._lock :
+      subscribers = self._subscribers
+
+    self.latest = reading
+    self.published += 1
+    now = self.clock()
+
+    for subscriber in subscribers :
+      subscriber.deliver(reading, now)
+
+  # 구독자별 처리 통계
+  def get_stats(self) :
+    with self._lock :
+      subscribers = self._subscribers
+
+    return {
+      'published' : self.published,
+      'subscribers' : {
+        subscriber.name : {
+          'calls' : subscriber.calls,
+          'errors' : subscriber.errors,
+          'seconds' : round(subscriber.seconds, 6)
+        }
+        for subscriber in subscribers
+      }
+    }
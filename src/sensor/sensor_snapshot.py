@@ -0,0 +1,70 @@
+# 농작물 환경 모니터링을 위한 공유 센서 데이터 스냅샷 (변경 불가 객체를 통째로 교체하여 잠금 없이 일관된 값 읽기)
+                                                                # 표준 라이브러리
+import threading
+import time
+
+# 스냅샷 센서 항목
+FIELDS = ('temperature', 'humidity', 'soil_moisture', 'light_value', 'last_update')
+
+# 센서 데이터 스냅샷 클래스 - 생성 후 변경 불가 (한 번 얻은 스냅샷의 모든 항목은 같은 측정 시점의 값)
+class SensorSnapshot :
+  __slots__ = ('seq', 'monotonic') + FIELDS
+
+  def __init__(self, seq, monotonic, temperature = None, humidity = None, soil_moisture = None,
+               light_value = None, last_update = None) :
+    set_field = object.__setattr__
+    set_field(self, 'seq', seq)                                # 발행 순번 (0 이면 아직 측정 전)
+    set_field(self, 'monotonic', monotonic)                    # 발행 시각 (monotonic)
+    set_field(self, 'temperature', temperature)                # 온도 (℃)
+    set_field(self, 'humidity', humidity)                      # 습도 (%)
+    set_field(self, 'soil_moisture', soil_moisture)            # 토양 수분 (%)
+    set_field(self, 'light_value', light_value)                # 조도 (0 ~ 1023)
+    set_field(self, 'last_update', last_update)                # 측정 시각 문자열
+
+  def __setattr__(self, name, value) :
+    raise AttributeError("센서 스냅샷은 변경할 수 없습니다")
+
+  def __delattr__(self, name) :
+    raise AttributeError("센서 스냅샷은 변경할 수 없습니다")
+
+  def __repr__(self) :
+    values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+    return f"SensorSnapshot({values})"
+
+  # 항목 값 (딕셔너리와 같은 방식으로 읽기)
+  def get(self, key, default = None) :
+    return getattr(self, key) if key in FIELDS else default
+
+  # 센서 항목 딕셔너리
+  def as_dict(self) :
+    return {name : getattr(self, name) for name in FIELDS}
+
+# 스냅샷 보관소 클래스 - 작성자는 새 스냅샷을 만들어 참조만 교체하고, 읽는 쪽은 current 한 번으로 일관된 값을 얻음
+# 참조 교체는 원자적이므로 읽을 때 잠금이 필요 없고, 변경 여부는 순번 비교로 확인
+class SnapshotStore :
+  def __init__(self, clock = time.monotonic) :
+    self.clock = clock
+    self._lock = threading.Lock()                              # 작성자끼리 순번이 겹치지 않도록 보호
+    self._current = SensorSnapshot(0, clock())                 # 측정 전 빈 스냅샷
+
+  # 현재 스냅샷
+  @property
+  def current(self) :
+    return self._current
+
+  # 현재 순번
+  @property
+  def seq(self) :
+    return self._current.seq
+
+  # 새 스냅샷 발행 (센서 항목 전체를 받아 다음 순번으로 교체)
+  def publish(self, **fields) :
+    with self._lock :
+      snapshot = SensorSnapshot(self._current.seq + 1, self.clock(), **fields)
+      self._current = snapshot
+
+    return snapshot
+
+  # 순번 이후 갱신 여부
+  def changed_since(self, seq) :
+    return self._current.seq != seq